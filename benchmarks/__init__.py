@@ -0,0 +1 @@
+"""Benchmarks on synthetic data (run with python -m benchmarks)."""
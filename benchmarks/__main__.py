@@ -0,0 +1,6 @@
+"""Entry point of benchmarks."""
+import sys
+
+from benchmarks import suite
+
+sys.exit(suite.main())
@@ -0,0 +1,136 @@
+"""Generators of reproducible synthetic inputs."""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+AMINO_ACIDS = np.array(list("ACDEFGHIKLMNPQRSTVWY"))
+
+
+class DatasetParameters(NamedTuple):
+    """Parameters of synthetic protein and peptides."""
+
+    protein_length: int = 2000
+    peptide_count: int = 5000
+    # fraction of rows which repeat sequence of another row
+    duplication_rate: float = 0.5
+    group_count: int = 3
+    samples_per_group: int = 4
+    # peptide lengths are normally distributed and clipped to [min, max]
+    peptide_length_mean: float = 12.0
+    peptide_length_sd: float = 4.0
+    peptide_length_min: int = 6
+    peptide_length_max: int = 40
+    # fraction of distinct peptides found in more than one protein
+    shared_peptide_rate: float = 0.2
+    seed: int = 0
+
+
+def generate_protein_seq(length: int, rng: np.random.Generator) -> str:
+    """
+    Generate random protein sequence.
+
+    :param length: length of protein sequence
+    :param rng: numpy random generator
+    :return: protein sequence
+    """
+    return "".join(rng.choice(AMINO_ACIDS, size=length))
+
+
+def generate_sample_names(group_count: int, samples_per_group: int):
+    """
+    Generate sample names (<groupName>_<treatmentType><sampleNumber>).
+
+    :param group_count: amount of groups
+    :param samples_per_group: amount of samples of every group
+    :return: list of sample names
+    """
+    return [
+        f"Group{group}_T{sample}"
+        for group in range(1, group_count + 1)
+        for sample in range(1, samples_per_group + 1)
+    ]
+
+
+def generate_peptides(
+    protein_seq: str, parameters: DatasetParameters, rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Generate peptides (subsequences of protein) found in samples.
+
+    :param protein_seq: protein sequence
+    :param parameters: DatasetParameters object
+    :param rng: numpy random generator
+    :return: DataFrame with Sequence, Proteins and Experiment columns
+    """
+    distinct_count = max(
+        1, round(parameters.peptide_count * (1 - parameters.duplication_rate))
+    )
+    lengths = np.clip(
+        np.rint(
+            rng.normal(
+                parameters.peptide_length_mean,
+                parameters.peptide_length_sd,
+                size=distinct_count,
+            )
+        ),
+        parameters.peptide_length_min,
+        min(parameters.peptide_length_max, len(protein_seq)),
+    ).astype(np.int64)
+    starts = rng.integers(0, len(protein_seq) - lengths + 1)
+    distinct_seqs = np.array(
+        [
+            protein_seq[start : start + length]
+            for start, length in zip(starts.tolist(), lengths.tolist())
+        ],
+        dtype=object,
+    )
+    distinct_proteins = np.where(
+        rng.random(distinct_count) < parameters.shared_peptide_rate,
+        "P1;P2",
+        "P1",
+    )
+    # every distinct peptide appears at least once, the rest are duplicates
+    rows = np.concatenate(
+        [
+            np.arange(distinct_count),
+            rng.integers(
+                0,
+                distinct_count,
+                size=parameters.peptide_count - distinct_count,
+            ),
+        ]
+    )
+    rng.shuffle(rows)
+    sample_names = np.array(
+        generate_sample_names(
+            parameters.group_count, parameters.samples_per_group
+        )
+    )
+    return pd.DataFrame(
+        {
+            "Sequence": distinct_seqs[rows],
+            "Proteins": distinct_proteins[rows],
+            "Experiment": rng.choice(sample_names, size=len(rows)),
+        }
+    )
+
+
+def generate_dataset(
+    parameters: DatasetParameters,
+) -> tuple[str, pd.DataFrame]:
+    """
+    Generate protein sequence and peptides.
+
+    The same parameters give the same dataset.
+
+    :param parameters: DatasetParameters object
+    :return: protein sequence and DataFrame with Sequence, Proteins,
+    Experiment, Start and End columns (like pipeline.read_peptides)
+    """
+    rng = np.random.default_rng(parameters.seed)
+    protein_seq = generate_protein_seq(parameters.protein_length, rng)
+    peptides_dataframe = generate_peptides(protein_seq, parameters, rng)
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    return protein_seq, peptides_dataframe
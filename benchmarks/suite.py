@@ -0,0 +1,372 @@
+"""Benchmarks of alignment and report writing."""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple, Optional
+
+SMARCA5_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "smarca5")
+sys.path.insert(0, os.path.abspath(SMARCA5_DIR))
+# no display is needed to render color bars
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import alignment  # noqa: E402
+import cache  # noqa: E402
+import html_page  # noqa: E402
+import html_report  # noqa: E402
+import legend  # noqa: E402
+import pipeline  # noqa: E402
+
+from benchmarks import generators  # noqa: E402
+
+SIZES = {
+    "small": generators.DatasetParameters(),
+    "medium": generators.DatasetParameters(
+        protein_length=10000,
+        peptide_count=50000,
+        group_count=4,
+        samples_per_group=6,
+    ),
+    "large": generators.DatasetParameters(
+        protein_length=35000,
+        peptide_count=500000,
+        group_count=6,
+        samples_per_group=8,
+    ),
+}
+# slowdown (new / old minimal time) reported as regression by compare
+DEFAULT_THRESHOLD = 1.1
+
+
+class Dataset(NamedTuple):
+    """Synthetic input shared by benchmarks."""
+
+    protein_seq: str
+    peptides: object
+    alignment_obj: alignment.Alignment
+    html_report_config: object
+    output_dir: str
+
+
+# name -> function which prepares dataset for one run (not timed) and
+# returns function to time
+BENCHMARKS: dict[str, Callable[[Dataset], Callable[[], object]]] = {}
+
+
+def benchmark(prepare):
+    """
+    Register benchmark.
+
+    :param prepare: function (Dataset -> function to time)
+    :return: prepare function
+    """
+    BENCHMARKS[prepare.__name__] = prepare
+    return prepare
+
+
+def create_search_benchmark(search_engine):
+    def prepare(dataset):
+        alignment_obj = alignment.Alignment(
+            dataset.protein_seq,
+            dataset.peptides.copy(),
+            search_engine=search_engine,
+        )
+        return alignment_obj.search_peptide_in_protein_seq
+
+    prepare.__name__ = f"search[{search_engine}]"
+    return prepare
+
+
+benchmark(create_search_benchmark("aho-corasick"))
+benchmark(create_search_benchmark("fm-index"))
+
+
+def tolerant_search(dataset):
+    alignment_obj = alignment.Alignment(
+        dataset.protein_seq,
+        dataset.peptides.copy(),
+        max_mismatches=1,
+        equivalent_residues=[alignment.ISOBARIC_RESIDUES],
+    )
+    return alignment_obj.search_peptide_in_protein_seq
+
+
+tolerant_search.__name__ = f"search[{alignment.TOLERANT_SEARCH}]"
+benchmark(tolerant_search)
+
+
+@benchmark
+def create_lps(dataset):
+    peptide_seqs = dataset.peptides["Sequence"].unique().tolist()
+
+    def run():
+        for peptide_seq in peptide_seqs:
+            alignment.create_lps(peptide_seq, len(peptide_seq))
+
+    return run
+
+
+def create_page_of_all_peptides(dataset) -> html_page.ReportPage:
+    return html_page.ReportPage(
+        dataset.html_report_config,
+        "group",
+        "All",
+        dataset.alignment_obj.peptide_table_of_experiment("group", "All"),
+        dataset.alignment_obj,
+    )
+
+
+@benchmark
+def page_layout(dataset):
+    return create_page_of_all_peptides(dataset).create_layout
+
+
+@benchmark
+def density_page(dataset):
+    def run():
+        html_page.DensityPage(
+            dataset.html_report_config,
+            "group",
+            "All",
+            dataset.alignment_obj.peptide_table_of_experiment("group", "All"),
+            dataset.alignment_obj,
+        ).fill_alignment_window()
+
+    return run
+
+
+@benchmark
+def tooltips(dataset):
+    return create_page_of_all_peptides(dataset).create_peptides_info
+
+
+@benchmark
+def color_bar_svg(dataset):
+    color_scale = create_page_of_all_peptides(dataset).color_scale
+    # without lru cache of legend module
+    return lambda: legend.create_color_bar_svg.__wrapped__(color_scale)
+
+
+@benchmark
+def color_bar_png(dataset):
+    color_scale = create_page_of_all_peptides(dataset).color_scale
+    path = os.path.join(dataset.output_dir, "color_bar.png")
+    return lambda: legend.save_color_bar_png(color_scale, path)
+
+
+@benchmark
+def write_report(dataset):
+    return lambda: pipeline.write_report(
+        dataset.alignment_obj,
+        os.path.join(dataset.output_dir, "report"),
+        page_workers=1,
+    )
+
+
+def create_dataset(
+    parameters: generators.DatasetParameters, output_dir: str
+) -> Dataset:
+    """
+    Generate dataset and searched alignment used by report benchmarks.
+
+    :param parameters: DatasetParameters object
+    :param output_dir: directory where benchmarks write files
+    :return: Dataset object
+    """
+    protein_seq, peptides = generators.generate_dataset(parameters)
+    alignment_obj = alignment.Alignment(protein_seq, peptides.copy())
+    alignment_obj.search_peptide_in_protein_seq()
+    html_report_config = html_report.HtmlReport(
+        pipeline.load_base_soup(),
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        pipeline.LEFT_TEXT_OFFSET,
+        pipeline.DEFAULT_INTERLINE,
+        pipeline.DEFAULT_LINE_LENGTH,
+    )
+    return Dataset(
+        protein_seq, peptides, alignment_obj, html_report_config, output_dir
+    )
+
+
+def run_benchmarks(
+    parameters: generators.DatasetParameters,
+    repeat: int = 3,
+    selected: Optional[list[str]] = None,
+) -> dict:
+    """
+    Run benchmarks, every one is run repeat times.
+
+    :param parameters: DatasetParameters object
+    :param repeat: amount of timed runs of every benchmark
+    :param selected: run only benchmarks which names contain one of these
+    strings (default: every benchmark)
+    :return: dictionary which can be saved as json
+    """
+    results = {}
+    user_cache_dir = os.environ.get(cache.CACHE_DIR_ENV_VARIABLE)
+    with tempfile.TemporaryDirectory() as output_dir:
+        # index of fm-index engine is built by the first run, the next runs
+        # load it from (temporary) cache
+        os.environ[cache.CACHE_DIR_ENV_VARIABLE] = os.path.join(
+            output_dir, "cache"
+        )
+        try:
+            dataset = create_dataset(parameters, output_dir)
+            for name, prepare in BENCHMARKS.items():
+                if selected and not any(part in name for part in selected):
+                    continue
+                times = []
+                for _ in range(repeat):
+                    function = prepare(dataset)
+                    start = time.perf_counter()
+                    function()
+                    times.append(time.perf_counter() - start)
+                results[name] = {
+                    "times": times,
+                    "min": min(times),
+                    "median": statistics.median(times),
+                }
+        finally:
+            if user_cache_dir is None:
+                del os.environ[cache.CACHE_DIR_ENV_VARIABLE]
+            else:
+                os.environ[cache.CACHE_DIR_ENV_VARIABLE] = user_cache_dir
+    return {
+        "commit": find_commit(),
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters._asdict(),
+        "benchmarks": results,
+    }
+
+
+def find_commit() -> Optional[str]:
+    """
+    Find git commit of benchmarked code.
+
+    :return: commit hash (with "-dirty" suffix if tree has changes) or None
+    outside of git repository
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=12"],
+            cwd=os.path.dirname(__file__),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(
+    old_results: dict, new_results: dict, threshold: float
+) -> list[tuple[str, float, float, float]]:
+    """
+    Compare minimal times of benchmarks present in both results.
+
+    :param old_results: results of run_benchmarks (baseline)
+    :param new_results: results of run_benchmarks
+    :param threshold: ratio (new / old) above which benchmark is regression
+    :return: list of (name, old time, new time, ratio) of regressions
+    """
+    regressions = []
+    for name, new_result in new_results["benchmarks"].items():
+        old_result = old_results["benchmarks"].get(name)
+        if old_result is None:
+            continue
+        ratio = new_result["min"] / old_result["min"]
+        print(
+            f"{name:24} {old_result['min']:10.4f}s "
+            f"{new_result['min']:10.4f}s {ratio:6.2f}x"
+        )
+        if ratio > threshold:
+            regressions.append(
+                (name, old_result["min"], new_result["min"], ratio)
+            )
+    return regressions
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create parser of command line arguments.
+
+    :return: ArgumentParser object
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark SMARCA5 on synthetic data.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run benchmarks")
+    run_parser.add_argument("--size", choices=SIZES, default="small")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument(
+        "--select",
+        action="append",
+        help="run only benchmarks which names contain this string "
+        "(can be repeated)",
+    )
+    run_parser.add_argument(
+        "--output", help="json file with results (default: stdout)"
+    )
+    for field, default in generators.DatasetParameters._field_defaults.items():
+        run_parser.add_argument(
+            f"--{field.replace('_', '-')}",
+            type=type(default),
+            help=f"override {field} of selected size",
+        )
+    compare_parser = subparsers.add_parser(
+        "compare", help="compare two json files with results"
+    )
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="slowdown (new / old) reported as regression",
+    )
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Run benchmarks or compare their results.
+
+    :param argv: command line arguments (default: sys.argv[1:])
+    :return: exit code (1 if compare found regressions)
+    """
+    args = create_parser().parse_args(argv)
+    if args.command == "compare":
+        with open(args.old) as old_file, open(args.new) as new_file:
+            regressions = compare_results(
+                json.load(old_file), json.load(new_file), args.threshold
+            )
+        for name, _, _, ratio in regressions:
+            print(f"Regression: {name} is {ratio:.2f}x slower")
+        return 1 if regressions else 0
+
+    overrides = {
+        field: getattr(args, field)
+        for field in generators.DatasetParameters._fields
+        if getattr(args, field) is not None
+    }
+    results = run_benchmarks(
+        SIZES[args.size]._replace(**overrides), args.repeat, args.select
+    )
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
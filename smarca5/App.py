@@ -1,27 +1,49 @@
-import ttkbootstrap as tk  # type: ignore
-import bs4  # type: ignore
-import colour  # type: ignore
-import pandas as pd  # type: ignore
+"""GUI of application.
+
+Only tkinter and ttkbootstrap are imported before window is shown. pipeline
+(with pandas, numpy and bs4) is imported by the first analysis, do not
+import it (or modules importing it) at top of this module.
+"""
 import ttkbootstrap as tk  # type: ignore
 from tkinter import filedialog as fd
-import matplotlib.pyplot as plt  # type: ignore
-import matplotlib as mpl  # type: ignore
-import os
+from tkinter import messagebox
+import queue
+import threading
 import webbrowser
-from bs4 import BeautifulSoup
 import atexit
-import glob
 
-import alignment
-import html_report
-import html_page
+import instrumentation
+import progress
+import runs
+from resources import load_file
 
-LEFT_TEXT_OFFSET = 3
+# alignment.ISOBARIC_RESIDUES (alignment is imported by the first analysis)
+ISOBARIC_RESIDUES = "IL"
+# how often (in milliseconds) window checks progress of analysis
+PROGRESS_POLL_INTERVAL = 100
+STAGE_DESCRIPTIONS = {
+    "load": "Loading files",
+    "search": "Searching peptides",
+    "write": "Writing pages",
+}
 
 
 class App:
     def __init__(self, master):
-        atexit.register(delete_html_files)
+        # old reports of GUI are removed at exit, the most recent ones are
+        # kept (runs of command line are not touched)
+        atexit.register(
+            runs.clean_runs_from_environment,
+            runs.DEFAULT_KEEP_RUNS,
+            runs.GUI_ORIGIN,
+        )
+        self.master = master
+        # messages from analysis thread: (kind, value)
+        self.progress_queue: queue.Queue = queue.Queue()
+        self.progress = None
+        # alignments of analysed files (pipeline.AlignmentCache), created by
+        # the first analysis
+        self.alignment_cache = None
         master.title("SMARCA5")
         master.wm_iconbitmap(load_file(r"icons\protein_app.ico"))
         self.title_label = tk.Label(
@@ -52,6 +74,17 @@ class App:
             bootstyle="danger",
             command=self.find_peptide_in_protein_seq,
         )
+        self.cancel_button = tk.Button(
+            self.button_frame,
+            text="Cancel",
+            bootstyle="secondary",
+            state="disabled",
+            command=self.cancel_analysis,
+        )
+        self.progress_bar = tk.Progressbar(
+            self.button_frame, bootstyle="danger", length=300
+        )
+        self.progress_label = tk.Label(self.button_frame, text="")
 
         self.line_length_spinbox = tk.Spinbox(
             self.button_frame, from_=1, to=10000
@@ -69,6 +102,40 @@ class App:
             self.button_frame, text="Interline (pixel):"
         )
 
+        self.window_size_spinbox = tk.Spinbox(
+            self.button_frame, from_=0, to=1000000
+        )
+        self.window_size_spinbox.insert(0, "0")
+        self.window_size_spinbox_label = tk.Label(
+            self.button_frame, text="Window (residues, 0 = whole protein):"
+        )
+
+        self.mismatches_spinbox = tk.Spinbox(self.button_frame, from_=0, to=10)
+        self.mismatches_spinbox.insert(0, "0")
+        self.mismatches_spinbox_label = tk.Label(
+            self.button_frame, text="Mismatches of peptide:"
+        )
+        self.compact_variable = tk.BooleanVar(value=False)
+        self.compact_checkbutton = tk.Checkbutton(
+            self.button_frame,
+            text="Compact html",
+            variable=self.compact_variable,
+        )
+        self.isobaric_variable = tk.BooleanVar(value=False)
+        self.isobaric_checkbutton = tk.Checkbutton(
+            self.button_frame,
+            text="I and L are equivalent",
+            variable=self.isobaric_variable,
+        )
+        # analysis of the same files after change of display options
+        # rewrites only changed pages of the last report
+        self.reuse_variable = tk.BooleanVar(value=True)
+        self.reuse_checkbutton = tk.Checkbutton(
+            self.button_frame,
+            text="Update last report of the same files",
+            variable=self.reuse_variable,
+        )
+
         self.title_label.pack(padx=20, pady=20)
         self.protein_ref_frame.pack(padx=20, pady=20)
         self.protein_entry.grid(row=0, column=0, padx=20, pady=20)
@@ -81,22 +148,29 @@ class App:
         self.line_length_spinbox.grid(row=0, column=1, padx=10, pady=20)
         self.interline_spinbox_label.grid(row=1, column=0, padx=10, pady=20)
         self.interline_spinbox.grid(row=1, column=1, padx=10, pady=20)
-        self.analyze_button.grid(
-            row=2, column=0, columnspan=2, padx=20, pady=20
-        )
+        self.window_size_spinbox_label.grid(row=2, column=0, padx=10, pady=20)
+        self.window_size_spinbox.grid(row=2, column=1, padx=10, pady=20)
+        self.mismatches_spinbox_label.grid(row=3, column=0, padx=10, pady=20)
+        self.mismatches_spinbox.grid(row=3, column=1, padx=10, pady=20)
+        self.isobaric_checkbutton.grid(row=4, column=0, pady=10)
+        self.compact_checkbutton.grid(row=4, column=1, pady=10)
+        self.reuse_checkbutton.grid(row=5, column=0, columnspan=2, pady=10)
+        self.analyze_button.grid(row=6, column=0, padx=20, pady=20)
+        self.cancel_button.grid(row=6, column=1, padx=20, pady=20)
+        self.progress_bar.grid(row=7, column=0, columnspan=2, padx=20)
+        self.progress_label.grid(row=8, column=0, columnspan=2, pady=10)
 
     def read_ref_seq_fasta(self) -> str:
         """
         Read reference protein sequence in fasta format.
 
+        Only the first record of multi-record fasta file is read.
+
         :return: reference sequence string
         """
-        ref_seq_fasta = ""
-        with open(rf"{self.protein_entry.get()}", "r") as file:
-            for line in file:
-                if line[0] != ">":
-                    ref_seq_fasta += line.strip()
-        return ref_seq_fasta
+        import pipeline
+
+        return pipeline.read_ref_seq_fasta(rf"{self.protein_entry.get()}")
 
     def browse(self, entry) -> None:
         """
@@ -112,124 +186,149 @@ class App:
                 filetypes=[
                     ("All files", "*.*"),
                     ("Excel files", ".xlsx .xls"),
-                    ("CSV files", ".csv"),
+                    ("CSV files", ".csv .tsv"),
+                    ("Parquet files", ".parquet .feather"),
                     ("Fasta files", ".fasta"),
                     ("TXT files", ".txt"),
                 ]
             ),
         )
 
-    def generate_alignment_report(
-        self, dataset, type_of_experiment, alignment_obj, html_report_config
-    ):
-        for index, experiment in enumerate(dataset):
-            if experiment != "All":
-                peptides_metadata_filtered_by_experiment = (
-                    alignment_obj.peptides_metadata.loc[
-                        alignment_obj.peptides_metadata.loc[
-                            :, "Experiment"
-                        ].str.contains(rf"{experiment}")
-                    ]
-                )
-            else:
-                peptides_metadata_filtered_by_experiment = (
-                    alignment_obj.peptides_metadata
-                )
-
-            page = html_page.ReportPage(
-                html_report_config,
-                type_of_experiment,
-                experiment,
-                peptides_metadata_filtered_by_experiment,
-                alignment_obj,
-            )
-            page.fill_alignment_window()
-            page.color_bar_fig.savefig(
-                load_file(
-                    rf"html_files\Amount_of_peptide-type_{type_of_experiment}-{experiment}.png"
-                )
-            )
-            plt.cla()
-            plt.close(page.color_bar_fig)
-            img_tag = page.soup.find("img")
-            img_tag[
-                "src"
-            ] = f"Amount_of_peptide-type_{type_of_experiment}-{experiment}.png"
-            with open(
-                load_file(
-                    rf"html_files\type_{type_of_experiment}-{experiment}.html"
-                ),
-                "w",
-            ) as page_to_save:
-                page_to_save.write(
-                    page.soup.prettify(formatter="html")
-                )  # soup.encode(formatter="html")
-
     def find_peptide_in_protein_seq(self) -> None:
         """
         Find position of peptide in protein sequence.
 
+        Analysis runs in background thread, window polls its progress.
+        Report is written into own run directory (see runs module), so
+        analyses of many windows do not overwrite each other.
+
         :return: None
         """
-        protein_fasta = self.read_ref_seq_fasta()
-        peptides_dataframe = pd.read_excel(rf"{self.peptide_entry.get()}").loc[
-            :, ["Sequence", "Proteins", "Experiment"]
-        ]
-        peptides_dataframe["Start"] = ""
-        peptides_dataframe["End"] = ""
-
-        alignment_obj = alignment.Alignment(
-            protein_seq=protein_fasta, peptides_metadata=peptides_dataframe
-        )
-        alignment_obj.search_peptide_in_protein_seq()
-
-        with open(load_file(r"html_files\index.html"), "r") as html:
-            soup = BeautifulSoup(html, "html.parser")
-
-            # config global options of report like interline, offset ect.
-            html_report_config = html_report.HtmlReport(
-                soup,
-                alignment_obj.group_names,
-                alignment_obj.sample_names,
-                LEFT_TEXT_OFFSET,
-                int(self.interline_spinbox.get()),
-                int(self.line_length_spinbox.get()),
-            )
+        # values of widgets are read here, tkinter is not thread-safe
+        analysis_args = (
+            rf"{self.protein_entry.get()}",
+            rf"{self.peptide_entry.get()}",
+        )
+        analysis_options = {
+            "line_length": int(self.line_length_spinbox.get()),
+            "interline": int(self.interline_spinbox.get()),
+            "window_size": int(self.window_size_spinbox.get()) or None,
+            "max_mismatches": int(self.mismatches_spinbox.get()),
+            "compact": self.compact_variable.get(),
+            "equivalent_residues": (
+                (ISOBARIC_RESIDUES,) if self.isobaric_variable.get() else ()
+            ),
+            "page_workers": None,
+            "reuse_run": self.reuse_variable.get(),
+        }
+        self.progress = progress.Progress(
+            lambda *step: self.progress_queue.put(("progress", step))
+        )
+        self.analyze_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.configure(value=0)
+        self.progress_label.configure(text="Starting")
+        threading.Thread(
+            target=self.run_analysis,
+            args=(analysis_args, analysis_options, self.progress),
+            daemon=True,
+        ).start()
+        self.master.after(PROGRESS_POLL_INTERVAL, self.poll_progress)
 
-            # generate individual reports divided by groups or samples of experiment
-            self.generate_alignment_report(
-                alignment_obj.group_names,
-                "group",
-                alignment_obj,
-                html_report_config,
-            )
-            self.generate_alignment_report(
-                alignment_obj.sample_names,
-                "sample",
-                alignment_obj,
-                html_report_config,
-            )
-            # open one tab (type All)
-            webbrowser.open_new_tab(
-                load_file(r"html_files\type_group-All.html")
+    def run_analysis(self, analysis_args, analysis_options, progress_obj):
+        """
+        Run analysis (in background thread) and put its result into queue.
+
+        :param analysis_args: paths of fasta and peptides files
+        :param analysis_options: keyword arguments of pipeline.run_analysis
+        and reuse_run (update the last run of the same files)
+        :param progress_obj: progress.Progress object of analysis
+        :return: None
+        """
+        try:
+            import pipeline
+
+            if self.alignment_cache is None:
+                self.alignment_cache = pipeline.AlignmentCache()
+            analysis_options = dict(analysis_options)
+            reuse_run = analysis_options.pop("reuse_run")
+            instrumentation.enable_from_environment()
+            try:
+                with runs.open_run(
+                    analysis_args, reuse=reuse_run, origin=runs.GUI_ORIGIN
+                ) as run_dir:
+                    report_path = pipeline.run_analysis(
+                        *analysis_args,
+                        run_dir,
+                        **analysis_options,
+                        progress=progress_obj,
+                        alignment_cache=self.alignment_cache,
+                    )
+            finally:
+                instrumentation.finish()
+        except progress.AnalysisCancelled:
+            self.progress_queue.put(("cancelled", None))
+        except Exception as error:
+            self.progress_queue.put(
+                ("error", f"{type(error).__name__}: {error}")
             )
+        else:
+            self.progress_queue.put(("done", report_path))
 
+    def cancel_analysis(self) -> None:
+        """
+        Cancel button behavior, analysis stops between pages.
+
+        :return: None
+        """
+        if self.progress is not None:
+            self.progress.cancel()
+        self.cancel_button.configure(state="disabled")
+        self.progress_label.configure(text="Cancelling")
 
-def load_file(file_name: str) -> str:
-    """
-    Load file in correct format for creating exe one-file.
+    def poll_progress(self) -> None:
+        """
+        Show progress of analysis, open report when analysis is finished.
 
-    :param: file_name: filename to load
-    :return: str of correct path to file
-    """
-    return os.path.join(os.path.dirname(__file__), file_name)
+        :return: None
+        """
+        while True:
+            try:
+                kind, value = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.show_progress(*value)
+                continue
+            self.analyze_button.configure(state="normal")
+            self.cancel_button.configure(state="disabled")
+            self.progress = None
+            if kind == "done":
+                self.progress_label.configure(text="Done")
+                # open one tab (type All)
+                webbrowser.open_new_tab(value)
+            elif kind == "cancelled":
+                self.progress_label.configure(text="Cancelled")
+            else:
+                self.progress_label.configure(text="Failed")
+                messagebox.showerror("SMARCA5", value)
+            return
+        self.master.after(PROGRESS_POLL_INTERVAL, self.poll_progress)
 
+    def show_progress(self, stage, done, total) -> None:
+        """
+        Update progress bar and label.
 
-def delete_html_files():
-    print("Delete html files")
-    files = glob.glob(load_file(r"html_files\*"))
-    for f in files:
-        if f != load_file(r"html_files\index.html") and f != load_file(
-            r"html_files\style.css"
-        ):
-            os.remove(f)
+        :param stage: one of progress.STAGES
+        :param done: amount of finished parts of stage
+        :param total: amount of all parts of stage
+        :return: None
+        """
+        stage_number = progress.STAGES.index(stage)
+        self.progress_bar.configure(
+            value=100 * (stage_number + done / total) / len(progress.STAGES)
+        )
+        description = STAGE_DESCRIPTIONS[stage]
+        if total > 1:
+            description = f"{description} ({done}/{total})"
+        self.progress_label.configure(text=description)
@@ -1,14 +1,58 @@
 """Alignment class."""
 import re
+from collections import deque
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+import instrumentation
+import protein_index
+from peptide_table import PeptideTable
 
 GROUP_PATTERN = re.compile(r"(.*_\D*)")
+# columns set by search
+POSITION_COLUMNS = ("Start", "End", "Mismatches")
+SEARCH_ENGINES = ("aho-corasick", "kmp", "fm-index")
+# name of search used instead of engine when matching is tolerant
+TOLERANT_SEARCH = "bit-parallel"
+# residues which mass spectrometry does not distinguish
+ISOBARIC_RESIDUES = "IL"
 
 
 class Alignment:
-
-    def __init__(self, protein_seq, peptides_metadata):
+    def __init__(
+        self,
+        protein_seq,
+        peptides_metadata,
+        search_engine="aho-corasick",
+        deduplicate=True,
+        max_mismatches=0,
+        equivalent_residues=(),
+    ):
+        if search_engine not in SEARCH_ENGINES:
+            raise ValueError(
+                f"Unknown search engine {search_engine!r}, "
+                f"expected one of {SEARCH_ENGINES}"
+            )
+        if max_mismatches < 0:
+            raise ValueError(
+                f"Amount of mismatches must not be negative: {max_mismatches}"
+            )
         self.protein_seq = protein_seq
+        self.search_engine = search_engine
+        self.deduplicate = deduplicate
+        self.max_mismatches = max_mismatches
+        # strings of residues matched by each other (like "IL")
+        self.equivalent_residues = tuple(equivalent_residues)
+        # peptide sequence -> mismatches of its reported occurrence
+        self.mismatches_of_peptides: dict[str, int] = {}
         self.peptides_metadata = peptides_metadata
+        self.unmatched_peptides = peptides_metadata.iloc[0:0]
+        # matched peptides used by report stages (set by search)
+        self.peptide_table: Optional[PeptideTable] = None
+        # type of experiment -> group or sample name -> row positions
+        self.experiment_index: dict[str, dict[str, np.ndarray]] = {}
         self.amount_of_the_same_peptides = {}
         self.list_of_peptides_from_max_amount_to_min = []
         self.sample_names = (
@@ -21,55 +65,439 @@ class Alignment:
 
     def find_group_names(self):
         return list(
-            {
-                GROUP_PATTERN.search(sample_name).group(1)
-                for sample_name in self.sample_names
-            }
+            {find_group_name(sample_name) for sample_name in self.sample_names}
         )
 
+    def create_experiment_index(self) -> None:
+        """
+        Map every group and sample to row positions of peptides_metadata.
+
+        :return: None
+        """
+        experiments = self.peptides_metadata["Experiment"]
+        sample_rows = experiments.groupby(
+            experiments, sort=False, observed=True
+        ).indices
+        group_rows: dict[str, list[np.ndarray]] = {}
+        for sample_name, rows in sample_rows.items():
+            group_rows.setdefault(find_group_name(sample_name), []).append(
+                rows
+            )
+        self.experiment_index = {
+            "group": {
+                group_name: np.sort(np.concatenate(rows))
+                for group_name, rows in group_rows.items()
+            },
+            "sample": dict(sample_rows),
+        }
+        self.experiment_index["group"]["All"] = np.arange(len(experiments))
+
+    @property
+    def is_tolerant(self) -> bool:
+        """True if peptides are matched with mismatches or equivalences."""
+        return self.max_mismatches > 0 or bool(self.equivalent_residues)
+
+    def peptides_of_experiment(self, type_of_experiment, experiment):
+        """
+        Select peptides of one group or sample.
+
+        :param type_of_experiment: "group" or "sample"
+        :param experiment: group or sample name ("All" means every peptide)
+        :return: DataFrame with peptides of experiment
+        """
+        rows = self.experiment_index[type_of_experiment].get(
+            experiment, np.array([], dtype=np.int64)
+        )
+        return self.peptides_metadata.iloc[rows]
+
+    def peptide_table_of_experiment(
+        self, type_of_experiment, experiment
+    ) -> PeptideTable:
+        """
+        Select peptides of one group or sample from peptide table.
+
+        :param type_of_experiment: "group" or "sample"
+        :param experiment: group or sample name ("All" means every peptide)
+        :return: PeptideTable object with peptides of experiment
+        """
+        rows = self.experiment_index[type_of_experiment].get(
+            experiment, np.array([], dtype=np.int64)
+        )
+        return self.peptide_table.take(rows)
+
     def search_peptide_in_protein_seq(self) -> None:
         """
-        KMP (Knuth–Morris–Pratt algorithm) for pattern searching.
-
-        """
-        # index is not used by neccesacry to iter thorugh pepitde
-        protein_seq_len = len(self.protein_seq)
-        for index, peptide in self.peptides_metadata.iterrows():
-            peptide_seq_len = len(peptide.Sequence)
-
-            lps = create_lps(peptide.Sequence, peptide_seq_len)
-            i = 0
-            j = 0
-
-            while (protein_seq_len - i) >= (peptide_seq_len - j):
-                if j == peptide_seq_len:
-                    peptide["Start"] = i - j
-                    peptide["End"] = i  # TODO: -1 is correct ? check it
-                    if peptide["Sequence"] in self.amount_of_the_same_peptides:
-                        self.amount_of_the_same_peptides[
-                            peptide["Sequence"]
-                        ] += 1
-                    else:
-                        self.amount_of_the_same_peptides[
-                            peptide["Sequence"]
-                        ] = 1
-                    j = lps[j - 1]
-                elif self.protein_seq[i] == peptide.Sequence[j]:
-                    i += 1
-                    j += 1
-                elif j > 0:
-                    j = lps[j - 1]
-                else:
-                    i += 1
-        self.peptides_metadata = self.peptides_metadata.sort_values("Start")
+        Find position of every peptide in protein sequence.
+
+        Default engine builds one Aho-Corasick automaton over all distinct
+        peptide sequences and scans protein sequence once. KMP
+        (Knuth–Morris–Pratt algorithm) engine scans protein sequence
+        separately for every peptide. FM-index engine looks up every distinct
+        peptide in index of protein sequence cached on disk. Every engine sets
+        Start/End of the last occurrence and counts every occurrence of
+        peptide. Peptides not found in protein sequence are moved to
+        unmatched_peptides.
+
+        Tolerant matching (mismatches or equivalent residues) uses
+        bit-parallel search instead of selected engine, the occurrence with
+        the fewest mismatches is set and Mismatches column holds their
+        amount.
+        """
+        instrumentation.count("peptide_rows", len(self.peptides_metadata))
+        search_name = (
+            TOLERANT_SEARCH if self.is_tolerant else self.search_engine
+        )
+        with instrumentation.stage(f"search ({search_name})"):
+            if self.deduplicate:
+                self.search_unique_peptides()
+            else:
+                self.search_every_peptide()
+        is_matched = self.peptides_metadata["Start"] != ""
+        self.unmatched_peptides = self.peptides_metadata.loc[~is_matched]
+        self.peptides_metadata = (
+            self.peptides_metadata.loc[is_matched]
+            .astype({"Start": "int64", "End": "int64", "Mismatches": "int64"})
+            .sort_values(["Start", "Sequence"], kind="stable")
+        )
+        with instrumentation.stage("experiment index"):
+            self.create_experiment_index()
+        with instrumentation.stage("peptide table"):
+            self.peptide_table = PeptideTable.from_dataframe(
+                self.peptides_metadata
+            )
         self.list_of_peptides_from_max_amount_to_min = sorted(
             self.amount_of_the_same_peptides,
             key=self.amount_of_the_same_peptides.get,
             reverse=True,
         )  # type: ignore
 
+    def find_occurrences(
+        self, peptide_seqs: Iterable[str]
+    ) -> dict[str, list[int]]:
+        """
+        Find every occurrence of distinct peptides with selected engine.
+
+        Tolerant matching also fills mismatches_of_peptides.
+
+        :param peptide_seqs: distinct peptide sequences
+        :return: dictionary where key is peptide sequence and value is list
+        of start positions in ascending order (tolerant matching orders them
+        from the most to the fewest mismatches), the last one is reported
+        """
+        if self.is_tolerant:
+            return self.find_tolerant_occurrences(peptide_seqs)
+        if self.search_engine == "aho-corasick":
+            return AhoCorasick(peptide_seqs).search(self.protein_seq)
+        if self.search_engine == "fm-index":
+            index = protein_index.ProteinIndex.load_or_build(self.protein_seq)
+            return {
+                peptide_seq: index.search(peptide_seq)
+                for peptide_seq in peptide_seqs
+            }
+        return {
+            peptide_seq: kmp_search(self.protein_seq, peptide_seq)
+            for peptide_seq in peptide_seqs
+        }
+
+    def find_tolerant_occurrences(
+        self, peptide_seqs: Iterable[str]
+    ) -> dict[str, list[int]]:
+        """
+        Find every approximate occurrence of distinct peptides.
+
+        :param peptide_seqs: distinct peptide sequences
+        :return: dictionary like find_occurrences
+        """
+        hits = BitParallelMatcher(
+            peptide_seqs, self.max_mismatches, self.equivalent_residues
+        ).search(self.protein_seq)
+        occurrences = {}
+        for peptide_seq, peptide_hits in hits.items():
+            # stable sort keeps ascending starts of equally good hits, so the
+            # last of the best hits is reported (like in exact search)
+            peptide_hits.sort(key=lambda hit: -hit[1])
+            occurrences[peptide_seq] = [start for start, _ in peptide_hits]
+            self.mismatches_of_peptides[peptide_seq] = peptide_hits[-1][1]
+        return occurrences
+
+    def search_unique_peptides(self) -> None:
+        """
+        Search every distinct peptide once and merge positions to all rows.
+
+        :return: None
+        """
+        peptide_seqs = self.peptides_metadata["Sequence"].unique()
+        instrumentation.count("peptides_searched", len(peptide_seqs))
+        occurrences = self.find_occurrences(peptide_seqs)
+        found_peptide_seqs = [
+            peptide_seq
+            for peptide_seq in peptide_seqs
+            if occurrences.get(peptide_seq)
+        ]
+        starts = [occurrences[seq][-1] for seq in found_peptide_seqs]
+        positions = pd.DataFrame(
+            {
+                "Start": starts,
+                "End": [
+                    start + len(seq)
+                    for start, seq in zip(starts, found_peptide_seqs)
+                ],
+                "Mismatches": [
+                    self.mismatches_of_peptides.get(seq, 0)
+                    for seq in found_peptide_seqs
+                ],
+            },
+            index=pd.Index(found_peptide_seqs, name="Sequence"),
+            dtype=object,
+        )
+        self.peptides_metadata = self.peptides_metadata.drop(
+            columns=list(POSITION_COLUMNS), errors="ignore"
+        ).join(positions, on="Sequence")
+        self.peptides_metadata[
+            list(POSITION_COLUMNS)
+        ] = self.peptides_metadata[list(POSITION_COLUMNS)].fillna("")
+        amount_of_rows = self.peptides_metadata["Sequence"].value_counts()
+        amount_of_occurrences = pd.Series(
+            [len(occurrences[seq]) for seq in found_peptide_seqs],
+            index=found_peptide_seqs,
+            dtype="int64",
+        )
+        self.amount_of_the_same_peptides = (
+            amount_of_rows.reindex(found_peptide_seqs) * amount_of_occurrences
+        ).to_dict()
+
+    def search_every_peptide(self) -> None:
+        """
+        Search every row of peptides separately.
+
+        :return: None
+        """
+        instrumentation.count("peptides_searched", len(self.peptides_metadata))
+        use_kmp = self.search_engine == "kmp" and not self.is_tolerant
+        if not use_kmp:
+            occurrences = self.find_occurrences(
+                self.peptides_metadata["Sequence"].unique()
+            )
+        self.peptides_metadata["Mismatches"] = ""
+        start_column = self.peptides_metadata.columns.get_loc("Start")
+        end_column = self.peptides_metadata.columns.get_loc("End")
+        mismatches_column = self.peptides_metadata.columns.get_loc(
+            "Mismatches"
+        )
+        for position, peptide_seq in enumerate(
+            self.peptides_metadata["Sequence"]
+        ):
+            if use_kmp:
+                starts = kmp_search(self.protein_seq, peptide_seq)
+            else:
+                starts = occurrences.get(peptide_seq, [])
+            if not starts:
+                continue
+            self.peptides_metadata.iat[position, start_column] = starts[-1]
+            self.peptides_metadata.iat[position, end_column] = starts[
+                -1
+            ] + len(peptide_seq)
+            self.peptides_metadata.iat[
+                position, mismatches_column
+            ] = self.mismatches_of_peptides.get(peptide_seq, 0)
+            self.amount_of_the_same_peptides[
+                peptide_seq
+            ] = self.amount_of_the_same_peptides.get(peptide_seq, 0) + len(
+                starts
+            )
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton for searching many peptides at once."""
+
+    def __init__(self, peptide_seqs: Iterable[str]):
+        # node 0 is root, every node is dict: amino acid -> next node
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.output: list[list[str]] = [[]]
+        for peptide_seq in peptide_seqs:
+            if peptide_seq:
+                self.add_peptide(peptide_seq)
+        self.create_fail_links()
+
+    def add_peptide(self, peptide_seq: str) -> None:
+        """
+        Add peptide sequence to trie.
+
+        :param peptide_seq: peptide sequence
+        :return: None
+        """
+        node = 0
+        for amino_acid in peptide_seq:
+            next_node = self.goto[node].get(amino_acid)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][amino_acid] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = next_node
+        if peptide_seq not in self.output[node]:
+            self.output[node].append(peptide_seq)
+
+    def create_fail_links(self) -> None:
+        """
+        Create fail links (breadth-first) and merge outputs of fail nodes.
+
+        :return: None
+        """
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for amino_acid, next_node in self.goto[node].items():
+                queue.append(next_node)
+                fail_node = self.fail[node]
+                while fail_node and amino_acid not in self.goto[fail_node]:
+                    fail_node = self.fail[fail_node]
+                self.fail[next_node] = self.goto[fail_node].get(amino_acid, 0)
+                self.output[next_node] = (
+                    self.output[next_node] + self.output[self.fail[next_node]]
+                )
+
+    def search(self, protein_seq: str) -> dict[str, list[int]]:
+        """
+        Find every occurrence of every peptide in one pass.
+
+        :param protein_seq: protein sequence
+        :return: dictionary where key is peptide sequence and value is list
+        of start positions in ascending order
+        """
+        occurrences: dict[str, list[int]] = {}
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        node = 0
+        for i, amino_acid in enumerate(protein_seq):
+            while node and amino_acid not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(amino_acid, 0)
+            for peptide_seq in output[node]:
+                occurrences.setdefault(peptide_seq, []).append(
+                    i + 1 - len(peptide_seq)
+                )
+        return occurrences
+
+
+class BitParallelMatcher:
+    """
+    Bit-parallel (Shift-And) search of many peptides with mismatches.
+
+    Peptides are concatenated into one bit vector (Python int). Bit of
+    peptide position is set in state j while prefix of peptide ending there
+    matches protein sequence with at most j mismatches, so one amino acid of
+    protein sequence costs O(k * total length of peptides / word size).
+    Equivalent residues share their masks. Peptide has at most (its length
+    - 1) mismatches, so peptide not longer than k does not match every
+    position of protein sequence.
+    """
+
+    def __init__(
+        self,
+        peptide_seqs: Iterable[str],
+        max_mismatches: int = 0,
+        equivalent_residues: Iterable[str] = (),
+    ):
+        self.max_mismatches = max_mismatches
+        peptide_seqs = list(dict.fromkeys(seq for seq in peptide_seqs if seq))
+        lengths = np.array([len(seq) for seq in peptide_seqs], dtype=np.int64)
+        ends = np.cumsum(lengths)
+        self.number_of_bits = int(ends[-1]) if len(ends) else 0
+        self.start_mask = self.create_mask(ends - lengths)
+        self.end_mask = self.create_mask(ends - 1)
+        self.all_mask = (1 << self.number_of_bits) - 1
+        # bit of the last position of peptide -> peptide sequence
+        self.peptides_of_end_bits = dict(
+            zip((ends - 1).tolist(), peptide_seqs)
+        )
+        residues = np.frombuffer(
+            "".join(peptide_seqs).encode("utf-32-le"), dtype=np.uint32
+        )
+        self.masks: dict[str, int] = {
+            chr(residue): self.create_mask(np.flatnonzero(residues == residue))
+            for residue in np.unique(residues).tolist()
+        }
+        for residue_class in equivalent_residues:
+            class_mask = 0
+            for residue in residue_class:
+                class_mask |= self.masks.get(residue, 0)
+            for residue in residue_class:
+                self.masks[residue] = class_mask
+
+    def create_mask(self, positions: np.ndarray) -> int:
+        """
+        Create bit vector with bits set at positions.
+
+        :param positions: positions of set bits
+        :return: bit vector
+        """
+        bits = np.zeros(self.number_of_bits, dtype=bool)
+        bits[positions] = True
+        return int.from_bytes(
+            np.packbits(bits, bitorder="little").tobytes(), "little"
+        )
+
+    def search(self, protein_seq: str) -> dict[str, list[tuple[int, int]]]:
+        """
+        Find every occurrence of every peptide with at most k mismatches.
+
+        :param protein_seq: protein sequence
+        :return: dictionary where key is peptide sequence and value is list
+        of (start position, amount of mismatches) in ascending order of
+        start
+        """
+        hits: dict[str, list[tuple[int, int]]] = {}
+        masks = self.masks
+        start_mask = self.start_mask
+        end_mask = self.end_mask
+        all_mask = self.all_mask
+        states = [0] * (self.max_mismatches + 1)
+        for i, amino_acid in enumerate(protein_seq):
+            mask = masks.get(amino_acid, 0)
+            previous_shifted = 0
+            for j, state in enumerate(states):
+                shifted = (state << 1) | start_mask
+                if j:
+                    # mismatch: previous state advances without match
+                    states[j] = (shifted & mask) | (
+                        previous_shifted & all_mask
+                    )
+                else:
+                    states[j] = shifted & mask
+                previous_shifted = shifted
+            found = states[-1] & end_mask
+            while found:
+                end_bit = found & -found
+                found ^= end_bit
+                mismatches = next(
+                    j for j, state in enumerate(states) if state & end_bit
+                )
+                peptide_seq = self.peptides_of_end_bits[
+                    end_bit.bit_length() - 1
+                ]
+                if mismatches >= len(peptide_seq):
+                    continue
+                hits.setdefault(peptide_seq, []).append(
+                    (i + 1 - len(peptide_seq), mismatches)
+                )
+        return hits
+
 
 # Static functions
+def find_group_name(sample_name: str) -> str:
+    """
+    Find group name of sample (<groupName>_<treatmentType><sampleNumber>).
+
+    :param sample_name: sample name
+    :return: group name (<groupName>_<treatmentType>)
+    """
+    return GROUP_PATTERN.search(sample_name).group(1)
+
+
 def create_lps(peptide_seq: str, peptide_seq_len: int) -> list[int]:
     """
     Create lps table.
@@ -95,3 +523,33 @@ def create_lps(peptide_seq: str, peptide_seq_len: int) -> list[int]:
             i += 1
 
     return lps
+
+
+def kmp_search(protein_seq: str, peptide_seq: str) -> list[int]:
+    """
+    KMP (Knuth–Morris–Pratt algorithm) for pattern searching.
+
+    :param protein_seq: protein sequence
+    :param peptide_seq: peptide sequence
+    :return: list of start positions of peptide in ascending order
+    """
+    protein_seq_len = len(protein_seq)
+    peptide_seq_len = len(peptide_seq)
+    lps = create_lps(peptide_seq, peptide_seq_len)
+    starts = []
+    i = 0
+    j = 0
+
+    while (protein_seq_len - i) >= (peptide_seq_len - j):
+        if j == peptide_seq_len:
+            starts.append(i - j)
+            j = lps[j - 1]
+        elif protein_seq[i] == peptide_seq[j]:
+            i += 1
+            j += 1
+        elif j > 0:
+            j = lps[j - 1]
+        else:
+            i += 1
+
+    return starts
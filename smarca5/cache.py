@@ -0,0 +1,48 @@
+"""Disk cache helpers."""
+import hashlib
+import os
+
+CACHE_DIR_ENV_VARIABLE = "SMARCA5_CACHE_DIR"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def cache_dir(*subdirs: str) -> str:
+    """
+    Return (and create) directory inside SMARCA5 cache.
+
+    Cache is placed in ~/.smarca5/cache unless SMARCA5_CACHE_DIR
+    environment variable points somewhere else.
+
+    :param subdirs: names of nested directories inside cache
+    :return: path of directory
+    """
+    base_dir = os.environ.get(CACHE_DIR_ENV_VARIABLE) or os.path.join(
+        os.path.expanduser("~"), ".smarca5", "cache"
+    )
+    directory = os.path.join(base_dir, *subdirs)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def hash_text(text: str) -> str:
+    """
+    Calculate content hash of text.
+
+    :param text: text to hash
+    :return: sha256 hex digest
+    """
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    Calculate content hash of file.
+
+    :param path: path to file
+    :return: sha256 hex digest
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -0,0 +1,305 @@
+"""Command line interface (no GUI)."""
+import argparse
+import os
+import sys
+
+# no display is needed to render color bars
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import alignment  # noqa: E402
+import instrumentation  # noqa: E402
+import legend  # noqa: E402
+import pipeline  # noqa: E402
+import proteome  # noqa: E402
+import runs  # noqa: E402
+
+
+def positive_int(value: str) -> int:
+    """
+    Convert argument to integer greater than 0.
+
+    :param value: text of argument
+    :return: integer
+    """
+    number = non_negative_int(value)
+    if number == 0:
+        raise argparse.ArgumentTypeError(f"{value!r} is not greater than 0")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    """
+    Convert argument to integer not less than 0.
+
+    :param value: text of argument
+    :return: integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"{value!r} is not an integer"
+        ) from None
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value!r} is negative")
+    return number
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create parser of command line arguments.
+
+    :return: ArgumentParser object
+    """
+    parser = argparse.ArgumentParser(
+        prog="smarca5",
+        description="Find peptides in protein sequence and write report.",
+    )
+    display_options = argparse.ArgumentParser(add_help=False)
+    display_options.add_argument(
+        "--line-length",
+        type=positive_int,
+        default=pipeline.DEFAULT_LINE_LENGTH,
+        help="amount of amino acids in one line",
+    )
+    display_options.add_argument(
+        "--interline",
+        type=positive_int,
+        default=pipeline.DEFAULT_INTERLINE,
+        help="space between lines in pixels",
+    )
+    display_options.add_argument(
+        "--engine",
+        dest="search_engine",
+        choices=alignment.SEARCH_ENGINES,
+        default="aho-corasick",
+        help="peptide search engine",
+    )
+    display_options.add_argument(
+        "--compact",
+        action="store_true",
+        help="write smaller pages (css classes instead of inline styles)",
+    )
+    display_options.add_argument(
+        "--gzip",
+        dest="compress",
+        action="store_true",
+        help="write pages as .html.gz files (for server which sends "
+        "precompressed files)",
+    )
+    display_options.add_argument(
+        "--mismatches",
+        dest="max_mismatches",
+        type=non_negative_int,
+        default=0,
+        help="maximal amount of mismatches of peptide (bit-parallel search "
+        "is used instead of engine)",
+    )
+    display_options.add_argument(
+        "--equivalent",
+        dest="equivalent_residues",
+        action="append",
+        metavar="RESIDUES",
+        help=f"residues matched by each other, like "
+        f"{alignment.ISOBARIC_RESIDUES} (can be repeated)",
+    )
+    display_options.add_argument(
+        "--page-workers",
+        type=non_negative_int,
+        default=1,
+        help="amount of processes writing pages of one analysis "
+        "(0: amount of CPUs)",
+    )
+    display_options.add_argument(
+        "--legend",
+        dest="legend_format",
+        choices=legend.LEGEND_FORMATS,
+        default="svg",
+        help="color bar inside page (svg) or as image file (png)",
+    )
+    display_options.add_argument(
+        "--mode",
+        dest="report_mode",
+        choices=pipeline.REPORT_MODES,
+        default="pages",
+        help="html file for every group and sample (pages), one html file "
+        "with data file (single) or pages with peptide depth heatmap "
+        "(density)",
+    )
+    display_options.add_argument(
+        "--window-size",
+        type=non_negative_int,
+        default=0,
+        help="amount of residues written into one html file of long protein "
+        "(0: whole protein in one file)",
+    )
+    display_options.add_argument(
+        "--trace",
+        help="save time, peak memory and counters of analysis stages to this "
+        f"file (default: {instrumentation.TRACE_ENV_VARIABLE} variable)",
+    )
+    display_options.add_argument(
+        "--trace-format",
+        choices=instrumentation.TRACE_FORMATS,
+        default="json",
+        help="format of trace, chrome can be opened in chrome://tracing",
+    )
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument(
+        "--reuse",
+        action="store_true",
+        help="analysis without output directory reuses the last run of the "
+        "same input files, only changed pages are rewritten",
+    )
+    run_options.add_argument(
+        "--keep-runs",
+        type=non_negative_int,
+        help="remove all but this amount of the most recent runs (default: "
+        f"{runs.KEEP_RUNS_ENV_VARIABLE} variable)",
+    )
+    run_options.add_argument(
+        "--max-run-age",
+        type=float,
+        metavar="DAYS",
+        help="remove runs not used for this amount of days (default: "
+        f"{runs.MAX_RUN_AGE_ENV_VARIABLE} variable)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", parents=[display_options, run_options], help="run one analysis"
+    )
+    run_parser.add_argument("--fasta", required=True, help="protein fasta")
+    run_parser.add_argument("--peptides", required=True, help="peptide file")
+    run_parser.add_argument(
+        "--output",
+        help="report directory (default: new run directory in "
+        f"{runs.RUNS_DIR_ENV_VARIABLE} or ~/.smarca5/runs)",
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        parents=[display_options, run_options],
+        help="run analyses listed in manifest",
+    )
+    batch_parser.add_argument(
+        "manifest",
+        help="csv file with fasta, peptides, output_dir columns (empty "
+        "output_dir: new run directory)",
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="amount of worker processes (default: amount of CPUs)",
+    )
+
+    proteome_parser = subparsers.add_parser(
+        "proteome",
+        parents=[display_options],
+        help="write report of every protein claimed by peptides",
+    )
+    proteome_parser.add_argument(
+        "--fasta", required=True, help="multi-record protein fasta"
+    )
+    proteome_parser.add_argument(
+        "--peptides", required=True, help="peptide file"
+    )
+    proteome_parser.add_argument(
+        "--output",
+        required=True,
+        help="report directory (index.html and directory of every protein)",
+    )
+    proteome_parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="amount of worker processes (default: amount of CPUs)",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    """
+    Run command line interface.
+
+    :param argv: command line arguments (default: sys.argv)
+    :return: exit code
+    """
+    args = create_parser().parse_args(argv)
+    options = {
+        "line_length": args.line_length,
+        "interline": args.interline,
+        "search_engine": args.search_engine,
+        "max_mismatches": args.max_mismatches,
+        "equivalent_residues": tuple(args.equivalent_residues or ()),
+        "page_workers": args.page_workers or None,
+        "legend_format": args.legend_format,
+        "report_mode": args.report_mode,
+        "window_size": args.window_size or None,
+        "compact": args.compact,
+        "compress": args.compress,
+    }
+    if args.trace:
+        instrumentation.enable(args.trace, args.trace_format)
+    else:
+        instrumentation.enable_from_environment()
+    try:
+        if args.command == "proteome":
+            index_path, protein_results = proteome.run_proteome(
+                args.fasta,
+                args.peptides,
+                args.output,
+                workers=args.workers,
+                **options,
+            )
+        elif args.command == "run":
+            jobs = [pipeline.Job(args.fasta, args.peptides, args.output)]
+            results = pipeline.run_batch(
+                jobs, workers=1, reuse_run=args.reuse, **options
+            )
+        else:
+            jobs = pipeline.read_manifest(args.manifest)
+            results = pipeline.run_batch(
+                jobs, workers=args.workers, reuse_run=args.reuse, **options
+            )
+    finally:
+        trace_path = instrumentation.finish()
+    if args.command != "proteome":
+        if args.keep_runs is None and args.max_run_age is None:
+            removed_runs = runs.clean_runs_from_environment()
+        else:
+            removed_runs = runs.clean_runs(args.keep_runs, args.max_run_age)
+        if removed_runs:
+            print(f"Removed {len(removed_runs)} old runs")
+
+    failed = 0
+    if args.command == "proteome":
+        for protein_result in protein_results:
+            if protein_result.error is None:
+                print(f"OK     {protein_result.report_path}")
+            else:
+                failed += 1
+                print(
+                    f"FAILED {protein_result.accession}: "
+                    f"{protein_result.error}"
+                )
+        print(
+            f"{len(protein_results) - failed} of {len(protein_results)} "
+            f"proteins finished, index saved to {index_path}"
+        )
+    else:
+        for result in results:
+            if result.error is None:
+                print(f"OK     {result.report_path}")
+            else:
+                failed += 1
+                print(f"FAILED {result.job.peptides}: {result.error}")
+        print(f"{len(results) - failed} of {len(results)} analyses finished")
+    if trace_path is not None:
+        print(f"Trace saved to {trace_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
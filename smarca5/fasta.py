@@ -0,0 +1,137 @@
+"""Memory-mapped FASTA reader."""
+import mmap
+from typing import Iterator, NamedTuple
+
+WHITESPACE = b" \t\r\n"
+
+
+class FastaRecord(NamedTuple):
+    """Position of one record in FASTA file."""
+
+    name: str
+    description: str
+    offset: int  # byte offset of sequence (first line after header)
+    byte_length: int  # length of sequence lines in bytes (with new lines)
+    length: int  # length of sequence in residues
+
+
+class FastaFile:
+    """
+    FASTA file read lazily one record at a time.
+
+    File is memory-mapped and only record index (name -> byte offset,
+    length) is kept in memory. File without header (plain .txt sequence) is
+    read as one record with empty name.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.mapped_file = mmap.mmap(
+                self.file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            # empty file can not be mapped
+            self.mapped_file = None
+        self.index: dict[str, FastaRecord] = {}
+        if self.mapped_file is not None:
+            self.create_index()
+
+    def __enter__(self) -> "FastaFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        """Yield (name, sequence) of every record in file order."""
+        for name in self.index:
+            yield name, self.sequence(name)
+
+    def close(self) -> None:
+        """Unmap and close file."""
+        if self.mapped_file is not None:
+            self.mapped_file.close()
+        self.file.close()
+
+    @property
+    def names(self) -> list[str]:
+        """Names of records in file order."""
+        return list(self.index)
+
+    def create_index(self) -> None:
+        """
+        Find header and sequence position of every record.
+
+        :return: None
+        """
+        mapped_file = self.mapped_file
+        file_size = len(mapped_file)
+        header_start = 0
+        if mapped_file[:1] != b">":
+            next_header_start = mapped_file.find(b"\n>")
+            sequence_end = (
+                file_size if next_header_start == -1 else next_header_start
+            )
+            if mapped_file[:sequence_end].strip():
+                self.add_record("", "", 0, next_header_start)
+            if next_header_start == -1:
+                return
+            header_start = next_header_start + 1
+        while header_start < file_size:
+            header_end = mapped_file.find(b"\n", header_start)
+            if header_end == -1:
+                header_end = file_size
+            header = (
+                mapped_file[header_start + 1 : header_end].decode().strip()
+            )
+            name, _, description = header.replace("\t", " ").partition(" ")
+            next_header_start = mapped_file.find(b"\n>", header_end)
+            self.add_record(
+                name, description.strip(), header_end + 1, next_header_start
+            )
+            if next_header_start == -1:
+                return
+            header_start = next_header_start + 1
+
+    def add_record(
+        self, name: str, description: str, offset: int, end: int
+    ) -> None:
+        """
+        Add record to index.
+
+        :param name: record name (first word of header)
+        :param description: rest of header
+        :param offset: byte offset of sequence
+        :param end: byte offset where sequence ends (-1 means end of file)
+        :return: None
+        """
+        if name in self.index:
+            raise ValueError(f"Duplicate record {name!r} in {self.path}")
+        if end == -1:
+            end = len(self.mapped_file)
+        offset = min(offset, end)
+        length = len(self.mapped_file[offset:end].translate(None, WHITESPACE))
+        self.index[name] = FastaRecord(
+            name, description, offset, end - offset, length
+        )
+
+    def sequence(self, name: str) -> str:
+        """
+        Read sequence of one record.
+
+        :param name: record name
+        :return: sequence string
+        """
+        record = self.index[name]
+        return (
+            self.mapped_file[
+                record.offset : record.offset + record.byte_length
+            ]
+            .translate(None, WHITESPACE)
+            .decode()
+        )
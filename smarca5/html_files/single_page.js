@@ -0,0 +1,237 @@
+// Renders experiment views of single page report from window.SMARCA5_DATA
+// (written by single_page.py). Layout is the same as in layout.py.
+"use strict";
+
+(function () {
+    var data = window.SMARCA5_DATA;
+    var UNDERLINE_MENU_STYLE =
+        "text-decoration: underline; text-underline-offset: 5px; text-decoration-color:red";
+    var APPROXIMATE_PEPTIDE_STYLE = " font-style: italic;";
+    var membersOfSamples = [];
+
+    function escapeHtml(text) {
+        return String(text)
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;");
+    }
+
+    function membersOfSample(sampleId) {
+        if (membersOfSamples[sampleId] === undefined) {
+            var bytes = atob(data.membership[sampleId]);
+            var members = [];
+            for (var peptideId = 0; peptideId < data.starts.length; peptideId++) {
+                if (bytes.charCodeAt(peptideId >> 3) & (1 << (peptideId & 7))) {
+                    members.push(peptideId);
+                }
+            }
+            membersOfSamples[sampleId] = members;
+        }
+        return membersOfSamples[sampleId];
+    }
+
+    function samplesOfExperiment(typeOfExperiment, experiment) {
+        if (typeOfExperiment === "sample") {
+            var sampleId = data.samples.indexOf(experiment);
+            return sampleId === -1 ? [] : [sampleId];
+        }
+        if (experiment === "All") {
+            return data.samples.map(function (sample, sampleId) {
+                return sampleId;
+            });
+        }
+        return data.groups[experiment] || [];
+    }
+
+    // the same colors as colour.Color.range_to (linear scale of hsl)
+    function createColorScale(amounts) {
+        var begin = data.colorScale[0];
+        var end = data.colorScale[1];
+        if (amounts.length === 1) {
+            amounts = [amounts[0], amounts[0] + 1];
+        }
+        var steps = amounts.length - 1;
+        return amounts.map(function (amount, index) {
+            var hsl = [0, 1, 2].map(function (i) {
+                return steps > 0
+                    ? begin[i] + ((end[i] - begin[i]) * index) / steps
+                    : begin[i];
+            });
+            return [
+                amount,
+                "hsl(" + (hsl[0] * 360).toFixed(2) + ", " +
+                    (hsl[1] * 100).toFixed(2) + "%, " +
+                    (hsl[2] * 100).toFixed(2) + "%)",
+            ];
+        });
+    }
+
+    function createColorBarDataUri(colorScale) {
+        var barHeight = 380;
+        var bandHeight = barHeight / Math.max(colorScale.length, 1);
+        var elements = ['<rect width="100" height="400" fill="white"/>'];
+        colorScale.forEach(function (amountColor, index) {
+            var bandTop = 10 + barHeight - (index + 1) * bandHeight;
+            elements.push(
+                '<rect x="10" y="' + bandTop.toFixed(2) + '" width="22" height="' +
+                    bandHeight.toFixed(2) + '" fill="' + amountColor[1] + '"/>'
+            );
+        });
+        [0].concat(colorScale.map(function (amountColor) {
+            return amountColor[0];
+        })).forEach(function (bound, index) {
+            var boundY = 10 + barHeight - index * bandHeight;
+            elements.push(
+                '<text x="36" y="' + (boundY + 4).toFixed(2) +
+                    '" font-size="10" font-family="sans-serif">' + bound + "</text>"
+            );
+        });
+        elements.push(
+            '<rect x="10" y="10" width="22" height="380" fill="none" stroke="black"/>',
+            '<text x="85" y="200" font-size="11" font-family="sans-serif" ' +
+                'text-anchor="middle" transform="rotate(-90 85 200)">Amount of peptide</text>'
+        );
+        return "data:image/svg+xml;charset=utf-8," + encodeURIComponent(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="400">' +
+                elements.join("") + "</svg>"
+        );
+    }
+
+    // peptides (sorted by start) are placed on the lowest free track
+    function placePeptides(peptideIds) {
+        var lineLength = data.lineLength;
+        var numberOfLines = Math.ceil(data.protein.length / lineLength);
+        var lines = [];
+        var transfers = [];
+        var next = 0;
+        var lineTop = 0;
+        for (var line = 0; line < numberOfLines; line++) {
+            var lineStart = line * lineLength;
+            var lineEnd = lineStart + lineLength;
+            var linePeptides = transfers;
+            while (next < peptideIds.length && data.starts[peptideIds[next]] < lineEnd) {
+                var peptideId = peptideIds[next];
+                var start = data.starts[peptideId];
+                linePeptides.push({
+                    peptideId: peptideId,
+                    start: start,
+                    end: start + data.sequences[peptideId].length,
+                    sequence: data.sequences[peptideId],
+                });
+                next++;
+            }
+            transfers = [];
+            var trackEnds = [];
+            var placedPeptides = [];
+            linePeptides.forEach(function (peptide) {
+                var track = 0;
+                while (track < trackEnds.length && trackEnds[track] > peptide.start) {
+                    track++;
+                }
+                var displayedEnd = Math.min(peptide.end, lineEnd);
+                trackEnds[track] = displayedEnd;
+                if (peptide.end > lineEnd) {
+                    transfers.push({
+                        peptideId: peptide.peptideId,
+                        start: lineEnd,
+                        end: peptide.end,
+                        sequence: peptide.sequence.slice(lineEnd - peptide.start),
+                    });
+                }
+                placedPeptides.push({
+                    peptideId: peptide.peptideId,
+                    top: lineTop + (track + 1) * data.interline,
+                    left: peptide.start - lineStart,
+                    sequence: peptide.sequence.slice(0, displayedEnd - peptide.start),
+                });
+            });
+            lines.push({top: lineTop, peptides: placedPeptides});
+            lineTop += (Math.max(trackEnds.length, 1) + 1) * data.interline;
+        }
+        return lines;
+    }
+
+    function render() {
+        var pageId = decodeURIComponent(location.hash.slice(1)) || "type_group-All";
+        var match = /^type_(group|sample)-(.*)$/.exec(pageId) || [null, "group", "All"];
+        var typeOfExperiment = match[1];
+        var experiment = match[2];
+
+        var amounts = new Array(data.starts.length).fill(0);
+        var experiments = [];
+        samplesOfExperiment(typeOfExperiment, experiment).forEach(function (sampleId) {
+            var counts = data.counts[sampleId];
+            membersOfSample(sampleId).forEach(function (peptideId) {
+                amounts[peptideId] += counts[peptideId] || 1;
+                (experiments[peptideId] = experiments[peptideId] || []).push(
+                    data.samples[sampleId]
+                );
+            });
+        });
+        var peptideIds = [];
+        amounts.forEach(function (amount, peptideId) {
+            if (amount > 0) {
+                peptideIds.push(peptideId);
+            }
+        });
+        var distinctAmounts = Array.from(new Set(peptideIds.map(function (peptideId) {
+            return amounts[peptideId];
+        }))).sort(function (a, b) {
+            return a - b;
+        });
+        var colorScale = distinctAmounts.length ? createColorScale(distinctAmounts) : [];
+        var colorOfAmount = {};
+        colorScale.forEach(function (amountColor) {
+            colorOfAmount[amountColor[0]] = amountColor[1];
+        });
+
+        var html = [];
+        placePeptides(peptideIds).forEach(function (line, lineIndex) {
+            html.push(
+                '<span style="color: #EEEEEE; left: ' + data.textLeftOffset + "ch; top: " +
+                    line.top + 'px">' +
+                    escapeHtml(data.protein.slice(
+                        lineIndex * data.lineLength, (lineIndex + 1) * data.lineLength
+                    )) + "</span>"
+            );
+            line.peptides.forEach(function (peptide) {
+                var peptideId = peptide.peptideId;
+                var proteins = data.proteins[data.proteinIds[peptideId]].split(";");
+                var color = colorOfAmount[amounts[peptideId]];
+                var isUnique = proteins.length === 1;
+                var mismatches = data.mismatches[peptideId] || 0;
+                var tooltip =
+                    "Sequence: " + data.sequences[peptideId] + "\n" +
+                    "Proteins: " + proteins.join(", ") + "\n" +
+                    "Unique: " + (isUnique ? "True" : "False") + "\n" +
+                    "Experiment: " + experiments[peptideId].join(", ") + "\n" +
+                    "Amount: " + amounts[peptideId] +
+                    (mismatches ? "\nMismatches: " + mismatches : "");
+                html.push(
+                    '<span style="color: ' + color + "; left: " +
+                        (peptide.left + data.textLeftOffset) + "ch; top: " +
+                        peptide.top + "px; text-decoration: " +
+                        (isUnique ? color + " underline" : "none") + ";" +
+                        (mismatches ? APPROXIMATE_PEPTIDE_STYLE : "") + '" title="' +
+                        escapeHtml(tooltip) + '">' + escapeHtml(peptide.sequence) +
+                        "</span>"
+                );
+            });
+        });
+
+        document.title = experiment;
+        document.querySelector("div.center").innerHTML = html.join("\n");
+        document.getElementById("colorBar").src = createColorBarDataUri(colorScale);
+        document.querySelectorAll(".right a").forEach(function (aTag) {
+            if (aTag.getAttribute("href") === "#" + pageId) {
+                aTag.setAttribute("style", UNDERLINE_MENU_STYLE);
+            } else {
+                aTag.removeAttribute("style");
+            }
+        });
+    }
+
+    window.addEventListener("hashchange", render);
+    render();
+})();
@@ -1,15 +1,129 @@
 from copy import deepcopy
 from math import ceil
-import pandas as pd
-from colour import Color
-import matplotlib.pyplot as plt  # type: ignore
-import matplotlib as mpl  # type: ignore
-import re
+from typing import NamedTuple, Optional
 
-UNIQUE_PATTERN = re.compile(r".*Unique: (.*)\n.*")
+import numpy as np
+
+import instrumentation
+import layout
+import legend
+import residue_coverage
+
+# style of peptides matched with mismatches or equivalent residues
+APPROXIMATE_PEPTIDE_STYLE = " font-style: italic;"
+# classes of compact pages (defined in style.css), color classes are
+# defined in style element of every page
+PROTEIN_LINE_CLASS = "p"
+UNIQUE_PEPTIDE_CLASS = "u"
+APPROXIMATE_PEPTIDE_CLASS = "a"
+DEPTH_RUN_CLASS = "r"
+COLOR_CLASS_PREFIX = "c"
 UNDERLINE_MENU_STYLE = "text-decoration: underline; text-underline-offset: 5px; text-decoration-color:red"
 
 
+class Span(NamedTuple):
+    """Span of protein line or peptide placed in alignment window."""
+
+    text: str
+    style: str
+    title: Optional[str] = None
+    classes: Optional[str] = None
+
+
+class PeptideInfo(NamedTuple):
+    """Information about peptide sequence displayed in tooltip."""
+
+    proteins: list[str]
+    is_unique: bool
+    experiments: list[str]
+    amount: int
+    tooltip: str
+    mismatches: int = 0
+
+
+def create_page_name(type_of_experiment, experiment, window=0) -> str:
+    """
+    Create name of html file of page (or its window).
+
+    :param type_of_experiment: "group" or "sample"
+    :param experiment: group or sample name
+    :param window: index of window (the first window has name of page)
+    :return: name of html file
+    """
+    if window == 0:
+        return f"type_{type_of_experiment}-{experiment}.html"
+    return f"type_{type_of_experiment}-{experiment}-window{window + 1}.html"
+
+
+def create_position_style(left, top) -> str:
+    """
+    Create inline style of span of compact page (the rest is in classes).
+
+    :param left: position in characters
+    :param top: position in pixels
+    :return: style of span
+    """
+    return f"left:{left}ch;top:{top}px"
+
+
+def create_protein_line_span(
+    protein_line, left, top, compact, title=None
+) -> Span:
+    """
+    Create span of protein line.
+
+    :param protein_line: amino acids of line
+    :param left: position in characters
+    :param top: position in pixels
+    :param compact: True if page uses classes instead of inline styles
+    :param title: tooltip of line
+    :return: Span object
+    """
+    if compact:
+        return Span(
+            protein_line,
+            create_position_style(left, top),
+            title,
+            PROTEIN_LINE_CLASS,
+        )
+    return Span(
+        protein_line, f"color: #EEEEEE; left: {left}ch; top: {top}px", title
+    )
+
+
+def create_color_class_styles(color_scale, color_property) -> str:
+    """
+    Create css of color classes of compact page.
+
+    :param color_scale: list of (amount, color) of page
+    :param color_property: "color" or "background-color"
+    :return: css rules
+    """
+    return "".join(
+        f".{COLOR_CLASS_PREFIX}{index}{{{color_property}:{color}}}"
+        for index, (_, color) in enumerate(color_scale)
+    )
+
+
+def create_windows(protein_seq_len, html_report_config) -> list[range]:
+    """
+    Split protein lines into windows written as separate html files.
+
+    :param protein_seq_len: length of protein sequence
+    :param html_report_config: HtmlReport object
+    :return: list of ranges of protein lines (one range if report is not
+    windowed)
+    """
+    number_of_lines = ceil(protein_seq_len / html_report_config.line_length)
+    lines_per_window = html_report_config.lines_per_window or max(
+        number_of_lines, 1
+    )
+    return [
+        range(start, min(start + lines_per_window, number_of_lines))
+        for start in range(0, max(number_of_lines, 1), lines_per_window)
+    ]
+
+
 class ReportPage:
     def __init__(
         self,
@@ -19,326 +133,353 @@ class ReportPage:
         peptides_from_given_experiment,
         alignment_obj,
     ):
-        self.soup = deepcopy(html_report_config.base_soup)
-        self.number_of_amino_acids_already_display = 0
-        self.first_empty_line_height = (
-            0  # first empty line under already created alignment
-        )
-        self.peptides_already_displayed_info = {}
-        self.df_of_peptides_to_transfer = pd.DataFrame(
-            columns=[
-                "Sequence",
-                "FullSequence",
-                "Proteins",
-                "Experiment",
-                "Start",
-                "End",
-            ]
-        )
-        self.div_center = self.soup.find("div", {"class": "center"})
-        self.soup.title.string = experiment
+        self.layout = None
+        self.spans: list[Span] = []
+        self.experiment = experiment
         self.type_of_experiment = type_of_experiment
         self.peptides_from_given_experiment = peptides_from_given_experiment
         self.alignment_obj = alignment_obj
-        self.color_bar_fig = None
         self.html_report_config = html_report_config
         self.amount_of_peptides = self.count_amount_of_the_same_peptides()
-        self.color_mapped_with_amount = self.create_color_bar_image()
-        self.add_underline_to_menu_element_of_current_experiment()
-
-    def add_underline_to_menu_element_of_current_experiment(self):
-        a_tag = self.soup.find(
-            "a",
-            {
-                "href": {
-                    f"type_{self.type_of_experiment}-{self.soup.title.string}.html"
-                }
-            },
+        with instrumentation.stage("tooltips"):
+            self.peptides_info = self.create_peptides_info()
+        self.color_scale = legend.create_color_scale(
+            tuple(sorted(set(self.amount_of_peptides.values())))
         )
-        a_tag["style"] = UNDERLINE_MENU_STYLE
-
-    def fill_alignment_window(self):
-        number_of_protein_lines = ceil(
-            len(self.alignment_obj.protein_seq)
-            / self.html_report_config.line_length
+        self.color_mapped_with_amount = dict(self.color_scale)
+        self.color_classes_of_amount = {
+            amount: f"{COLOR_CLASS_PREFIX}{index}"
+            for index, (amount, _) in enumerate(self.color_scale)
+        }
+        self.legend_label = legend.LEGEND_LABEL
+        self.windows = create_windows(
+            len(alignment_obj.protein_seq), html_report_config
         )
-        for _ in range(number_of_protein_lines):
-            self.add_next_segment_of_alignment()
-
-    def add_next_segment_of_alignment(self):
-        self.add_next_protein_line()
-        self.add_next_peptides_line()
-
-    def add_next_protein_line(self):
-        span_tag = self.soup.new_tag("span")
-        span_tag["style"] = (
-            f"color: #EEEEEE;"
-            f" left: {self.html_report_config.text_left_offset}ch;"
-            f" top: {self.first_empty_line_height}px"
-        )
-        span_tag.append(
-            self.soup.new_string(
-                self.alignment_obj.protein_seq[
-                    self.number_of_amino_acids_already_display : self.number_of_amino_acids_already_display
-                    + self.html_report_config.line_length
-                ]
-            )
-        )
-        self.number_of_amino_acids_already_display += (
-            self.html_report_config.line_length
-        )
-        self.first_empty_line_height += self.html_report_config.interline
-        self.div_center.append(span_tag)
-
-    def add_next_peptides_line(self):
-        # there should be a function
-        # TODO: list of element to transfer should look the same as peptide
-        for (
-            index,
-            peptide_to_transfer,
-        ) in self.df_of_peptides_to_transfer.iterrows():
-            start = peptide_to_transfer["Start"]
-            end = peptide_to_transfer["End"]
-            current_peptide_height = self.search_peptide_height(
-                start, end, peptide_to_transfer["FullSequence"]
-            )
-            # prepare info ect. about peptide
-            peptide_span_tag = self.create_span_tag_of_peptide(
-                peptide_to_transfer, current_peptide_height, True
-            )
-            self.div_center.append(peptide_span_tag)
-
-        self.df_of_peptides_to_transfer = pd.DataFrame(
-            columns=[
-                "Sequence",
-                "FullSequence",
-                "Proteins",
-                "Experiment",
-                "Start",
-                "End",
-            ]
+        # index of window filled by fill_alignment_window
+        self.window = 0
+
+    @property
+    def page_name(self) -> str:
+        """Name of html file of page (window)."""
+        return create_page_name(
+            self.type_of_experiment, self.experiment, self.window
         )
 
-        peptides_from_a_given_segment = (
-            self.peptides_from_given_experiment.loc[
-                (
-                    self.peptides_from_given_experiment["Start"]
-                    >= self.number_of_amino_acids_already_display
-                    - self.html_report_config.line_length
-                )
-                & (
-                    self.peptides_from_given_experiment["Start"]
-                    < self.number_of_amino_acids_already_display
-                )
-            ]
+    def create_soup(self, image_src):
+        """
+        Create page with BeautifulSoup.
+
+        It is reference implementation of html_renderer module (used in
+        tests of output equivalence).
+
+        :param image_src: source of color bar image
+        :return: BeautifulSoup object of page
+        """
+        soup = deepcopy(self.html_report_config.base_soup)
+        soup.title.string = self.experiment
+        a_tag = soup.find("a", {"href": {self.page_name}})
+        a_tag["style"] = UNDERLINE_MENU_STYLE
+        soup.find("img")["src"] = image_src
+        div_center = soup.find("div", {"class": "center"})
+        for span in self.spans:
+            span_tag = soup.new_tag("span")
+            if span.title is not None:
+                span_tag["title"] = span.title
+            span_tag["style"] = span.style
+            span_tag.append(soup.new_string(span.text))
+            div_center.append(span_tag)
+        return soup
+
+    def create_layout(self) -> layout.TrackLayout:
+        """
+        Place peptides of page under protein lines.
+
+        The same peptide found in many experiments is displayed once.
+
+        :return: TrackLayout object
+        """
+        peptides = self.peptides_from_given_experiment
+        # every sequence has one start, so its first row is displayed
+        displayed_rows = peptides.first_rows_of_sequences()
+        return layout.TrackLayout(
+            len(self.alignment_obj.protein_seq),
+            self.html_report_config.line_length,
+            self.html_report_config.interline,
+        ).place(
+            peptides.starts[displayed_rows].tolist(),
+            [
+                peptides.sequences[sequence_id]
+                for sequence_id in peptides.sequence_ids[
+                    displayed_rows
+                ].tolist()
+            ],
         )
 
-        for index, peptide in peptides_from_a_given_segment.iterrows():
-            if (
-                peptide["Sequence"] not in self.peptides_already_displayed_info
-                and peptide["Start"]
-                < self.number_of_amino_acids_already_display
-            ):
-                start = peptide["Start"]
-                end = peptide["End"]
-                current_peptide_height = self.search_peptide_height(
-                    start, end, peptide["Sequence"]
-                )
-                # prepare info ect. about peptide
-                peptide_span_tag = self.create_span_tag_of_peptide(
-                    peptide, current_peptide_height
+    def fill_alignment_window(self, window=0):
+        """
+        Create spans of protein lines (and their peptides) of one window.
+
+        Layout of the whole page is created once, windows only select its
+        lines, so peptides at border of windows stay in the same tracks.
+
+        :param window: index of window
+        """
+        if self.layout is None:
+            with instrumentation.stage("layout"):
+                self.layout = self.create_layout()
+        self.window = window
+        self.spans = []
+        lines = self.windows[window]
+        window_top = self.layout.line_tops[lines.start] if lines else 0
+        line_length = self.html_report_config.line_length
+        for line in lines:
+            self.spans.append(
+                create_protein_line_span(
+                    self.alignment_obj.protein_seq[
+                        line * line_length : (line + 1) * line_length
+                    ],
+                    self.html_report_config.text_left_offset,
+                    self.layout.line_tops[line] - window_top,
+                    self.html_report_config.compact,
                 )
-                self.div_center.append(peptide_span_tag)
-        self.first_empty_line_height = (
-            max(
-                [
-                    height
-                    for height, coords in self.peptides_already_displayed_info.values()
-                ],
-                default=self.first_empty_line_height,
             )
-            + self.html_report_config.interline
-        )
-
-        self.peptides_already_displayed_info = {}
+            for placed_peptide in self.layout.peptides_of_lines[line]:
+                self.spans.append(
+                    self.create_span_tag_of_peptide(placed_peptide, window_top)
+                )
+        instrumentation.count("spans", len(self.spans))
 
-    def search_peptide_height(self, start, end, peptide_seq):
-        overlay_peptides_height = []
-        for height, coords in self.peptides_already_displayed_info.values():
-            start_displayed, end_displayed = coords
-            if (start_displayed <= start < end_displayed) or (start_displayed <= end < end_displayed):
-                overlay_peptides_height.append(height)
+    def create_span_tag_of_peptide(self, placed_peptide, window_top=0) -> Span:
+        """
+        Create span of peptide (or its part) placed in protein line.
 
-        if overlay_peptides_height:
-            current_peptide_height = (
-                max(overlay_peptides_height)
-                + self.html_report_config.interline
+        :param placed_peptide: layout.PlacedPeptide object
+        :param window_top: top of the first line of window in pixels
+        :return: Span object
+        """
+        peptide_info = self.peptides_info[placed_peptide.full_sequence]
+        left = placed_peptide.left + self.html_report_config.text_left_offset
+        if self.html_report_config.compact:
+            classes = [self.color_classes_of_amount[peptide_info.amount]]
+            if peptide_info.is_unique:
+                classes.append(UNIQUE_PEPTIDE_CLASS)
+            if peptide_info.mismatches:
+                classes.append(APPROXIMATE_PEPTIDE_CLASS)
+            return Span(
+                placed_peptide.sequence,
+                create_position_style(left, placed_peptide.top - window_top),
+                peptide_info.tooltip,
+                " ".join(classes),
             )
-        else:
-            current_peptide_height = self.first_empty_line_height
-
-        if end >= self.number_of_amino_acids_already_display:
-            end = self.number_of_amino_acids_already_display
-        self.peptides_already_displayed_info[peptide_seq] = [
-            current_peptide_height,
-            (start, end),
-        ]
-        return current_peptide_height
-
-    def create_span_tag_of_peptide(
-        self, peptide, current_peptide_height, is_transfer=False
-    ):
-        span_tag = self.soup.new_tag("span")
-        start_position_in_line_of_peptide = (
-            peptide["Start"] % self.html_report_config.line_length
-        )
-        if not is_transfer:
-            peptide_color = self.color_mapped_with_amount[
-                self.amount_of_peptides[peptide["Sequence"]]
-            ]
-        else:
-            peptide_color = self.color_mapped_with_amount[
-                self.amount_of_peptides[peptide["FullSequence"]]
-            ]
-        tooltip_text = self.create_table_of_information_about_peptide(
-            peptide, is_transfer
-        )
-        span_tag["title"] = tooltip_text
-        unique_bool = UNIQUE_PATTERN.search(tooltip_text)
-        if unique_bool.group(1) == "True":
+        peptide_color = self.color_mapped_with_amount[peptide_info.amount]
+        if peptide_info.is_unique:
             underline = f"{peptide_color} underline"
         else:
             underline = "none"
-
-        span_tag["style"] = (
+        style = (
             f"color: {peptide_color};"
-            f" left: {start_position_in_line_of_peptide + self.html_report_config.text_left_offset}ch;"
-            f" top: {current_peptide_height}px;"
+            f" left: {left}ch;"
+            f" top: {placed_peptide.top - window_top}px;"
             f" text-decoration: {underline};"
         )
-        # seq of peptide displayed if is longer than already displayed protein line
-        if (
-            peptide["Start"]
-            < self.number_of_amino_acids_already_display
-            < peptide["End"]
-        ):
-            peptide_sequence_before_transfer = peptide["Sequence"][
-                : self.number_of_amino_acids_already_display - peptide["Start"]
-            ]
-            span_tag.append(
-                self.soup.new_string(peptide_sequence_before_transfer)
-            )
+        if peptide_info.mismatches:
+            style += APPROXIMATE_PEPTIDE_STYLE
+        return Span(placed_peptide.sequence, style, peptide_info.tooltip)
 
-            # transfer
-            peptide_sequence_after_transfer = peptide["Sequence"][
-                self.number_of_amino_acids_already_display - peptide["Start"] :
-            ]
-            start_coord_after_transfer = (
-                self.number_of_amino_acids_already_display
-            )
+    def create_class_styles(self) -> str:
+        """
+        Create css of color classes used by compact page.
 
-            peptide_to_transfer_data = pd.DataFrame(
-                {
-                    "Sequence": [peptide_sequence_after_transfer],
-                    "FullSequence": [peptide["Sequence"]],
-                    "Proteins": [peptide["Proteins"]],
-                    "Experiment": [peptide["Experiment"]],
-                    "Start": [start_coord_after_transfer],
-                    "End": [peptide["End"]],
-                }
-            )
-            self.df_of_peptides_to_transfer = pd.concat(
-                [self.df_of_peptides_to_transfer, peptide_to_transfer_data]
-            )
-        else:
-            span_tag.append(self.soup.new_string(peptide["Sequence"]))
+        :return: css rules
+        """
+        return create_color_class_styles(self.color_scale, "color")
+
+    def create_peptides_info(self) -> dict[str, PeptideInfo]:
+        """
+        Aggregate information about every peptide sequence of page.
 
-        return span_tag
+        :return: dictionary where key is sequence and value is PeptideInfo
+        """
+        peptides = self.peptides_from_given_experiment
+        first_rows = peptides.first_rows_of_sequences()
+        amounts = peptides.count_sequences()
+        experiments_of_sequences = peptides.experiments_of_sequences()
+        peptides_info = {}
+        for sequence_id, protein_id, mismatches in zip(
+            peptides.sequence_ids[first_rows].tolist(),
+            peptides.protein_ids[first_rows].tolist(),
+            peptides.mismatches[first_rows].tolist(),
+        ):
+            peptide_seq = peptides.sequences[sequence_id]
+            proteins = peptides.proteins[protein_id].split(";")
+            experiments = experiments_of_sequences[sequence_id]
+            amount = int(amounts[sequence_id])
+            peptides_info[peptide_seq] = PeptideInfo(
+                proteins,
+                len(proteins) == 1,
+                experiments,
+                amount,
+                self.create_table_of_information_about_peptide(
+                    peptide_seq, proteins, experiments, amount, mismatches
+                ),
+                mismatches,
+            )
+        return peptides_info
 
+    @staticmethod
     def create_table_of_information_about_peptide(
-        self, current_peptide, is_transfer
+        peptide_seq, proteins, experiments, amount, mismatches=0
     ) -> str:
         """
         Create tooltip with extra information about peptide.
 
-        :param result: peptide list
-        :param current_peptide_seq: peptide sequence
-        about which we want to find additional information
-        :param amount: dictionary where key is sequence and value is amount
-        :param experiment_types: list of all found experiment types
+        :param peptide_seq: peptide sequence
+        :param proteins: list of proteins where peptide appears
+        :param experiments: list of experiments where peptide was found
+        :param amount: how many the same peptides is in this dataset
+        :param mismatches: amount of mismatches of approximate match
         :return: tooltip formated text about peptide extra information
         """
-        if is_transfer:
-            current_peptide_seq = current_peptide["FullSequence"]
-        else:
-            current_peptide_seq = current_peptide["Sequence"]
-        proteins = current_peptide["Proteins"].split(";")
-        if len(proteins) == 1:
-            unique_str = "True"
-        else:
-            unique_str = "False"
-
-        peptide_experiments = []
-        for index, peptide in self.peptides_from_given_experiment.iterrows():
-            if current_peptide_seq == peptide["Sequence"]:
-                if peptide["Experiment"] not in peptide_experiments:
-                    peptide_experiments.append(peptide["Experiment"])
-        # calc how many the same peptides is in this dataset
-        amount = self.amount_of_peptides[current_peptide_seq]
         proteins_str = ", ".join(proteins)
-        peptide_experiments_str = ", ".join(peptide_experiments)
+        peptide_experiments_str = ", ".join(experiments)
 
-        return (
-            f"Sequence: {current_peptide_seq}\n"
+        tooltip = (
+            f"Sequence: {peptide_seq}\n"
             f"Proteins: {proteins_str}\n"
-            f"Unique: {unique_str}\n"
+            f"Unique: {len(proteins) == 1}\n"
             f"Experiment: {peptide_experiments_str}\n"
             f"Amount: {amount}"
         )
+        if mismatches:
+            tooltip += f"\nMismatches: {mismatches}"
+        return tooltip
 
-    def create_color_bar_image(self):
-        """
-        Create color bar image.
+    def count_amount_of_the_same_peptides(self):
+        peptides = self.peptides_from_given_experiment
+        amounts = peptides.count_sequences()
+        return {
+            peptides.sequences[sequence_id]: int(amounts[sequence_id])
+            for sequence_id in np.flatnonzero(amounts).tolist()
+        }
 
-        :param amount: dictionary where key is sequence and value is amount
-        :param amount_list: peptide sequence list in descending order
-        :return: list of colors used in color bar
-        """
-        unique_amount_of_peptides = sorted(
-            list({value for value in self.amount_of_peptides.values()})
-        )  # [1, 5, 6, 10...]
-        color_map_with_amount = {}
-        blue = Color("LightBlue")
-        colors = list(
-            blue.range_to(
-                value=Color("MediumBlue"), steps=len(unique_amount_of_peptides)
+
+class DensityPage:
+    """
+    Page with peptide depth heatmap under every protein line.
+
+    It is drawn instead of separate peptides, so size of page depends only
+    on length of protein sequence (not on amount of peptides).
+    """
+
+    def __init__(
+        self,
+        html_report_config,
+        type_of_experiment,
+        experiment,
+        peptides_from_given_experiment,
+        alignment_obj,
+    ):
+        self.spans: list[Span] = []
+        self.experiment = experiment
+        self.type_of_experiment = type_of_experiment
+        self.alignment_obj = alignment_obj
+        self.html_report_config = html_report_config
+        with instrumentation.stage("depth"):
+            self.coverage = residue_coverage.create_experiment_coverage(
+                alignment_obj, type_of_experiment, experiment
             )
+        self.depth_levels = residue_coverage.create_depth_levels(
+            self.coverage.max_depth
+        )
+        self.color_scale = legend.create_color_scale(self.depth_levels)
+        self.legend_label = legend.DEPTH_LEGEND_LABEL
+        # start, end, level, minimal and maximal depth of runs
+        self.runs = residue_coverage.find_depth_runs(
+            self.coverage.depth,
+            self.depth_levels,
+            html_report_config.line_length,
         )
-        if len(colors) == 1:
-            colors.append(Color("MediumBlue"))
-            unique_amount_of_peptides.append(2)
-        # blue - min, green - max
-        for index, amount in enumerate(unique_amount_of_peptides):
-            color_map_with_amount[amount] = colors[index].hex
-
-        fig, ax = plt.subplots(figsize=(1, 4))
-        fig.subplots_adjust(right=0.5)
-
-        c_map = mpl.colors.LinearSegmentedColormap.from_list(
-            "", [x.hex for x in colors]
+        self.windows = create_windows(
+            len(alignment_obj.protein_seq), html_report_config
         )
+        self.window = 0
 
-        bounds = [x for x in unique_amount_of_peptides]
-        bounds.insert(0, 0)
-        norm = mpl.colors.BoundaryNorm(boundaries=bounds, ncolors=256)
+    @property
+    def page_name(self) -> str:
+        """Name of html file of page (window)."""
+        return create_page_name(
+            self.type_of_experiment, self.experiment, self.window
+        )
 
-        cb1 = mpl.colorbar.ColorbarBase(ax=ax, cmap=c_map, norm=norm)
-        cb1.set_label("Amount of peptide")
-        self.color_bar_fig = fig
-        return color_map_with_amount
+    def create_class_styles(self) -> str:
+        """
+        Create css of color classes used by compact page.
 
-    def count_amount_of_the_same_peptides(self):
-        amount_of_peptides = dict(
-            self.peptides_from_given_experiment["Sequence"].value_counts()
+        :return: css rules
+        """
+        return create_color_class_styles(self.color_scale, "background-color")
+
+    def fill_alignment_window(self, window=0):
+        """
+        Create spans of protein lines and heatmap rows of one window.
+
+        :param window: index of window
+        """
+        self.window = window
+        self.spans = []
+        lines = self.windows[window]
+        line_length = self.html_report_config.line_length
+        interline = self.html_report_config.interline
+        text_left_offset = self.html_report_config.text_left_offset
+        compact = self.html_report_config.compact
+        protein_seq = self.alignment_obj.protein_seq
+        coverage_title = (
+            f"Coverage: {100 * self.coverage.coverage:.1f}%\n"
+            f"Maximal depth: {self.coverage.max_depth}"
         )
-        return amount_of_peptides
+        colors = [color for level, color in self.color_scale]
+        # runs are sorted by start and do not cross borders of lines
+        first_run, last_run = self.runs[0].searchsorted(
+            [lines.start * line_length, lines.stop * line_length]
+        )
+        runs_of_lines: dict[int, list[Span]] = {line: [] for line in lines}
+        for start, end, level, min_depth, max_depth in zip(
+            *(run[first_run:last_run].tolist() for run in self.runs)
+        ):
+            line = start // line_length
+            top = (line - lines.start) * 2 * interline + interline
+            if min_depth == max_depth:
+                depth = f"{min_depth}"
+            else:
+                depth = f"{min_depth}-{max_depth}"
+            left = start % line_length + text_left_offset
+            title = f"Residues: {start + 1}-{end}\nDepth: {depth}"
+            if compact:
+                run_span = Span(
+                    "\u00a0" * (end - start),
+                    create_position_style(left, top),
+                    title,
+                    f"{COLOR_CLASS_PREFIX}{level} {DEPTH_RUN_CLASS}",
+                )
+            else:
+                run_span = Span(
+                    "\u00a0" * (end - start),
+                    f"background-color: {colors[level]};"
+                    f" left: {left}ch;"
+                    f" top: {top}px;"
+                    f" text-shadow: none;",
+                    title,
+                )
+            runs_of_lines[line].append(run_span)
+        for line, runs_of_line in runs_of_lines.items():
+            self.spans.append(
+                create_protein_line_span(
+                    protein_seq[line * line_length : (line + 1) * line_length],
+                    text_left_offset,
+                    (line - lines.start) * 2 * interline,
+                    compact,
+                    coverage_title,
+                )
+            )
+            self.spans.extend(runs_of_line)
+        instrumentation.count("spans", len(self.spans))
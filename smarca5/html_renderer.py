@@ -0,0 +1,194 @@
+"""Streaming html renderer of report pages."""
+import gzip
+import os
+from copy import deepcopy
+from html import escape
+from typing import Iterator
+
+import html_page
+
+TITLE_MARKER = "SMARCA5-TITLE-MARKER"
+IMAGE_MARKER = "SMARCA5-IMAGE-MARKER"
+CENTER_MARKER = "SMARCA5-CENTER-MARKER"
+WINDOWS_MARKER = "SMARCA5-WINDOWS-MARKER"
+CLASS_STYLES_MARKER = "SMARCA5-CLASS-STYLES-MARKER"
+# suffix of compressed pages (links keep .html name, so report has to be
+# served by server which sends precompressed files)
+GZIP_SUFFIX = ".gz"
+GZIP_LEVEL = 6
+
+
+class PageTemplate:
+    """
+    Html of report page split around alignment window.
+
+    Base page (with menus) is serialized once and every page only fills
+    its title, underlined menu element and color bar image (and links to
+    windows of windowed report, color classes of compact page). Compact
+    template has no indentation.
+    """
+
+    def __init__(
+        self, base_soup, windowed: bool = False, compact: bool = False
+    ):
+        """
+        Split base page around alignment window.
+
+        :param base_soup: BeautifulSoup object of index.html with menus
+        :param windowed: add list of links to windows of page
+        :param compact: add style tag for color classes and remove
+        indentation
+        """
+        soup = deepcopy(base_soup)
+        soup.title.string = TITLE_MARKER
+        soup.find("img")["src"] = IMAGE_MARKER
+        if windowed:
+            windows_tag = soup.new_tag("ul", id="Windows")
+            windows_tag.string = WINDOWS_MARKER
+            soup.find("div", {"class": "left"}).append(windows_tag)
+        if compact:
+            style_tag = soup.new_tag("style")
+            style_tag.string = CLASS_STYLES_MARKER
+            soup.head.append(style_tag)
+            for text in soup.find_all(string=True):
+                if not text.strip() and text.parent.name != "span":
+                    text.extract()
+        soup.find("div", {"class": "center"}).string = CENTER_MARKER
+        self.head, self.tail = str(soup).split(CENTER_MARKER)
+
+    def render(self, page, image_src: str) -> tuple[str, str]:
+        """
+        Fill template with information about page.
+
+        :param page: ReportPage object
+        :param image_src: source of color bar image
+        :return: html before and after content of alignment window
+        """
+        # menus link the first window of page
+        href = 'href="{}"'.format(
+            escape(
+                html_page.create_page_name(
+                    page.type_of_experiment, page.experiment
+                ),
+                quote=False,
+            )
+        )
+        head = (
+            self.head.replace(
+                TITLE_MARKER, escape(page.experiment, quote=False)
+            )
+            .replace(IMAGE_MARKER, escape(image_src))
+            .replace(
+                href,
+                f'{href} style="{escape(html_page.UNDERLINE_MENU_STYLE)}"',
+                1,
+            )
+            .replace(WINDOWS_MARKER, render_window_links(page))
+        )
+        if CLASS_STYLES_MARKER in head:
+            head = head.replace(
+                CLASS_STYLES_MARKER, page.create_class_styles()
+            )
+        return head, self.tail
+
+
+def render_window_links(page) -> str:
+    """
+    Render links to windows of page, link to current window is underlined.
+
+    :param page: ReportPage object
+    :return: html of list elements
+    """
+    line_length = page.html_report_config.line_length
+    protein_seq_len = len(page.alignment_obj.protein_seq)
+    links = []
+    for window, lines in enumerate(page.windows):
+        href = escape(
+            html_page.create_page_name(
+                page.type_of_experiment, page.experiment, window
+            )
+        )
+        style = ""
+        if window == page.window:
+            style = f' style="{escape(html_page.UNDERLINE_MENU_STYLE)}"'
+        links.append(
+            f'<li><a href="{href}"{style}>'
+            f"Residues {lines.start * line_length + 1}-"
+            f"{min(lines.stop * line_length, protein_seq_len)}</a></li>"
+        )
+    return "\n".join(links)
+
+
+def render_span(span) -> str:
+    """
+    Render span record as html.
+
+    :param span: html_page.Span object
+    :return: html of span
+    """
+    if span.classes is not None:
+        return render_compact_span(span)
+    if span.title is None:
+        return (
+            f'<span style="{escape(span.style)}">'
+            f"{escape(span.text, quote=False)}</span>\n"
+        )
+    return (
+        f'<span style="{escape(span.style)}" title="{escape(span.title)}">'
+        f"{escape(span.text, quote=False)}</span>\n"
+    )
+
+
+def render_compact_span(span) -> str:
+    """
+    Render span record with classes as html (without line break).
+
+    :param span: html_page.Span object
+    :return: html of span
+    """
+    title = "" if span.title is None else f' title="{escape(span.title)}"'
+    return (
+        f'<span class="{span.classes}" style="{span.style}"{title}>'
+        f"{escape(span.text, quote=False)}</span>"
+    )
+
+
+def iter_page_html(page, image_src: str) -> Iterator[str]:
+    """
+    Generate html of page piece by piece.
+
+    :param page: ReportPage object with filled alignment window
+    :param image_src: source of color bar image
+    :return: generator of html strings
+    """
+    head, tail = page.html_report_config.page_template.render(page, image_src)
+    yield head
+    for span in page.spans:
+        yield render_span(span)
+    yield tail
+
+
+def write_page(page, path: str, image_src: str) -> int:
+    """
+    Write html of page straight to file.
+
+    Page of report with compress option is written to path with .gz
+    suffix.
+
+    :param page: ReportPage object with filled alignment window
+    :param path: path of html file
+    :param image_src: source of color bar image
+    :return: amount of written bytes
+    """
+    if page.html_report_config.compress:
+        with gzip.open(
+            path + GZIP_SUFFIX,
+            "wt",
+            encoding="utf-8",
+            compresslevel=GZIP_LEVEL,
+        ) as page_to_save:
+            page_to_save.writelines(iter_page_html(page, image_src))
+        return os.path.getsize(path + GZIP_SUFFIX)
+    with open(path, "w", encoding="utf-8") as page_to_save:
+        page_to_save.writelines(iter_page_html(page, image_src))
+    return os.path.getsize(path)
@@ -1,8 +1,33 @@
+from typing import Optional
+
+import html_page
+import html_renderer
+
+
 class HtmlReport:
     def __init__(
-        self, soup, groups, samples, text_left_offset, interline, line_length
+        self,
+        soup,
+        groups,
+        samples,
+        text_left_offset,
+        interline,
+        line_length,
+        legend_format="svg",
+        report_mode="pages",
+        window_size=None,
+        compact=False,
+        compress=False,
     ):
         self.base_soup = soup
+        self.legend_format = legend_format
+        self.report_mode = report_mode
+        # amount of residues of one html file (None: whole protein)
+        self.window_size = window_size
+        # spans use css classes instead of inline styles
+        self.compact = compact
+        # pages are written as .html.gz files
+        self.compress = compress
         self.interline = interline
         self.text_left_offset = text_left_offset
         self.line_length = line_length
@@ -11,6 +36,16 @@ class HtmlReport:
         self.samples = samples
         self.fill_right_menus(self.groups, "Groups")
         self.fill_right_menus(self.samples, "Samples")
+        self.page_template = html_renderer.PageTemplate(
+            self.base_soup, windowed=window_size is not None, compact=compact
+        )
+
+    @property
+    def lines_per_window(self) -> Optional[int]:
+        """Amount of protein lines of one window (None: whole protein)."""
+        if self.window_size is None:
+            return None
+        return max(1, self.window_size // self.line_length)
 
     def fill_right_menus(self, menu_elements, menu_type) -> None:
         """
@@ -22,16 +57,22 @@ class HtmlReport:
         :return:
         """
         ul_tag = self.base_soup.find("ul", {"id": f"{menu_type}"})
+        type_of_experiment = "group" if menu_type == "Groups" else "sample"
         for element_name in menu_elements:
             li_tag = self.base_soup.new_tag("li")
-            if menu_type == "Groups":
-                a_tag = self.base_soup.new_tag(
-                    "a", href=f"type_group-{element_name}.html"
-                )
-            else:
-                a_tag = self.base_soup.new_tag(
-                    "a", href=f"type_sample-{element_name}.html"
-                )
+            a_tag = self.base_soup.new_tag(
+                "a", href=self.page_href(type_of_experiment, element_name)
+            )
             a_tag.string = element_name
             li_tag.append(a_tag)
             ul_tag.append(li_tag)
+
+    def page_href(self, type_of_experiment, experiment) -> str:
+        """
+        Create link to page of experiment.
+
+        :param type_of_experiment: "group" or "sample"
+        :param experiment: group or sample name
+        :return: href of page
+        """
+        return html_page.create_page_name(type_of_experiment, experiment)
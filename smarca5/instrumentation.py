@@ -0,0 +1,238 @@
+"""Timing, peak memory and counters of analysis stages.
+
+Instrumentation is disabled by default, then stage() returns shared empty
+context manager and count() returns at once. It is enabled by enable() (or
+enable_from_environment() with SMARCA5_TRACE variable) and the trace is saved
+by finish(). Only stages of current process are recorded (not of page
+worker processes).
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+TRACE_ENV_VARIABLE = "SMARCA5_TRACE"
+TRACE_FORMAT_ENV_VARIABLE = "SMARCA5_TRACE_FORMAT"
+TRACE_FORMATS = ("json", "chrome")
+NULL_STAGE = nullcontext()
+
+
+class Recorder:
+    """Recorded stages and counters of one traced run."""
+
+    def __init__(self, path: str, trace_format: str = "json"):
+        if trace_format not in TRACE_FORMATS:
+            raise ValueError(
+                f"Unknown trace format {trace_format!r}, "
+                f"expected one of {TRACE_FORMATS}"
+            )
+        self.path = path
+        self.trace_format = trace_format
+        self.start = time.perf_counter()
+        self.stages: list[dict] = []
+        self.counters: Counter = Counter()
+        # peak memory seen by every open stage (innermost last)
+        self.open_stage_peaks: list[int] = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Record wall time and peak memory of stage.
+
+        Peak of stage includes peaks of its nested stages.
+
+        :param name: name of stage
+        """
+        if self.open_stage_peaks:
+            self.open_stage_peaks[-1] = max(
+                self.open_stage_peaks[-1], tracemalloc.get_traced_memory()[1]
+            )
+        tracemalloc.reset_peak()
+        depth = len(self.open_stage_peaks)
+        self.open_stage_peaks.append(0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            peak_memory = max(
+                self.open_stage_peaks.pop(), tracemalloc.get_traced_memory()[1]
+            )
+            if self.open_stage_peaks:
+                self.open_stage_peaks[-1] = max(
+                    self.open_stage_peaks[-1], peak_memory
+                )
+            self.stages.append(
+                {
+                    "name": name,
+                    "start": start - self.start,
+                    "duration": duration,
+                    "peak_memory": peak_memory,
+                    "depth": depth,
+                    "thread": threading.get_ident(),
+                }
+            )
+
+    def count(self, name: str, amount: int) -> None:
+        """
+        Increase counter.
+
+        :param name: name of counter
+        :param amount: added amount
+        :return: None
+        """
+        with self.lock:
+            self.counters[name] += amount
+
+    def create_trace(self) -> dict:
+        """
+        Create trace in json format (stages in order of start).
+
+        :return: dictionary which can be saved as json
+        """
+        return {
+            "total_time": time.perf_counter() - self.start,
+            "stages": sorted(self.stages, key=lambda stage: stage["start"]),
+            "counters": dict(self.counters),
+        }
+
+    def create_chrome_trace(self) -> dict:
+        """
+        Create trace in Chrome trace event format (chrome://tracing).
+
+        :return: dictionary which can be saved as json
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": stage["name"],
+                "ph": "X",
+                "ts": stage["start"] * 1e6,
+                "dur": stage["duration"] * 1e6,
+                "pid": pid,
+                "tid": stage["thread"],
+                "args": {"peak_memory": stage["peak_memory"]},
+            }
+            for stage in self.stages
+        ]
+        events.append(
+            {
+                "name": "counters",
+                "ph": "C",
+                "ts": (time.perf_counter() - self.start) * 1e6,
+                "pid": pid,
+                "args": dict(self.counters),
+            }
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self) -> None:
+        """
+        Save trace into file in selected format.
+
+        :return: None
+        """
+        if self.trace_format == "chrome":
+            trace = self.create_chrome_trace()
+        else:
+            trace = self.create_trace()
+        with open(self.path, "w") as trace_file:
+            json.dump(trace, trace_file, indent=1)
+
+
+recorder: Optional[Recorder] = None
+
+
+def enable(path: str, trace_format: str = "json") -> Recorder:
+    """
+    Start recording stages (and tracing memory allocations).
+
+    :param path: path of trace file written by finish()
+    :param trace_format: "json" or "chrome"
+    :return: Recorder object
+    """
+    global recorder
+    recorder = Recorder(path, trace_format)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return recorder
+
+
+def enable_from_environment() -> Optional[Recorder]:
+    """
+    Enable instrumentation if SMARCA5_TRACE variable contains trace path.
+
+    Format is read from SMARCA5_TRACE_FORMAT variable (default: json).
+
+    :return: Recorder object or None
+    """
+    path = os.environ.get(TRACE_ENV_VARIABLE)
+    if not path:
+        return None
+    return enable(
+        path, os.environ.get(TRACE_FORMAT_ENV_VARIABLE) or TRACE_FORMATS[0]
+    )
+
+
+def disable() -> None:
+    """
+    Stop recording without saving trace.
+
+    :return: None
+    """
+    global recorder
+    if recorder is not None:
+        recorder = None
+        tracemalloc.stop()
+
+
+def finish() -> Optional[str]:
+    """
+    Save trace and stop recording.
+
+    :return: path of trace file or None if instrumentation is disabled
+    """
+    if recorder is None:
+        return None
+    recorder.save()
+    path = recorder.path
+    disable()
+    return path
+
+
+def is_enabled() -> bool:
+    """
+    Check if instrumentation is enabled.
+
+    :return: True if stages are recorded
+    """
+    return recorder is not None
+
+
+def stage(name: str):
+    """
+    Record stage of analysis (use as context manager).
+
+    :param name: name of stage
+    :return: context manager
+    """
+    if recorder is None:
+        return NULL_STAGE
+    return recorder.stage(name)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """
+    Increase counter (if instrumentation is enabled).
+
+    :param name: name of counter
+    :param amount: added amount
+    :return: None
+    """
+    if recorder is not None:
+        recorder.count(name, amount)
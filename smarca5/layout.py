@@ -0,0 +1,145 @@
+"""Layout of peptides under protein lines."""
+import heapq
+from math import ceil
+from typing import Iterable, NamedTuple
+
+import pandas as pd  # type: ignore
+
+LAYOUT_COLUMNS = [
+    "Line",
+    "Track",
+    "Top",
+    "Left",
+    "Start",
+    "End",
+    "Sequence",
+    "FullSequence",
+    "IsTransfer",
+]
+
+
+class PlacedPeptide(NamedTuple):
+    """Part of peptide displayed in one protein line."""
+
+    line: int  # index of protein line
+    track: int  # 0 is the first track under protein line
+    top: int  # vertical position in pixels
+    left: int  # position in protein line (amino acids)
+    start: int  # start of displayed part in protein sequence
+    end: int  # end (exclusive) of displayed part in protein sequence
+    sequence: str  # displayed part of peptide
+    full_sequence: str
+    is_transfer: bool  # True if it is rest of peptide from previous line
+
+
+class TrackLayout:
+    """
+    Assign vertical tracks to peptides with sweep line.
+
+    Peptides of every line are processed in order of start and placed on
+    the lowest free track. Min-heap of track end positions tells which
+    tracks are free again, so layout costs O(n log n). Peptides longer than
+    line are split and their rest is carried to the next line.
+    """
+
+    def __init__(self, protein_seq_len: int, line_length: int, interline):
+        self.line_length = line_length
+        self.interline = interline
+        self.number_of_lines = ceil(protein_seq_len / line_length)
+        self.line_tops: list[int] = []
+        self.peptides_of_lines: list[list[PlacedPeptide]] = []
+
+    def place(
+        self, starts: Iterable[int], sequences: Iterable[str]
+    ) -> "TrackLayout":
+        """
+        Place peptides (sorted by start) in lines and tracks.
+
+        :param starts: start positions of peptides in protein sequence
+        :param sequences: peptide sequences
+        :return: self
+        """
+        peptides = iter(zip(starts, sequences))
+        next_peptide = next(peptides, None)
+        # (start, end, sequence, full sequence) of peptides from previous line
+        transfers: list[tuple[int, int, str, str]] = []
+        line_top = 0
+        for line in range(self.number_of_lines):
+            line_start = line * self.line_length
+            line_end = line_start + self.line_length
+            line_peptides = [
+                (start, end, sequence, full_sequence, True)
+                for start, end, sequence, full_sequence in transfers
+            ]
+            while next_peptide is not None and next_peptide[0] < line_end:
+                start, sequence = next_peptide
+                line_peptides.append(
+                    (start, start + len(sequence), sequence, sequence, False)
+                )
+                next_peptide = next(peptides, None)
+
+            transfers = []
+            placed_peptides = []
+            # (end of peptide, track) of peptides placed on tracks
+            occupied_tracks: list[tuple[int, int]] = []
+            free_tracks: list[int] = []
+            number_of_tracks = 0
+            for (
+                start,
+                end,
+                sequence,
+                full_sequence,
+                is_transfer,
+            ) in line_peptides:
+                while occupied_tracks and occupied_tracks[0][0] <= start:
+                    heapq.heappush(
+                        free_tracks, heapq.heappop(occupied_tracks)[1]
+                    )
+                if free_tracks:
+                    track = heapq.heappop(free_tracks)
+                else:
+                    track = number_of_tracks
+                    number_of_tracks += 1
+                displayed_end = min(end, line_end)
+                heapq.heappush(occupied_tracks, (displayed_end, track))
+                if end > line_end:
+                    transfers.append(
+                        (
+                            line_end,
+                            end,
+                            sequence[line_end - start :],
+                            full_sequence,
+                        )
+                    )
+                placed_peptides.append(
+                    PlacedPeptide(
+                        line,
+                        track,
+                        line_top + (track + 1) * self.interline,
+                        start - line_start,
+                        start,
+                        displayed_end,
+                        sequence[: displayed_end - start],
+                        full_sequence,
+                        is_transfer,
+                    )
+                )
+            self.line_tops.append(line_top)
+            self.peptides_of_lines.append(placed_peptides)
+            line_top += (max(number_of_tracks, 1) + 1) * self.interline
+        return self
+
+    def layout_table(self) -> pd.DataFrame:
+        """
+        Export layout as table (one row per displayed part of peptide).
+
+        :return: DataFrame with LAYOUT_COLUMNS
+        """
+        return pd.DataFrame(
+            [
+                placed_peptide
+                for placed_peptides in self.peptides_of_lines
+                for placed_peptide in placed_peptides
+            ],
+            columns=LAYOUT_COLUMNS,
+        )
@@ -0,0 +1,154 @@
+"""Color scale of peptide amount and its legend (color bar)."""
+from functools import lru_cache
+from html import escape
+from urllib.parse import quote
+
+from colour import Color
+
+MIN_AMOUNT_COLOR = "LightBlue"
+MAX_AMOUNT_COLOR = "MediumBlue"
+LEGEND_LABEL = "Amount of peptide"
+DEPTH_LEGEND_LABEL = "Peptide depth"
+LEGEND_FORMATS = ("svg", "png")
+# size of svg color bar in pixels (the same as 1 x 4 inches png figure)
+BAR_LEFT = 10
+BAR_TOP = 10
+BAR_WIDTH = 22
+BAR_HEIGHT = 380
+SVG_WIDTH = 100
+SVG_HEIGHT = 400
+
+
+@lru_cache(maxsize=None)
+def create_color_scale(
+    amounts: tuple[int, ...]
+) -> tuple[tuple[int, str], ...]:
+    """
+    Map every amount of peptide to color (light blue - min, blue - max).
+
+    :param amounts: sorted distinct amounts of peptides
+    :return: tuple of (amount, hex color) pairs, scale with only one amount
+    gets extra step (amount + 1) so color bar still has range
+    """
+    if not amounts:
+        return ()
+    colors = list(
+        Color(MIN_AMOUNT_COLOR).range_to(
+            value=Color(MAX_AMOUNT_COLOR), steps=len(amounts)
+        )
+    )
+    if len(colors) == 1:
+        colors.append(Color(MAX_AMOUNT_COLOR))
+        amounts = amounts + (amounts[0] + 1,)
+    return tuple((amount, color.hex) for amount, color in zip(amounts, colors))
+
+
+@lru_cache(maxsize=None)
+def create_color_bar_svg(
+    color_scale: tuple[tuple[int, str], ...], label: str = LEGEND_LABEL
+) -> str:
+    """
+    Create color bar as svg image.
+
+    Every amount has band of the same height, bands are separated by
+    amount bounds (like matplotlib colorbar with BoundaryNorm).
+
+    :param color_scale: result of create_color_scale
+    :param label: label of color bar
+    :return: svg markup
+    """
+    bounds = [0] + [amount for amount, color in color_scale]
+    band_height = BAR_HEIGHT / max(len(color_scale), 1)
+    elements = [
+        f'<rect width="{SVG_WIDTH}" height="{SVG_HEIGHT}" fill="white"/>'
+    ]
+    for index, (amount, color) in enumerate(color_scale):
+        band_top = BAR_TOP + BAR_HEIGHT - (index + 1) * band_height
+        elements.append(
+            f'<rect x="{BAR_LEFT}" y="{band_top:.2f}" width="{BAR_WIDTH}"'
+            f' height="{band_height:.2f}" fill="{color}"/>'
+        )
+    for index, bound in enumerate(bounds):
+        bound_y = BAR_TOP + BAR_HEIGHT - index * band_height
+        elements.append(
+            f'<text x="{BAR_LEFT + BAR_WIDTH + 4}" y="{bound_y + 4:.2f}"'
+            f' font-size="10" font-family="sans-serif">{bound}</text>'
+        )
+    elements.append(
+        f'<rect x="{BAR_LEFT}" y="{BAR_TOP}" width="{BAR_WIDTH}"'
+        f' height="{BAR_HEIGHT}" fill="none" stroke="black"/>'
+    )
+    label_x = SVG_WIDTH - 15
+    label_y = SVG_HEIGHT / 2
+    elements.append(
+        f'<text x="{label_x}" y="{label_y}" font-size="11"'
+        f' font-family="sans-serif" text-anchor="middle"'
+        f' transform="rotate(-90 {label_x} {label_y})">'
+        f"{escape(label)}</text>"
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}"'
+        f' height="{SVG_HEIGHT}">{"".join(elements)}</svg>'
+    )
+
+
+@lru_cache(maxsize=None)
+def create_color_bar_data_uri(
+    color_scale: tuple[tuple[int, str], ...], label: str = LEGEND_LABEL
+) -> str:
+    """
+    Create color bar svg which can be used as src of img tag.
+
+    :param color_scale: result of create_color_scale
+    :param label: label of color bar
+    :return: data URI of svg image
+    """
+    return "data:image/svg+xml;charset=utf-8," + quote(
+        create_color_bar_svg(color_scale, label)
+    )
+
+
+def save_color_bar_png(
+    color_scale: tuple[tuple[int, str], ...],
+    path: str,
+    label: str = LEGEND_LABEL,
+) -> None:
+    """
+    Save color bar as png image (needs matplotlib).
+
+    Empty color scale (page without matched peptides) is saved as empty bar
+    like in svg color bar.
+
+    :param color_scale: result of create_color_scale
+    :param path: path of png file
+    :param label: label of color bar
+    :return: None
+    """
+    try:
+        import matplotlib as mpl  # type: ignore
+        import matplotlib.colorbar  # type: ignore # noqa: F401
+        from matplotlib.figure import Figure  # type: ignore
+    except ImportError as error:
+        raise ImportError(
+            "matplotlib is needed to save color bar as png"
+        ) from error
+
+    fig = Figure(figsize=(1, 4))
+    ax = fig.subplots()
+    fig.subplots_adjust(right=0.5)
+    if not color_scale:
+        # BoundaryNorm needs at least 2 bounds
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.yaxis.set_label_position("right")
+        ax.set_ylabel(label)
+        fig.savefig(path)
+        return
+    c_map = mpl.colors.LinearSegmentedColormap.from_list(
+        "", [color for amount, color in color_scale]
+    )
+    bounds = [0] + [amount for amount, color in color_scale]
+    norm = mpl.colors.BoundaryNorm(boundaries=bounds, ncolors=256)
+    cb1 = mpl.colorbar.ColorbarBase(ax=ax, cmap=c_map, norm=norm)
+    cb1.set_label(label)
+    fig.savefig(path)
@@ -1,9 +1,13 @@
 """Main module."""
+import multiprocessing
+
 import ttkbootstrap as tk  # type: ignore
 from App import App
 
 
 if __name__ == "__main__":
+    # pages are written by worker processes (also in exe version)
+    multiprocessing.freeze_support()
     root = tk.Window(themename="darkly")
     app = App(root)
     root.mainloop()
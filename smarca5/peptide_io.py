@@ -0,0 +1,138 @@
+"""Reading of peptides files (csv, parquet, feather and excel)."""
+import importlib.util
+import os
+import tempfile
+
+import pandas as pd  # type: ignore
+
+import cache
+
+PEPTIDE_COLUMNS = ("Sequence", "Proteins", "Experiment")
+# columns with few distinct values repeated in many rows
+CATEGORICAL_COLUMNS = ("Proteins", "Experiment")
+PEPTIDE_FILE_FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".xlsx": "excel",
+    ".xlsm": "excel",
+    ".xls": "excel",
+}
+CSV_SEPARATORS = {".csv": ",", ".tsv": "\t"}
+CONVERTED_EXCEL_FORMAT_VERSION = 2
+
+
+def find_file_format(peptides_path: str) -> str:
+    """
+    Find format of peptides file by its extension.
+
+    :param peptides_path: path to peptides file
+    :return: one of values of PEPTIDE_FILE_FORMATS
+    """
+    extension = os.path.splitext(peptides_path)[1].lower()
+    try:
+        return PEPTIDE_FILE_FORMATS[extension]
+    except KeyError:
+        raise ValueError(
+            f"Unknown format of peptides file {peptides_path!r}, expected "
+            f"one of {', '.join(PEPTIDE_FILE_FORMATS)}"
+        ) from None
+
+
+def compact_peptides(peptides_dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only peptide columns (in fixed order) with compact dtypes.
+
+    :param peptides_dataframe: DataFrame with (at least) peptide columns
+    :return: DataFrame with Sequence, Proteins and Experiment columns,
+    Proteins and Experiment are categorical (empty cells are "")
+    """
+    peptides_dataframe = peptides_dataframe.loc[:, list(PEPTIDE_COLUMNS)]
+    peptides_dataframe[list(CATEGORICAL_COLUMNS)] = peptides_dataframe[
+        list(CATEGORICAL_COLUMNS)
+    ].fillna("")
+    return peptides_dataframe.astype(
+        {column: "category" for column in CATEGORICAL_COLUMNS}
+    ).reset_index(drop=True)
+
+
+def read_csv(peptides_path: str) -> pd.DataFrame:
+    """
+    Read csv (or tsv) peptides file.
+
+    pyarrow engine is used if pyarrow is installed, otherwise C engine.
+
+    :param peptides_path: path to csv file
+    :return: DataFrame with peptide columns
+    """
+    extension = os.path.splitext(peptides_path)[1].lower()
+    return pd.read_csv(
+        peptides_path,
+        sep=CSV_SEPARATORS[extension],
+        usecols=list(PEPTIDE_COLUMNS),
+        dtype={"Sequence": str, "Proteins": str, "Experiment": str},
+        engine="pyarrow" if importlib.util.find_spec("pyarrow") else "c",
+    )
+
+
+def read_excel(peptides_path: str) -> pd.DataFrame:
+    """
+    Read excel peptides file.
+
+    Parsing of excel is slow, so the converted DataFrame is cached on disk
+    as feather file (key is content hash of file) and the next reading of
+    the same file loads it from cache. Cache is used only if pyarrow is
+    installed (pickle is not used, loading it could run any code).
+
+    :param peptides_path: path to excel file
+    :return: DataFrame with peptide columns
+    """
+    cache_path = None
+    if importlib.util.find_spec("pyarrow"):
+        cache_path = os.path.join(
+            cache.cache_dir("peptides"),
+            f"v{CONVERTED_EXCEL_FORMAT_VERSION}-"
+            f"{cache.hash_file(peptides_path)}.feather",
+        )
+        if os.path.isfile(cache_path):
+            return pd.read_feather(cache_path)
+    peptides_dataframe = compact_peptides(
+        pd.read_excel(
+            peptides_path,
+            usecols=list(PEPTIDE_COLUMNS),
+            dtype={"Sequence": str, "Proteins": str, "Experiment": str},
+        )
+    )
+    if cache_path is not None:
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(cache_path), suffix=".tmp"
+        )
+        os.close(descriptor)
+        peptides_dataframe.to_feather(temporary_path)
+        os.replace(temporary_path, cache_path)
+    return peptides_dataframe
+
+
+def read_peptides(peptides_path: str) -> pd.DataFrame:
+    """
+    Read peptides file, format is selected by extension of file.
+
+    Only Sequence, Proteins and Experiment columns are loaded.
+
+    :param peptides_path: path to csv, tsv, parquet, feather or excel file
+    :return: DataFrame with Sequence, Proteins and Experiment columns,
+    Proteins and Experiment are categorical
+    """
+    file_format = find_file_format(peptides_path)
+    if file_format == "excel":
+        return read_excel(peptides_path)
+    if file_format == "csv":
+        return compact_peptides(read_csv(peptides_path))
+    if file_format == "parquet":
+        return compact_peptides(
+            pd.read_parquet(peptides_path, columns=list(PEPTIDE_COLUMNS))
+        )
+    return compact_peptides(
+        pd.read_feather(peptides_path, columns=list(PEPTIDE_COLUMNS))
+    )
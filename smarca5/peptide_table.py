@@ -0,0 +1,234 @@
+"""Compact table of matched peptides passed between report stages.
+
+Rows are kept in numpy arrays of positions and ids, every distinct
+sequence, protein list and experiment name is stored once. pandas is used
+only to build the table from searched peptides.
+"""
+import sys
+from typing import Iterator
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+
+class PeptideRecord:
+    """View of one row of PeptideTable (values are not copied)."""
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: "PeptideTable", row: int):
+        """
+        Create view of row.
+
+        :param table: PeptideTable object
+        :param row: non-negative row position
+        """
+        self.table = table
+        self.row = row
+
+    @property
+    def start(self) -> int:
+        """Start position of peptide in protein sequence."""
+        return int(self.table.starts[self.row])
+
+    @property
+    def end(self) -> int:
+        """End position of peptide in protein sequence."""
+        return int(self.table.ends[self.row])
+
+    @property
+    def sequence(self) -> str:
+        """Sequence of peptide."""
+        return self.table.sequences[self.table.sequence_ids[self.row]]
+
+    @property
+    def mismatches(self) -> int:
+        """Amount of mismatches of peptide match."""
+        return int(self.table.mismatches[self.row])
+
+    @property
+    def proteins(self) -> str:
+        """Proteins column of peptide ("" if missing)."""
+        return self.table.proteins[self.table.protein_ids[self.row]]
+
+    @property
+    def experiment(self) -> str:
+        """Experiment of peptide ("" if missing)."""
+        return self.table.experiments[self.table.experiment_ids[self.row]]
+
+    def __repr__(self) -> str:
+        """Values of row."""
+        return (
+            f"PeptideRecord({self.sequence!r}, {self.start}, {self.end}, "
+            f"{self.mismatches}, {self.proteins!r}, {self.experiment!r})"
+        )
+
+
+class PeptideTable:
+    """
+    Matched peptides as numpy arrays.
+
+    Subsets made by take() share sequences, proteins and experiments of
+    the whole table, so ids are comparable between them.
+    """
+
+    __slots__ = (
+        "starts",
+        "ends",
+        "mismatches",
+        "sequence_ids",
+        "protein_ids",
+        "experiment_ids",
+        "sequences",
+        "proteins",
+        "experiments",
+    )
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        mismatches: np.ndarray,
+        sequence_ids: np.ndarray,
+        protein_ids: np.ndarray,
+        experiment_ids: np.ndarray,
+        sequences: list[str],
+        proteins: list[str],
+        experiments: list[str],
+    ):
+        """
+        Create table from arrays of rows and distinct values.
+
+        :param starts: start positions of peptides
+        :param ends: end positions of peptides
+        :param mismatches: amounts of mismatches
+        :param sequence_ids: positions of sequences in sequences
+        :param protein_ids: positions of protein lists in proteins
+        :param experiment_ids: positions of experiment names in experiments
+        :param sequences: distinct peptide sequences
+        :param proteins: distinct values of Proteins column
+        :param experiments: distinct experiment names
+        """
+        self.starts = starts
+        self.ends = ends
+        self.mismatches = mismatches
+        self.sequence_ids = sequence_ids
+        self.protein_ids = protein_ids
+        self.experiment_ids = experiment_ids
+        self.sequences = sequences
+        self.proteins = proteins
+        self.experiments = experiments
+
+    @classmethod
+    def from_dataframe(cls, peptides_dataframe) -> "PeptideTable":
+        """
+        Create table from searched peptides.
+
+        :param peptides_dataframe: DataFrame with Sequence, Proteins,
+        Experiment and integer Start, End and Mismatches columns
+        :return: PeptideTable object (rows in order of DataFrame)
+        """
+        columns = {}
+        for column in ("Sequence", "Proteins", "Experiment"):
+            # missing value gets own id (default -1 would select the last
+            # unique value)
+            ids, uniques = pd.factorize(
+                peptides_dataframe[column], use_na_sentinel=False
+            )
+            columns[column] = (
+                ids.astype(np.int32),
+                [
+                    sys.intern("" if pd.isna(unique) else str(unique))
+                    for unique in uniques
+                ],
+            )
+        return cls(
+            peptides_dataframe["Start"].to_numpy(dtype=np.int32),
+            peptides_dataframe["End"].to_numpy(dtype=np.int32),
+            peptides_dataframe["Mismatches"].to_numpy(dtype=np.int16),
+            columns["Sequence"][0],
+            columns["Proteins"][0],
+            columns["Experiment"][0],
+            columns["Sequence"][1],
+            columns["Proteins"][1],
+            columns["Experiment"][1],
+        )
+
+    def __len__(self) -> int:
+        """Amount of rows."""
+        return len(self.starts)
+
+    def __getitem__(self, row: int) -> PeptideRecord:
+        """
+        Get view of row.
+
+        :param row: row position (negative counts from the end)
+        :return: PeptideRecord object
+        """
+        if not -len(self) <= row < len(self):
+            raise IndexError("PeptideTable index out of range")
+        return PeptideRecord(self, row % len(self))
+
+    def __iter__(self) -> Iterator[PeptideRecord]:
+        """Iterate over views of rows in order."""
+        for row in range(len(self)):
+            yield PeptideRecord(self, row)
+
+    def take(self, rows: np.ndarray) -> "PeptideTable":
+        """
+        Select rows of table.
+
+        :param rows: row positions
+        :return: PeptideTable object with selected rows
+        """
+        return PeptideTable(
+            self.starts[rows],
+            self.ends[rows],
+            self.mismatches[rows],
+            self.sequence_ids[rows],
+            self.protein_ids[rows],
+            self.experiment_ids[rows],
+            self.sequences,
+            self.proteins,
+            self.experiments,
+        )
+
+    def first_rows_of_sequences(self) -> np.ndarray:
+        """
+        Find the first row of every distinct sequence.
+
+        :return: row positions in ascending order
+        """
+        first_rows = np.unique(self.sequence_ids, return_index=True)[1]
+        first_rows.sort()
+        return first_rows
+
+    def count_sequences(self) -> np.ndarray:
+        """
+        Count rows of every sequence.
+
+        :return: array with amount of rows for every sequence id
+        """
+        return np.bincount(self.sequence_ids, minlength=len(self.sequences))
+
+    def experiments_of_sequences(self) -> dict[int, list[str]]:
+        """
+        Find experiments of every sequence.
+
+        :return: dictionary where key is sequence id and value is list of
+        experiment names in order of rows
+        """
+        pairs = self.sequence_ids.astype(np.int64) * max(
+            len(self.experiments), 1
+        ) + self.experiment_ids.astype(np.int64)
+        first_rows_of_pairs = np.unique(pairs, return_index=True)[1]
+        first_rows_of_pairs.sort()
+        experiments: dict[int, list[str]] = {}
+        for sequence_id, experiment_id in zip(
+            self.sequence_ids[first_rows_of_pairs].tolist(),
+            self.experiment_ids[first_rows_of_pairs].tolist(),
+        ):
+            experiments.setdefault(sequence_id, []).append(
+                self.experiments[experiment_id]
+            )
+        return experiments
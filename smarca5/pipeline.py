@@ -0,0 +1,789 @@
+"""Alignment and report pipeline without GUI."""
+import csv
+import json
+import os
+import shutil
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple, Optional
+
+import pandas as pd  # type: ignore
+from bs4 import BeautifulSoup
+
+import alignment
+import cache
+import fasta
+import html_renderer
+import html_report
+import html_page
+import instrumentation
+import legend
+import peptide_io
+import runs
+import single_page
+from progress import Progress
+from resources import load_file
+
+LEFT_TEXT_OFFSET = 3
+DEFAULT_LINE_LENGTH = 80
+DEFAULT_INTERLINE = 20
+MANIFEST_COLUMNS = ("fasta", "peptides", "output_dir")
+REPORT_MODES = ("pages", "single", "density")
+# page classes of report modes with html file for every group and sample
+PAGE_CLASSES = {
+    "pages": html_page.ReportPage,
+    "density": html_page.DensityPage,
+}
+# file in report directory with keys of input and options of written pages
+PAGE_KEYS_NAME = "page_keys.json"
+ALIGNMENT_CACHE_SIZE = 4
+
+
+class Job(NamedTuple):
+    """One analysis of batch run."""
+
+    fasta: str
+    peptides: str
+    output_dir: Optional[str]  # None: new run directory (see runs module)
+
+
+class JobResult(NamedTuple):
+    """Result of one analysis of batch run."""
+
+    job: Job
+    report_path: Optional[str]
+    error: Optional[str]
+
+
+def read_ref_seq_fasta(fasta_path: str) -> str:
+    """
+    Read reference protein sequence in fasta format.
+
+    Only the first record of multi-record fasta file is read.
+
+    :param fasta_path: path to fasta file
+    :return: reference sequence string
+    """
+    with fasta.FastaFile(fasta_path) as fasta_file:
+        if not len(fasta_file):
+            raise ValueError(f"No sequence in {fasta_path}")
+        return fasta_file.sequence(fasta_file.names[0])
+
+
+def read_peptides(peptides_path: str) -> pd.DataFrame:
+    """
+    Read peptides file.
+
+    :param peptides_path: path to csv, tsv, parquet, feather or excel file
+    with peptides
+    :return: DataFrame with Sequence, Proteins, Experiment, Start and End
+    columns
+    """
+    peptides_dataframe = peptide_io.read_peptides(peptides_path)
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    return peptides_dataframe
+
+
+def copy_static_files(output_dir: str, *file_names: str) -> None:
+    """
+    Link files from html_files into output directory (if they are missing).
+
+    Files are hard-linked, so reports of many runs share them, and copied
+    if output directory is on other file system.
+
+    :param output_dir: directory where report is written
+    :param file_names: names of files from html_files directory
+    :return: None
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for file_name in file_names:
+        path = os.path.join(output_dir, file_name)
+        if not os.path.exists(path):
+            source_path = load_file(os.path.join("html_files", file_name))
+            try:
+                os.link(source_path, path)
+            except OSError:
+                shutil.copyfile(source_path, path)
+
+
+class AlignmentCache:
+    """
+    Alignments of analysed files kept in memory during session.
+
+    Key of alignment is content hash of fasta and peptides files with
+    search options, so file changed on disk is analysed again.
+    """
+
+    def __init__(self, max_size: int = ALIGNMENT_CACHE_SIZE):
+        self.max_size = max_size
+        self.alignments: OrderedDict[str, alignment.Alignment] = OrderedDict()
+
+    @staticmethod
+    def create_key(
+        fasta_path,
+        peptides_path,
+        search_engine,
+        max_mismatches=0,
+        equivalent_residues=(),
+    ) -> str:
+        """
+        Create key of analysis input.
+
+        :param fasta_path: path to fasta file with protein sequence
+        :param peptides_path: path to file with peptides
+        :param search_engine: one of alignment.SEARCH_ENGINES
+        :param max_mismatches: maximal amount of mismatches of peptide
+        :param equivalent_residues: strings of residues matched by each other
+        :return: key of alignment
+        """
+        return cache.hash_text(
+            json.dumps(
+                [
+                    cache.hash_file(fasta_path),
+                    cache.hash_file(peptides_path),
+                    search_engine,
+                    max_mismatches,
+                    list(equivalent_residues),
+                ]
+            )
+        )
+
+    def get(self, key: str) -> Optional[alignment.Alignment]:
+        """
+        Find alignment in cache.
+
+        :param key: key of alignment
+        :return: Alignment object or None
+        """
+        alignment_obj = self.alignments.get(key)
+        if alignment_obj is not None:
+            self.alignments.move_to_end(key)
+        return alignment_obj
+
+    def add(self, key: str, alignment_obj: alignment.Alignment) -> None:
+        """
+        Add alignment, the least recently used one is removed if cache is full.
+
+        :param key: key of alignment
+        :param alignment_obj: Alignment object with searched peptides
+        :return: None
+        """
+        self.alignments[key] = alignment_obj
+        self.alignments.move_to_end(key)
+        while len(self.alignments) > self.max_size:
+            self.alignments.popitem(last=False)
+
+
+def load_base_soup() -> BeautifulSoup:
+    """
+    Load template of report page.
+
+    :return: BeautifulSoup object of html_files/index.html
+    """
+    with open(
+        load_file(os.path.join("html_files", "index.html")), "r"
+    ) as html:
+        return BeautifulSoup(html, "html.parser")
+
+
+def write_page_of_experiment(
+    type_of_experiment,
+    experiment,
+    alignment_obj,
+    html_report_config,
+    output_dir,
+) -> int:
+    """
+    Write page (and color bar image) of one experiment.
+
+    Page of windowed report is written as one html file per window.
+
+    :param type_of_experiment: "group" or "sample"
+    :param experiment: group or sample name
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: HtmlReport object
+    :param output_dir: directory where page is written
+    :return: amount of bytes of written page (all its windows)
+    """
+    with instrumentation.stage(f"page {type_of_experiment}-{experiment}"):
+        peptides_of_experiment = alignment_obj.peptide_table_of_experiment(
+            type_of_experiment, experiment
+        )
+
+        page = PAGE_CLASSES[html_report_config.report_mode](
+            html_report_config,
+            type_of_experiment,
+            experiment,
+            peptides_of_experiment,
+            alignment_obj,
+        )
+        with instrumentation.stage("color bar"):
+            if html_report_config.legend_format == "png":
+                image_src = (
+                    f"Amount_of_peptide-type_{type_of_experiment}-"
+                    f"{experiment}.png"
+                )
+                legend.save_color_bar_png(
+                    page.color_scale,
+                    os.path.join(output_dir, image_src),
+                    page.legend_label,
+                )
+            else:
+                image_src = legend.create_color_bar_data_uri(
+                    page.color_scale, page.legend_label
+                )
+        written_bytes = 0
+        for window in range(len(page.windows)):
+            page.fill_alignment_window(window)
+            with instrumentation.stage("render"):
+                written_bytes += html_renderer.write_page(
+                    page, os.path.join(output_dir, page.page_name), image_src
+                )
+        return written_bytes
+
+
+def generate_alignment_report(
+    pages, alignment_obj, html_report_config, output_dir, progress
+) -> None:
+    """
+    Write pages one by one in current process.
+
+    :param pages: list of (type of experiment, experiment) tuples
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: HtmlReport object
+    :param output_dir: directory where pages are written
+    :param progress: Progress object, cancellation is checked between pages
+    :return: None
+    """
+    for done, (type_of_experiment, experiment) in enumerate(pages):
+        progress.report("write", done, len(pages))
+        written_bytes = write_page_of_experiment(
+            type_of_experiment,
+            experiment,
+            alignment_obj,
+            html_report_config,
+            output_dir,
+        )
+        instrumentation.count("pages_written")
+        instrumentation.count("bytes_written", written_bytes)
+    progress.report("write", len(pages), len(pages))
+
+
+def load_page_keys(output_dir: str) -> dict[str, str]:
+    """
+    Load keys of pages written into report directory.
+
+    :param output_dir: report directory
+    :return: dictionary where key is name of page file and value is key of
+    input and options of page
+    """
+    try:
+        with open(os.path.join(output_dir, PAGE_KEYS_NAME)) as page_keys:
+            return json.load(page_keys)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_page_keys(output_dir: str, page_keys: dict[str, str]) -> None:
+    """
+    Save keys of pages written into report directory.
+
+    :param output_dir: report directory
+    :param page_keys: dictionary where key is name of page file and value is
+    key of input and options of page
+    :return: None
+    """
+    with open(os.path.join(output_dir, PAGE_KEYS_NAME), "w") as page_keys_file:
+        json.dump(page_keys, page_keys_file, indent=1)
+
+
+# state of page worker process, set once by its initializer
+page_worker_state: dict = {}
+
+
+def init_page_worker(alignment_obj, html_report_config, output_dir) -> None:
+    """
+    Keep data shared by every page in worker process.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: HtmlReport object
+    :param output_dir: directory where pages are written
+    :return: None
+    """
+    page_worker_state["alignment_obj"] = alignment_obj
+    page_worker_state["html_report_config"] = html_report_config
+    page_worker_state["output_dir"] = output_dir
+    # stages of worker are not recorded (forked worker inherits recorder)
+    instrumentation.disable()
+
+
+def write_page_in_worker(type_of_experiment, experiment) -> int:
+    """
+    Write page of one experiment in worker process.
+
+    :param type_of_experiment: "group" or "sample"
+    :param experiment: group or sample name
+    :return: amount of bytes of written page
+    """
+    return write_page_of_experiment(
+        type_of_experiment, experiment, **page_worker_state
+    )
+
+
+def generate_alignment_report_in_parallel(
+    pages, alignment_obj, html_report_config, output_dir, workers, progress
+) -> None:
+    """
+    Write pages in process pool.
+
+    Alignment and report config are sent once to every worker process
+    (by its initializer), tasks contain only name of page. When analysis
+    is cancelled, pages which are not started yet are not written.
+
+    :param pages: list of (type of experiment, experiment) tuples
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: HtmlReport object
+    :param output_dir: directory where pages are written
+    :param workers: amount of worker processes (None: amount of CPUs)
+    :param progress: Progress object, cancellation is checked between pages
+    :return: None
+    """
+    progress.report("write", 0, len(pages))
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_page_worker,
+        initargs=(alignment_obj, html_report_config, output_dir),
+    )
+    try:
+        futures = [
+            executor.submit(write_page_in_worker, *page) for page in pages
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            instrumentation.count("pages_written")
+            instrumentation.count("bytes_written", future.result())
+            progress.report("write", done, len(pages))
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def write_report(
+    alignment_obj,
+    output_dir: str,
+    line_length: int = DEFAULT_LINE_LENGTH,
+    interline: int = DEFAULT_INTERLINE,
+    page_workers: Optional[int] = 1,
+    legend_format: str = "svg",
+    progress: Optional[Progress] = None,
+    input_key: Optional[str] = None,
+    report_mode: str = "pages",
+    window_size: Optional[int] = None,
+    compact: bool = False,
+    compress: bool = False,
+) -> str:
+    """
+    Write group and sample pages of alignment into directory.
+
+    If key of input is given, pages already written from the same input
+    with the same options are not written again.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param output_dir: directory where pages are written
+    :param line_length: amount of amino acids in one line
+    :param interline: space between lines in pixels
+    :param page_workers: amount of processes writing pages (None: amount
+    of CPUs, 1: pages are written in current process)
+    :param legend_format: "svg" (color bar inside page) or "png" (color bar
+    saved as image file with matplotlib)
+    :param progress: Progress object (reports written pages)
+    :param input_key: key of analysis input (AlignmentCache.create_key)
+    :param report_mode: "pages" (peptides are displayed) or "density"
+    (heatmap of peptide depth is displayed)
+    :param window_size: amount of residues written into one html file of
+    page (None: page is not split)
+    :param compact: spans use css classes instead of inline styles
+    :param compress: pages are written as .html.gz files
+    :return: path of page with all peptides (type All)
+    """
+    if progress is None:
+        progress = Progress()
+    copy_static_files(output_dir, "style.css")
+    soup = load_base_soup()
+
+    # config global options of report like interline, offset ect.
+    html_report_config = html_report.HtmlReport(
+        soup,
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        LEFT_TEXT_OFFSET,
+        interline,
+        line_length,
+        legend_format,
+        report_mode,
+        window_size,
+        compact,
+        compress,
+    )
+    file_suffix = html_renderer.GZIP_SUFFIX if compress else ""
+
+    # generate individual reports divided by groups or samples of experiment
+    pages = [("group", group) for group in alignment_obj.group_names] + [
+        ("sample", sample) for sample in alignment_obj.sample_names
+    ]
+    page_keys = {}
+    if input_key is not None:
+        page_keys = {
+            html_report_config.page_href(*page): cache.hash_text(
+                json.dumps(
+                    [
+                        input_key,
+                        *page,
+                        line_length,
+                        interline,
+                        legend_format,
+                        report_mode,
+                        window_size,
+                        compact,
+                        compress,
+                    ]
+                )
+            )
+            for page in pages
+        }
+        written_page_keys = load_page_keys(output_dir)
+        pages = [
+            page
+            for page, page_name in zip(pages, page_keys)
+            if written_page_keys.get(page_name) != page_keys[page_name]
+            or not os.path.isfile(
+                os.path.join(output_dir, page_name + file_suffix)
+            )
+        ]
+        instrumentation.count("pages_skipped", len(page_keys) - len(pages))
+        # pages are rewritten now, their old keys are not valid any more
+        for page in pages:
+            written_page_keys.pop(html_report_config.page_href(*page), None)
+        save_page_keys(output_dir, written_page_keys)
+    if page_workers != 1:
+        generate_alignment_report_in_parallel(
+            pages,
+            alignment_obj,
+            html_report_config,
+            output_dir,
+            page_workers,
+            progress,
+        )
+    else:
+        generate_alignment_report(
+            pages, alignment_obj, html_report_config, output_dir, progress
+        )
+    if page_keys:
+        save_page_keys(output_dir, {**written_page_keys, **page_keys})
+    return os.path.join(output_dir, "type_group-All.html" + file_suffix)
+
+
+def write_single_page_report(
+    alignment_obj,
+    output_dir: str,
+    line_length: int = DEFAULT_LINE_LENGTH,
+    interline: int = DEFAULT_INTERLINE,
+    progress: Optional[Progress] = None,
+) -> str:
+    """
+    Write one page and data file, experiments are switched in browser.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param output_dir: directory where report is written
+    :param line_length: amount of amino acids in one line
+    :param interline: space between lines in pixels
+    :param progress: Progress object
+    :return: path of report page
+    """
+    if progress is None:
+        progress = Progress()
+    progress.report("write", 0, 1)
+    copy_static_files(output_dir, "style.css", single_page.REPORT_SCRIPT_NAME)
+    html_report_config = single_page.SinglePageReport(
+        load_base_soup(),
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        LEFT_TEXT_OFFSET,
+        interline,
+        line_length,
+    )
+    report_path = single_page.write_single_page(
+        alignment_obj, html_report_config, output_dir
+    )
+    if instrumentation.is_enabled():
+        instrumentation.count("pages_written")
+        instrumentation.count(
+            "bytes_written",
+            os.path.getsize(report_path)
+            + os.path.getsize(
+                os.path.join(output_dir, single_page.REPORT_DATA_NAME)
+            ),
+        )
+    progress.report("write", 1, 1)
+    return report_path
+
+
+def create_alignment(
+    fasta_path: str,
+    peptides_path: str,
+    search_engine: str,
+    progress,
+    max_mismatches: int = 0,
+    equivalent_residues=(),
+) -> alignment.Alignment:
+    """
+    Read input files and find peptides in protein sequence.
+
+    :param fasta_path: path to fasta file with protein sequence
+    :param peptides_path: path to file with peptides
+    :param search_engine: one of alignment.SEARCH_ENGINES
+    :param progress: Progress object
+    :param max_mismatches: maximal amount of mismatches of peptide
+    :param equivalent_residues: strings of residues matched by each other
+    :return: Alignment object with searched peptides
+    """
+    with instrumentation.stage("read fasta"):
+        protein_seq = read_ref_seq_fasta(fasta_path)
+    with instrumentation.stage("read peptides"):
+        peptides_metadata = read_peptides(peptides_path)
+    alignment_obj = alignment.Alignment(
+        protein_seq=protein_seq,
+        peptides_metadata=peptides_metadata,
+        search_engine=search_engine,
+        max_mismatches=max_mismatches,
+        equivalent_residues=equivalent_residues,
+    )
+    progress.report("search")
+    alignment_obj.search_peptide_in_protein_seq()
+    return alignment_obj
+
+
+def run_analysis(
+    fasta_path: str,
+    peptides_path: str,
+    output_dir: str,
+    line_length: int = DEFAULT_LINE_LENGTH,
+    interline: int = DEFAULT_INTERLINE,
+    search_engine: str = "aho-corasick",
+    page_workers: Optional[int] = 1,
+    legend_format: str = "svg",
+    report_mode: str = "pages",
+    window_size: Optional[int] = None,
+    max_mismatches: int = 0,
+    equivalent_residues=(),
+    compact: bool = False,
+    compress: bool = False,
+    progress: Optional[Progress] = None,
+    alignment_cache: Optional[AlignmentCache] = None,
+) -> str:
+    """
+    Find peptides in protein sequence and write report.
+
+    With alignment cache, files analysed before in session are not read and
+    searched again, and pages which did not change are not rewritten.
+
+    :param fasta_path: path to fasta file with protein sequence
+    :param peptides_path: path to file with peptides
+    :param output_dir: directory where report is written
+    :param line_length: amount of amino acids in one line
+    :param interline: space between lines in pixels
+    :param search_engine: one of alignment.SEARCH_ENGINES
+    :param page_workers: amount of processes writing pages (None: amount
+    of CPUs, 1: pages are written in current process)
+    :param legend_format: "svg" or "png" color bar
+    :param report_mode: "pages" (html file for every group and sample),
+    "single" (one html file and data file) or "density" (html file for every
+    group and sample with heatmap of peptide depth)
+    :param window_size: amount of residues written into one html file of
+    page (None: page is not split, ignored in single mode)
+    :param max_mismatches: maximal amount of mismatches of peptide
+    :param equivalent_residues: strings of residues matched by each other
+    (like "IL"), peptides matched with mismatches or equivalences are
+    displayed in italics
+    :param compact: spans use css classes instead of inline styles (ignored
+    in single mode)
+    :param compress: pages are written as .html.gz files (ignored in single
+    mode)
+    :param progress: Progress object which receives stages of analysis and
+    can cancel it (progress.AnalysisCancelled is raised)
+    :param alignment_cache: AlignmentCache object kept during session
+    :return: path of page with all peptides (type All)
+    """
+    if progress is None:
+        progress = Progress()
+    with instrumentation.stage("analysis"):
+        progress.report("load")
+        input_key = None
+        alignment_obj = None
+        if alignment_cache is not None:
+            with instrumentation.stage("hash input files"):
+                input_key = alignment_cache.create_key(
+                    fasta_path,
+                    peptides_path,
+                    search_engine,
+                    max_mismatches,
+                    equivalent_residues,
+                )
+            alignment_obj = alignment_cache.get(input_key)
+        if alignment_obj is None:
+            alignment_obj = create_alignment(
+                fasta_path,
+                peptides_path,
+                search_engine,
+                progress,
+                max_mismatches,
+                equivalent_residues,
+            )
+            if alignment_cache is not None:
+                alignment_cache.add(input_key, alignment_obj)
+        return write_alignment_report(
+            alignment_obj,
+            output_dir,
+            line_length,
+            interline,
+            page_workers,
+            legend_format,
+            report_mode,
+            window_size,
+            compact,
+            compress,
+            progress,
+            input_key,
+        )
+
+
+def write_alignment_report(
+    alignment_obj,
+    output_dir: str,
+    line_length: int = DEFAULT_LINE_LENGTH,
+    interline: int = DEFAULT_INTERLINE,
+    page_workers: Optional[int] = 1,
+    legend_format: str = "svg",
+    report_mode: str = "pages",
+    window_size: Optional[int] = None,
+    compact: bool = False,
+    compress: bool = False,
+    progress: Optional[Progress] = None,
+    input_key: Optional[str] = None,
+) -> str:
+    """
+    Write report of searched alignment in selected mode.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param output_dir: directory where report is written
+    :param report_mode: one of REPORT_MODES, other parameters are the same
+    as parameters of run_analysis
+    :param input_key: key of input files (None: every page is written)
+    :return: path of page with all peptides (type All)
+    """
+    if progress is None:
+        progress = Progress()
+    with instrumentation.stage("write report"):
+        if report_mode == "single":
+            return write_single_page_report(
+                alignment_obj, output_dir, line_length, interline, progress
+            )
+        return write_report(
+            alignment_obj,
+            output_dir,
+            line_length,
+            interline,
+            page_workers,
+            legend_format,
+            progress,
+            input_key,
+            report_mode,
+            window_size,
+            compact,
+            compress,
+        )
+
+
+def read_manifest(manifest_path: str) -> list[Job]:
+    """
+    Read batch manifest.
+
+    Manifest is csv file with fasta, peptides and output_dir columns.
+    Relative paths are resolved against directory of manifest, job with
+    empty output_dir writes report into new run directory.
+
+    :param manifest_path: path to manifest file
+    :return: list of jobs
+    """
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline="") as manifest:
+        reader = csv.DictReader(manifest)
+        missing_columns = set(MANIFEST_COLUMNS) - set(reader.fieldnames or [])
+        if missing_columns:
+            raise ValueError(
+                f"Manifest {manifest_path} has no columns: "
+                f"{', '.join(sorted(missing_columns))}"
+            )
+        jobs = []
+        for row in reader:
+            fasta_path, peptides_path, output_dir = (
+                (row[column] or "").strip() for column in MANIFEST_COLUMNS
+            )
+            jobs.append(
+                Job(
+                    os.path.join(manifest_dir, fasta_path),
+                    os.path.join(manifest_dir, peptides_path),
+                    os.path.join(manifest_dir, output_dir)
+                    if output_dir
+                    else None,
+                )
+            )
+        return jobs
+
+
+def run_job(job: Job, reuse_run: bool = False, **options) -> JobResult:
+    """
+    Run one job of batch, errors are returned instead of raised.
+
+    :param job: job to run
+    :param reuse_run: job without output directory reuses the most recent
+    run of the same input files (only changed pages are rewritten)
+    :param options: keyword arguments of run_analysis
+    :return: JobResult object
+    """
+    try:
+        if job.output_dir is None:
+            with runs.open_run(job[:2], reuse=reuse_run) as run_dir:
+                # input key saved with pages lets reused run skip them
+                report_path = run_analysis(
+                    job.fasta,
+                    job.peptides,
+                    run_dir,
+                    alignment_cache=AlignmentCache(),
+                    **options,
+                )
+        else:
+            report_path = run_analysis(*job, **options)
+    except Exception as error:
+        return JobResult(job, None, f"{type(error).__name__}: {error}")
+    return JobResult(job, report_path, None)
+
+
+def run_batch(
+    jobs: list[Job], workers: Optional[int] = None, **options
+) -> list[JobResult]:
+    """
+    Run many analyses in process pool.
+
+    :param jobs: jobs to run
+    :param workers: amount of worker processes (default: amount of CPUs)
+    :param options: keyword arguments of run_job
+    :return: list of results in order of jobs
+    """
+    if workers == 1:
+        return [run_job(job, **options) for job in jobs]
+    # analyses in worker processes are not recorded
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=instrumentation.disable
+    ) as executor:
+        futures = [executor.submit(run_job, job, **options) for job in jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,56 @@
+"""Progress reporting and cancellation of analysis."""
+import threading
+from typing import Callable, Optional
+
+# stages of analysis in order, pages are laid out, rendered and written
+# one by one in "write" stage
+STAGES = ("load", "search", "write")
+
+
+class AnalysisCancelled(Exception):
+    """Analysis was cancelled by user."""
+
+
+class Progress:
+    """
+    Receiver of progress of one analysis.
+
+    Analysis reports every step (stage, done, total), the callback gets it
+    in thread of analysis. Cancel can be called from any thread, analysis
+    stops at the next reported step (between pages while writing report).
+    """
+
+    def __init__(
+        self, callback: Optional[Callable[[str, int, int], None]] = None
+    ):
+        """
+        Create receiver of progress.
+
+        :param callback: function called with stage, done and total of every
+        reported step (None: steps are only checked for cancel)
+        """
+        self.callback = callback
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """
+        Stop analysis at the next reported step.
+
+        :return: None
+        """
+        self.cancelled.set()
+
+    def report(self, stage: str, done: int = 0, total: int = 1) -> None:
+        """
+        Report step of analysis.
+
+        :param stage: one of STAGES
+        :param done: amount of finished parts of stage
+        :param total: amount of all parts of stage
+        :return: None
+        :raises AnalysisCancelled: if analysis was cancelled
+        """
+        if self.cancelled.is_set():
+            raise AnalysisCancelled
+        if self.callback is not None:
+            self.callback(stage, done, total)
@@ -0,0 +1,179 @@
+"""FM-index of reference protein sequence with on-disk cache."""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import cache
+
+INDEX_FORMAT_VERSION = 1
+CHECKPOINT_STEP = 64
+INDEX_ARRAYS = ("suffix_array", "bwt", "occ_checkpoints", "first", "symbols")
+
+
+class ProteinIndex:
+    """
+    FM-index (suffix array + Burrows-Wheeler transform) of protein sequence.
+
+    Lookup of peptide costs O(peptide length + occurrences): backward search
+    finds range of suffix array and suffix array gives start positions.
+    """
+
+    def __init__(self, suffix_array, bwt, occ_checkpoints, first, symbols):
+        self.suffix_array = suffix_array
+        self.bwt = bwt
+        self.occ_checkpoints = occ_checkpoints
+        self.first = first
+        self.symbols = symbols
+        self.codes = {
+            chr(symbol): code
+            for code, symbol in enumerate(symbols.tolist(), start=1)
+        }
+
+    @classmethod
+    def build(cls, protein_seq: str) -> "ProteinIndex":
+        """
+        Build index of protein sequence.
+
+        :param protein_seq: protein sequence
+        :return: ProteinIndex object
+        """
+        text = np.frombuffer(protein_seq.encode("ascii"), dtype=np.uint8)
+        symbols, text_codes = np.unique(text, return_inverse=True)
+        # code 0 is sentinel ($) which is smaller than every amino acid
+        text_codes = np.append(text_codes.astype(np.uint8) + 1, 0)
+        suffix_array = create_suffix_array(text_codes)
+        bwt = text_codes[suffix_array - 1]
+        alphabet_size = len(symbols) + 1
+        first = np.zeros(alphabet_size + 1, dtype=np.int64)
+        first[1:] = np.cumsum(np.bincount(bwt, minlength=alphabet_size))
+        occ_checkpoints = np.zeros(
+            (len(bwt) // CHECKPOINT_STEP + 1, alphabet_size), dtype=np.int64
+        )
+        for code in range(alphabet_size):
+            occ_checkpoints[1:, code] = np.cumsum(bwt == code, dtype=np.int64)[
+                CHECKPOINT_STEP - 1 :: CHECKPOINT_STEP
+            ]
+        return cls(
+            suffix_array.astype(np.int64),
+            bwt,
+            occ_checkpoints,
+            first,
+            symbols.astype(np.uint8),
+        )
+
+    @classmethod
+    def load(cls, directory: str) -> "ProteinIndex":
+        """
+        Load saved index, big arrays are memory-mapped.
+
+        :param directory: directory where index was saved
+        :return: ProteinIndex object
+        """
+        return cls(
+            *(
+                np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                for name in INDEX_ARRAYS
+            )
+        )
+
+    def save(self, directory: str) -> None:
+        """
+        Save index into directory (written atomically).
+
+        :param directory: directory where index will be saved
+        :return: None
+        """
+        parent_dir = os.path.dirname(directory)
+        os.makedirs(parent_dir, exist_ok=True)
+        temporary_dir = tempfile.mkdtemp(dir=parent_dir)
+        for name in INDEX_ARRAYS:
+            np.save(
+                os.path.join(temporary_dir, f"{name}.npy"),
+                getattr(self, name),
+            )
+        try:
+            os.replace(temporary_dir, directory)
+        except OSError:
+            # other process saved the same index in the meantime
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+
+    @classmethod
+    def load_or_build(cls, protein_seq: str) -> "ProteinIndex":
+        """
+        Load index of protein sequence from cache or build and save it.
+
+        :param protein_seq: protein sequence
+        :return: ProteinIndex object
+        """
+        directory = os.path.join(
+            cache.cache_dir("index"),
+            f"v{INDEX_FORMAT_VERSION}-{cache.hash_text(protein_seq)}",
+        )
+        if os.path.isdir(directory):
+            return cls.load(directory)
+        protein_index = cls.build(protein_seq)
+        protein_index.save(directory)
+        return protein_index
+
+    def rank(self, code: int, position: int) -> int:
+        """
+        Count occurrences of symbol in bwt[:position].
+
+        :param code: code of symbol
+        :param position: end (exclusive) of counted bwt prefix
+        :return: amount of symbol
+        """
+        checkpoint = position // CHECKPOINT_STEP
+        checkpoint_position = checkpoint * CHECKPOINT_STEP
+        return int(self.occ_checkpoints[checkpoint, code]) + int(
+            np.count_nonzero(self.bwt[checkpoint_position:position] == code)
+        )
+
+    def search(self, peptide_seq: str) -> list[int]:
+        """
+        Find every occurrence of peptide with backward search.
+
+        :param peptide_seq: peptide sequence
+        :return: list of start positions in ascending order
+        """
+        low = 0
+        high = len(self.bwt)
+        for amino_acid in reversed(peptide_seq):
+            code = self.codes.get(amino_acid)
+            if code is None:
+                return []
+            low = int(self.first[code]) + self.rank(code, low)
+            high = int(self.first[code]) + self.rank(code, high)
+            if low >= high:
+                return []
+        return sorted(self.suffix_array[low:high].tolist())
+
+
+# Static functions
+def create_suffix_array(text_codes: np.ndarray) -> np.ndarray:
+    """
+    Create suffix array with prefix doubling.
+
+    :param text_codes: codes of text ending with unique smallest sentinel
+    :return: array of start positions of sorted suffixes
+    """
+    text_len = len(text_codes)
+    ranks = text_codes.astype(np.int64)
+    suffix_array = np.argsort(ranks, kind="stable")
+    shift = 1
+    while True:
+        next_ranks = np.full(text_len, -1, dtype=np.int64)
+        next_ranks[: text_len - shift] = ranks[shift:]
+        suffix_array = np.lexsort((next_ranks, ranks))
+        sorted_ranks = ranks[suffix_array]
+        sorted_next_ranks = next_ranks[suffix_array]
+        new_group = (sorted_ranks[1:] != sorted_ranks[:-1]) | (
+            sorted_next_ranks[1:] != sorted_next_ranks[:-1]
+        )
+        ranks = np.empty(text_len, dtype=np.int64)
+        ranks[suffix_array] = np.concatenate(([0], np.cumsum(new_group)))
+        if ranks.max() == text_len - 1:
+            return suffix_array
+        shift *= 2
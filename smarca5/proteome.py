@@ -0,0 +1,420 @@
+"""Proteome-wide analysis, one report for every protein of fasta file.
+
+Peptide table is split by accessions of Proteins column and every peptide
+is searched only in sequences of proteins it claims.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import escape
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+import alignment
+import fasta
+import html_renderer
+import instrumentation
+import pipeline
+import residue_coverage
+from progress import AnalysisCancelled, Progress
+
+PROTEIN_SEPARATOR = ";"
+INDEX_NAME = "index.html"
+# characters of accession replaced in name of report directory
+UNSAFE_PATH_CHARACTERS = re.compile(r"[^\w.-]")
+# search options of run_analysis, the other options are passed to
+# pipeline.write_alignment_report
+SEARCH_OPTIONS = ("search_engine", "max_mismatches", "equivalent_residues")
+
+
+class ProteinJob(NamedTuple):
+    """Analysis of one protein of proteome."""
+
+    accession: str
+    record: fasta.FastaRecord
+    protein_seq: str
+    peptides: pd.DataFrame
+    output_dir: str
+
+
+class ProteinResult(NamedTuple):
+    """Result of analysis of one protein."""
+
+    accession: str
+    record: fasta.FastaRecord
+    peptide_count: int  # rows of peptide table claiming protein
+    matched_count: int  # rows found in protein sequence
+    coverage: float
+    report_path: Optional[str]
+    error: Optional[str]
+
+
+def split_accessions(proteins: str) -> list[str]:
+    """
+    Split value of Proteins column into accessions.
+
+    :param proteins: accessions separated by PROTEIN_SEPARATOR
+    :return: distinct accessions in order of value
+    """
+    accessions = (
+        accession.strip() for accession in proteins.split(PROTEIN_SEPARATOR)
+    )
+    return list(dict.fromkeys(filter(None, accessions)))
+
+
+def split_peptides_by_protein(
+    peptides_dataframe: pd.DataFrame,
+) -> dict[str, np.ndarray]:
+    """
+    Find rows of peptide table claiming every protein.
+
+    Row with many accessions belongs to all of them, every distinct value of
+    Proteins column is split once.
+
+    :param peptides_dataframe: DataFrame with Proteins column
+    :return: dictionary where key is accession and value is sorted row
+    positions, accessions are in order of the first row
+    """
+    codes, protein_lists = pd.factorize(peptides_dataframe["Proteins"])
+    row_order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(
+        codes[row_order], np.arange(len(protein_lists) + 1)
+    )
+    parts: dict[str, list[np.ndarray]] = {}
+    for code, protein_list in enumerate(protein_lists):
+        rows = row_order[bounds[code] : bounds[code + 1]]
+        for accession in split_accessions(str(protein_list)):
+            parts.setdefault(accession, []).append(rows)
+    groups = {
+        accession: np.unique(np.concatenate(rows))
+        for accession, rows in parts.items()
+    }
+    return dict(sorted(groups.items(), key=lambda group: group[1][0]))
+
+
+def find_record_accession(name: str) -> str:
+    """
+    Find accession in name of fasta record.
+
+    :param name: name of record, like sp|O60264|SMCA5_HUMAN (UniProt) or
+    O60264
+    :return: accession (the second field of UniProt name or whole name)
+    """
+    fields = name.split("|")
+    if len(fields) >= 3:
+        return fields[1]
+    return name
+
+
+def create_record_lookup(names) -> dict[str, str]:
+    """
+    Map accessions used in peptide tables to names of fasta records.
+
+    Record is found by its whole name and by accession and entry name of
+    UniProt name (sp|O60264|SMCA5_HUMAN by O60264 and SMCA5_HUMAN). Whole
+    names take precedence, ambiguous fields map to the first record.
+
+    :param names: names of records in file order
+    :return: dictionary where key is accession and value is record name
+    """
+    lookup = {name: name for name in names}
+    for name in names:
+        fields = name.split("|")
+        if len(fields) >= 3:
+            for field in fields[1:]:
+                if field:
+                    lookup.setdefault(field, name)
+    return lookup
+
+
+def create_report_dir_name(accession: str) -> str:
+    """
+    Create name of report directory of protein.
+
+    :param accession: accession of protein
+    :return: accession with characters unsafe in paths replaced by "_"
+    """
+    return UNSAFE_PATH_CHARACTERS.sub("_", accession) or "_"
+
+
+def select_peptides(
+    peptides_dataframe: pd.DataFrame, rows: np.ndarray
+) -> pd.DataFrame:
+    """
+    Select rows of peptide table sent to analysis of one protein.
+
+    Unused categories are removed, so job does not carry proteins and
+    experiments of whole table.
+
+    :param peptides_dataframe: DataFrame read by pipeline.read_peptides
+    :param rows: row positions
+    :return: DataFrame with selected rows
+    """
+    peptides = peptides_dataframe.iloc[rows].reset_index(drop=True)
+    for column in peptides.select_dtypes("category"):
+        peptides[column] = peptides[column].cat.remove_unused_categories()
+    return peptides
+
+
+def create_protein_jobs(
+    fasta_path: str, peptides_dataframe: pd.DataFrame, output_dir: str
+) -> tuple[list[ProteinJob], dict[str, int]]:
+    """
+    Match accessions of peptide table to records of fasta file.
+
+    Accessions naming the same record are merged into one job.
+
+    :param fasta_path: path to multi-record fasta file
+    :param peptides_dataframe: DataFrame read by pipeline.read_peptides
+    :param output_dir: directory of proteome report, every protein is
+    written into its subdirectory
+    :return: jobs in order of fasta records and dictionary where key is
+    accession without record and value is amount of its peptide rows
+    """
+    with instrumentation.stage("split peptides"):
+        groups = split_peptides_by_protein(peptides_dataframe)
+    rows_of_records: dict[str, list[np.ndarray]] = {}
+    unmatched: dict[str, int] = {}
+    with fasta.FastaFile(fasta_path) as fasta_file:
+        lookup = create_record_lookup(fasta_file.names)
+        for accession, rows in groups.items():
+            name = lookup.get(accession)
+            if name is None:
+                unmatched[accession] = len(rows)
+            else:
+                rows_of_records.setdefault(name, []).append(rows)
+        jobs = []
+        for name in fasta_file.names:
+            if name not in rows_of_records:
+                continue
+            accession = find_record_accession(name)
+            jobs.append(
+                ProteinJob(
+                    accession,
+                    fasta_file.index[name],
+                    fasta_file.sequence(name),
+                    select_peptides(
+                        peptides_dataframe,
+                        np.unique(np.concatenate(rows_of_records[name])),
+                    ),
+                    os.path.join(
+                        output_dir, create_report_dir_name(accession)
+                    ),
+                )
+            )
+    instrumentation.count("proteins", len(jobs))
+    return jobs, unmatched
+
+
+def run_protein(job: ProteinJob, **options) -> ProteinResult:
+    """
+    Search peptides of one protein and write its report.
+
+    Errors are returned instead of raised, so one failed protein does not
+    stop analysis of the others.
+
+    :param job: ProteinJob object
+    :param options: keyword arguments of run_analysis (without paths)
+    :return: ProteinResult object
+    """
+    search_options = {
+        name: options.pop(name) for name in SEARCH_OPTIONS if name in options
+    }
+    try:
+        alignment_obj = alignment.Alignment(
+            job.protein_seq, job.peptides, **search_options
+        )
+        alignment_obj.search_peptide_in_protein_seq()
+        report_path = pipeline.write_alignment_report(
+            alignment_obj, job.output_dir, **options
+        )
+    except Exception as error:
+        return ProteinResult(
+            job.accession,
+            job.record,
+            len(job.peptides),
+            0,
+            0.0,
+            None,
+            f"{type(error).__name__}: {error}",
+        )
+    peptide_table = alignment_obj.peptide_table
+    depth = residue_coverage.create_depth(
+        len(job.protein_seq), peptide_table.starts, peptide_table.ends
+    )
+    return ProteinResult(
+        job.accession,
+        job.record,
+        len(job.peptides),
+        len(peptide_table),
+        float(np.count_nonzero(depth)) / max(len(depth), 1),
+        report_path,
+        None,
+    )
+
+
+def run_protein_jobs(
+    jobs: list[ProteinJob],
+    workers: Optional[int],
+    progress: Progress,
+    **options,
+) -> list[ProteinResult]:
+    """
+    Run analyses of proteins in process pool.
+
+    :param jobs: jobs to run
+    :param workers: amount of worker processes (default: amount of CPUs,
+    1: proteins are analysed in current process)
+    :param progress: Progress object, "write" stage counts proteins
+    :param options: keyword arguments of run_protein
+    :return: list of results in order of jobs
+    """
+    progress.report("write", 0, len(jobs))
+    if workers == 1:
+        results = []
+        for job in jobs:
+            results.append(run_protein(job, **options))
+            progress.report("write", len(results), len(jobs))
+        return results
+    # analyses in worker processes are not recorded
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=instrumentation.disable
+    ) as executor:
+        futures = [
+            executor.submit(run_protein, job, **options) for job in jobs
+        ]
+        try:
+            for done, _ in enumerate(as_completed(futures), 1):
+                progress.report("write", done, len(jobs))
+        except AnalysisCancelled:
+            for future in futures:
+                future.cancel()
+            raise
+        return [future.result() for future in futures]
+
+
+def create_report_href(report_path: str, output_dir: str) -> str:
+    """
+    Create link from index page to report of protein.
+
+    :param report_path: path of page with all peptides
+    :param output_dir: directory of index page
+    :return: relative url (compressed page is linked by .html name)
+    """
+    if report_path.endswith(html_renderer.GZIP_SUFFIX):
+        report_path = report_path[: -len(html_renderer.GZIP_SUFFIX)]
+    return os.path.relpath(report_path, output_dir).replace(os.sep, "/")
+
+
+def render_index(
+    results: list[ProteinResult], unmatched: dict[str, int], output_dir: str
+) -> str:
+    """
+    Render index page of proteome report.
+
+    :param results: results of analyses of proteins
+    :param unmatched: accessions without fasta record and amounts of their
+    peptide rows
+    :param output_dir: directory of index page
+    :return: html of page
+    """
+    rows = []
+    for result in results:
+        if result.report_path is None:
+            protein = escape(result.accession)
+            report = f'<td class="error">{escape(result.error)}</td>'
+        else:
+            protein = '<a href="{}">{}</a>'.format(
+                escape(create_report_href(result.report_path, output_dir)),
+                escape(result.accession),
+            )
+            report = "<td></td>"
+        rows.append(
+            f"<tr><td>{protein}</td>"
+            f"<td>{escape(result.record.description)}</td>"
+            f"<td>{result.record.length}</td>"
+            f"<td>{result.peptide_count}</td>"
+            f"<td>{result.matched_count}</td>"
+            f"<td>{result.coverage:.1%}</td>"
+            f"{report}</tr>"
+        )
+    unmatched_items = "".join(
+        f"<li>{escape(accession)} ({count} peptides)</li>"
+        for accession, count in unmatched.items()
+    )
+    unmatched_list = ""
+    if unmatched:
+        unmatched_list = (
+            "<h2>Proteins without fasta record</h2>"
+            f"<ul>{unmatched_items}</ul>"
+        )
+    return (
+        '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+        "<title>Proteome</title>"
+        '<link rel="stylesheet" href="style.css"></head>'
+        '<body><div class="proteome"><h1>Proteome</h1>'
+        "<table><tr><th>Protein</th><th>Description</th><th>Length</th>"
+        "<th>Peptides</th><th>Found</th><th>Coverage</th><th></th></tr>"
+        f"{''.join(rows)}</table>{unmatched_list}</div></body></html>\n"
+    )
+
+
+def write_index(
+    results: list[ProteinResult], unmatched: dict[str, int], output_dir: str
+) -> str:
+    """
+    Write index page linking reports of proteins.
+
+    :param results: results of analyses of proteins
+    :param unmatched: accessions without fasta record and amounts of their
+    peptide rows
+    :param output_dir: directory of proteome report
+    :return: path of index page
+    """
+    pipeline.copy_static_files(output_dir, "style.css")
+    index_path = os.path.join(output_dir, INDEX_NAME)
+    with open(index_path, "w", encoding="utf-8") as index:
+        index.write(render_index(results, unmatched, output_dir))
+    return index_path
+
+
+def run_proteome(
+    fasta_path: str,
+    peptides_path: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    progress: Optional[Progress] = None,
+    **options,
+) -> tuple[str, list[ProteinResult]]:
+    """
+    Write report of every protein of fasta file claimed by peptides.
+
+    Peptide table is read once, every accession of Proteins column is
+    matched to fasta record and report of protein is written into
+    subdirectory of output directory named by its accession.
+
+    :param fasta_path: path to multi-record fasta file
+    :param peptides_path: path to file with peptides
+    :param output_dir: directory of proteome report
+    :param workers: amount of worker processes (default: amount of CPUs,
+    1: proteins are analysed in current process)
+    :param progress: Progress object ("write" stage counts proteins)
+    :param options: keyword arguments of run_analysis (without paths)
+    :return: path of index page and results in order of fasta records
+    """
+    if progress is None:
+        progress = Progress()
+    with instrumentation.stage("proteome"):
+        progress.report("load")
+        with instrumentation.stage("read peptides"):
+            peptides_dataframe = pipeline.read_peptides(peptides_path)
+        jobs, unmatched = create_protein_jobs(
+            fasta_path, peptides_dataframe, output_dir
+        )
+        del peptides_dataframe
+        progress.report("search")
+        results = run_protein_jobs(jobs, workers, progress, **options)
+        with instrumentation.stage("write index"):
+            return write_index(results, unmatched, output_dir), results
@@ -0,0 +1,117 @@
+"""Per-residue peptide depth and coverage of experiments."""
+from typing import NamedTuple
+
+import numpy as np
+
+# maximal amount of colors of depth heatmap
+DEPTH_LEVELS = 10
+
+
+class ExperimentCoverage(NamedTuple):
+    """Depth and coverage of protein sequence in one experiment."""
+
+    depth: np.ndarray
+    coverage: float
+    max_depth: int
+
+
+def create_depth(protein_seq_len: int, starts, ends) -> np.ndarray:
+    """
+    Count peptides covering every residue of protein sequence.
+
+    Difference array gets +1 at start and -1 at end of every peptide, its
+    cumulative sum is depth, so cost does not depend on lengths of peptides.
+
+    :param protein_seq_len: length of protein sequence
+    :param starts: start positions of peptides
+    :param ends: end positions (exclusive) of peptides
+    :return: array with amount of peptides covering every residue
+    """
+    difference = np.bincount(
+        np.asarray(starts, dtype=np.int64), minlength=protein_seq_len + 1
+    ) - np.bincount(
+        np.asarray(ends, dtype=np.int64), minlength=protein_seq_len + 1
+    )
+    return np.cumsum(difference[:protein_seq_len])
+
+
+def create_experiment_coverage(
+    alignment_obj, type_of_experiment, experiment
+) -> ExperimentCoverage:
+    """
+    Calculate depth and coverage of protein sequence in one experiment.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param type_of_experiment: "group" or "sample"
+    :param experiment: group or sample name
+    :return: ExperimentCoverage object
+    """
+    peptides = alignment_obj.peptide_table_of_experiment(
+        type_of_experiment, experiment
+    )
+    depth = create_depth(
+        len(alignment_obj.protein_seq), peptides.starts, peptides.ends
+    )
+    return ExperimentCoverage(
+        depth,
+        float(np.count_nonzero(depth)) / max(len(depth), 1),
+        int(depth.max(initial=0)),
+    )
+
+
+def create_depth_levels(
+    max_depth: int, max_levels: int = DEPTH_LEVELS
+) -> tuple[int, ...]:
+    """
+    Divide depths into levels (colors of heatmap).
+
+    :param max_depth: maximal depth of protein sequence
+    :param max_levels: maximal amount of levels
+    :return: sorted upper bounds of levels, every depth has own level if
+    there are not more depths than levels
+    """
+    if max_depth <= max_levels:
+        return tuple(range(1, max_depth + 1))
+    return tuple(
+        np.unique(np.ceil(np.linspace(0, max_depth, max_levels + 1)[1:]))
+        .astype(int)
+        .tolist()
+    )
+
+
+def find_depth_runs(depth: np.ndarray, levels, line_length: int):
+    """
+    Split covered residues into runs with the same level of depth.
+
+    Run does not cross border of protein line.
+
+    :param depth: result of create_depth
+    :param levels: result of create_depth_levels
+    :param line_length: amount of amino acids in one line
+    :return: arrays of start, end (exclusive), level, minimal and maximal
+    depth of every run
+    """
+    residue_levels = np.where(
+        depth > 0, np.searchsorted(np.asarray(levels), depth), -1
+    )
+    positions = np.arange(len(depth))
+    is_run_start = np.ones(len(depth), dtype=bool)
+    is_run_start[1:] = (residue_levels[1:] != residue_levels[:-1]) | (
+        positions[1:] % line_length == 0
+    )
+    run_starts = np.flatnonzero(is_run_start)
+    run_ends = np.append(run_starts[1:], len(depth))
+    if not len(run_starts):
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty, empty
+    min_depths = np.minimum.reduceat(depth, run_starts)
+    max_depths = np.maximum.reduceat(depth, run_starts)
+    run_levels = residue_levels[run_starts]
+    is_covered = run_levels >= 0
+    return (
+        run_starts[is_covered],
+        run_ends[is_covered],
+        run_levels[is_covered],
+        min_depths[is_covered],
+        max_depths[is_covered],
+    )
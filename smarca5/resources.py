@@ -0,0 +1,12 @@
+"""Paths of files shipped with application (also inside exe version)."""
+import os
+
+
+def load_file(file_name: str) -> str:
+    """
+    Load file in correct format for creating exe one-file.
+
+    :param: file_name: filename to load
+    :return: str of correct path to file
+    """
+    return os.path.join(os.path.dirname(__file__), file_name)
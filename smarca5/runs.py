@@ -0,0 +1,389 @@
+"""Run-scoped output directories of analyses.
+
+Every analysis writes its report into own directory inside runs directory,
+so analyses of many windows or processes do not overwrite each other. Run
+in progress holds lock file, runs without lock can be reused by analysis of
+the same input files or removed by retention.
+"""
+import contextlib
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Iterator, Optional
+
+RUNS_DIR_ENV_VARIABLE = "SMARCA5_RUNS_DIR"
+KEEP_RUNS_ENV_VARIABLE = "SMARCA5_KEEP_RUNS"
+MAX_RUN_AGE_ENV_VARIABLE = "SMARCA5_MAX_RUN_AGE"
+# file with inputs and times of run, directory without it is not a run
+RUN_INFO_NAME = "run.json"
+LOCK_NAME = "run.lock"
+# lock of older run is left by crashed process
+STALE_LOCK_AGE = 24 * 60 * 60
+# running analysis touches its lock, so long analysis is not taken as stale
+LOCK_REFRESH_INTERVAL = 60 * 60
+# suffix of run renamed before removal (name starts with ".")
+DELETING_SUFFIX = ".deleting"
+# amount of runs kept by GUI (unless SMARCA5_KEEP_RUNS is set)
+DEFAULT_KEEP_RUNS = 20
+# origin of run saved in run.json, GUI removes only runs it created
+CLI_ORIGIN = "cli"
+GUI_ORIGIN = "gui"
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def runs_dir() -> str:
+    """
+    Return (and create) directory with runs.
+
+    Runs are placed in ~/.smarca5/runs unless SMARCA5_RUNS_DIR environment
+    variable points somewhere else.
+
+    :return: path of directory
+    """
+    directory = os.environ.get(RUNS_DIR_ENV_VARIABLE) or os.path.join(
+        os.path.expanduser("~"), ".smarca5", "runs"
+    )
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def acquire_lock(run_dir: str) -> bool:
+    """
+    Lock run, creation of lock file is atomic.
+
+    :param run_dir: directory of run
+    :return: True if run was locked by this call
+    """
+    try:
+        with open(os.path.join(run_dir, LOCK_NAME), "x") as lock:
+            lock.write(str(os.getpid()))
+    except FileExistsError:
+        return False
+    return True
+
+
+def release_lock(run_dir: str) -> None:
+    """
+    Unlock run.
+
+    :param run_dir: directory of run
+    :return: None
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(run_dir, LOCK_NAME))
+
+
+def is_locked(run_dir: str) -> bool:
+    """
+    Check if run is used by analysis (lock older than STALE_LOCK_AGE is
+    ignored).
+
+    :param run_dir: directory of run
+    :return: True if run has fresh lock
+    """
+    try:
+        lock_time = os.path.getmtime(os.path.join(run_dir, LOCK_NAME))
+    except FileNotFoundError:
+        return False
+    return time.time() - lock_time < STALE_LOCK_AGE
+
+
+def break_stale_lock(run_dir: str) -> bool:
+    """
+    Remove lock left by crashed process.
+
+    Lock is renamed (atomically) before removal and compared with the lock
+    found stale, so fresh lock created meanwhile by other analysis is given
+    back instead of removed.
+
+    :param run_dir: directory of run
+    :return: True if stale lock was removed
+    """
+    lock_path = os.path.join(run_dir, LOCK_NAME)
+    try:
+        lock_stat = os.stat(lock_path)
+    except FileNotFoundError:
+        return False
+    if time.time() - lock_stat.st_mtime < STALE_LOCK_AGE:
+        return False
+    taken_path = f"{lock_path}.{os.getpid()}"
+    try:
+        os.rename(lock_path, taken_path)
+    except FileNotFoundError:
+        # other process removed or took over lock first
+        return False
+    taken_stat = os.stat(taken_path)
+    if (taken_stat.st_ino, taken_stat.st_mtime_ns) != (
+        lock_stat.st_ino,
+        lock_stat.st_mtime_ns,
+    ):
+        # fresh lock of other analysis, it is left renamed if it can not be
+        # given back
+        with contextlib.suppress(FileExistsError):
+            os.link(taken_path, lock_path)
+            os.remove(taken_path)
+        return False
+    os.remove(taken_path)
+    return True
+
+
+def refresh_lock(run_dir: str, stopped: threading.Event) -> None:
+    """
+    Touch lock of running analysis until it is stopped (run in thread).
+
+    :param run_dir: directory of run
+    :param stopped: event set when analysis finished
+    :return: None
+    """
+    lock_path = os.path.join(run_dir, LOCK_NAME)
+    while not stopped.wait(LOCK_REFRESH_INTERVAL):
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(lock_path)
+
+
+def read_run_info(run_dir: str) -> Optional[dict]:
+    """
+    Read information about run.
+
+    :param run_dir: directory of run
+    :return: dictionary with inputs, created and finished (None if run is
+    not finished) time or None if directory is not a run
+    """
+    try:
+        with open(os.path.join(run_dir, RUN_INFO_NAME)) as run_info:
+            return json.load(run_info)
+    except (OSError, ValueError):
+        return None
+
+
+def save_run_info(run_dir: str, run_info: dict) -> None:
+    """
+    Save information about run.
+
+    :param run_dir: directory of run
+    :param run_info: dictionary which can be saved as json
+    :return: None
+    """
+    with open(os.path.join(run_dir, RUN_INFO_NAME), "w") as run_info_file:
+        json.dump(run_info, run_info_file, indent=2)
+
+
+def create_run(
+    inputs, base_dir: Optional[str] = None, origin: str = CLI_ORIGIN
+) -> str:
+    """
+    Create new locked run directory named by time of creation.
+
+    Name has also id of process and number of attempt, creation of
+    directory fails if other analysis created it first.
+
+    :param inputs: paths of input files of analysis
+    :param base_dir: directory with runs (default: runs_dir())
+    :param origin: CLI_ORIGIN or GUI_ORIGIN
+    :return: path of run directory
+    """
+    prefix = os.path.join(
+        base_dir or runs_dir(),
+        time.strftime("%Y%m%d-%H%M%S-") + str(os.getpid()),
+    )
+    attempt = 0
+    while True:
+        run_dir = f"{prefix}-{attempt}"
+        try:
+            os.mkdir(run_dir)
+        except FileExistsError:
+            attempt += 1
+        else:
+            break
+    acquire_lock(run_dir)
+    save_run_info(
+        run_dir,
+        {
+            "inputs": [os.path.abspath(path) for path in inputs],
+            "origin": origin,
+            "created": time.time(),
+            "finished": None,
+        },
+    )
+    return run_dir
+
+
+def find_runs(base_dir: Optional[str] = None) -> list[str]:
+    """
+    Find run directories.
+
+    :param base_dir: directory with runs (default: runs_dir())
+    :return: paths of runs from the most recently used
+    """
+    base_dir = base_dir or runs_dir()
+    runs = []
+    for entry in os.scandir(base_dir):
+        # runs being removed are hidden
+        if not entry.is_dir() or entry.name.startswith("."):
+            continue
+        run_info = read_run_info(entry.path)
+        if run_info is not None:
+            last_used = run_info.get("finished") or run_info.get("created", 0)
+            runs.append((last_used, entry.path))
+    runs.sort(reverse=True)
+    return [run_dir for _, run_dir in runs]
+
+
+def find_origin(run_info: dict) -> str:
+    """
+    Find origin of run (runs created before origin was saved are CLI runs).
+
+    :param run_info: result of read_run_info
+    :return: CLI_ORIGIN or GUI_ORIGIN
+    """
+    return run_info.get("origin", CLI_ORIGIN)
+
+
+def reuse_run(
+    inputs, base_dir: Optional[str] = None, origin: str = CLI_ORIGIN
+) -> Optional[str]:
+    """
+    Lock the most recent finished run of the same input files and origin.
+
+    Pages of reused run are rewritten only if input files or options
+    changed (see pipeline.write_report). Runs of other origin are not
+    reused, so GUI does not rewrite report of command line and its cleanup
+    does not remove it.
+
+    :param inputs: paths of input files of analysis
+    :param base_dir: directory with runs (default: runs_dir())
+    :param origin: CLI_ORIGIN or GUI_ORIGIN
+    :return: path of locked run directory or None if there is no such run
+    not used by other analysis
+    """
+    inputs = [os.path.abspath(path) for path in inputs]
+    for run_dir in find_runs(base_dir):
+        run_info = read_run_info(run_dir)
+        if (
+            run_info is not None
+            and run_info.get("finished") is not None
+            and run_info.get("inputs") == inputs
+            and find_origin(run_info) == origin
+            and acquire_lock(run_dir)
+        ):
+            return run_dir
+    return None
+
+
+@contextlib.contextmanager
+def open_run(
+    inputs,
+    base_dir: Optional[str] = None,
+    reuse: bool = False,
+    origin: str = CLI_ORIGIN,
+) -> Iterator[str]:
+    """
+    Lock run directory during analysis (use as context manager).
+
+    Lock is refreshed while analysis runs, run is marked as finished only if
+    analysis did not raise.
+
+    :param inputs: paths of input files of analysis
+    :param base_dir: directory with runs (default: runs_dir())
+    :param reuse: reuse the most recent finished run of the same input files
+    (new run is created if there is none)
+    :param origin: origin of run (CLI_ORIGIN or GUI_ORIGIN)
+    :return: context manager giving path of run directory
+    """
+    run_dir = reuse_run(inputs, base_dir, origin) if reuse else None
+    if run_dir is None:
+        run_dir = create_run(inputs, base_dir, origin)
+    stopped = threading.Event()
+    threading.Thread(
+        target=refresh_lock, args=(run_dir, stopped), daemon=True
+    ).start()
+    try:
+        yield run_dir
+        run_info = read_run_info(run_dir) or {}
+        run_info["finished"] = time.time()
+        save_run_info(run_dir, run_info)
+    finally:
+        stopped.set()
+        release_lock(run_dir)
+
+
+def clean_runs(
+    keep: Optional[int] = None,
+    max_age: Optional[float] = None,
+    base_dir: Optional[str] = None,
+    origin: Optional[str] = None,
+) -> list[str]:
+    """
+    Remove old runs not used by any analysis.
+
+    :param keep: amount of the most recently used runs which are kept,
+    runs used by analyses are not counted (None: no limit)
+    :param max_age: runs not used for longer time (in days) are removed
+    (None: no limit)
+    :param base_dir: directory with runs (default: runs_dir())
+    :param origin: only runs of this origin are counted and removed (None:
+    every run)
+    :return: paths of removed runs
+    """
+    removed = []
+    now = time.time()
+    unlocked_runs = (
+        run_dir
+        for run_dir in find_runs(base_dir)
+        if not is_locked(run_dir)
+        and (
+            origin is None
+            or find_origin(read_run_info(run_dir) or {}) == origin
+        )
+    )
+    for position, run_dir in enumerate(unlocked_runs):
+        run_info = read_run_info(run_dir) or {}
+        last_used = run_info.get("finished") or run_info.get("created", 0)
+        is_old = (keep is not None and position >= keep) or (
+            max_age is not None and now - last_used > max_age * SECONDS_PER_DAY
+        )
+        if not is_old:
+            continue
+        # lock prevents reuse of run while it is removed, run locked by
+        # other analysis after it was found is skipped
+        if not acquire_lock(run_dir):
+            if not break_stale_lock(run_dir) or not acquire_lock(run_dir):
+                continue
+        # run is hidden (atomically) before its files and lock are removed
+        deleting_dir = os.path.join(
+            os.path.dirname(run_dir),
+            f".{os.path.basename(run_dir)}{DELETING_SUFFIX}",
+        )
+        try:
+            os.rename(run_dir, deleting_dir)
+        except OSError:
+            release_lock(run_dir)
+            continue
+        shutil.rmtree(deleting_dir, ignore_errors=True)
+        removed.append(run_dir)
+    return removed
+
+
+def clean_runs_from_environment(
+    default_keep: Optional[int] = None, origin: Optional[str] = None
+) -> list[str]:
+    """
+    Remove old runs, retention is set by SMARCA5_KEEP_RUNS (amount of runs)
+    and SMARCA5_MAX_RUN_AGE (days) environment variables.
+
+    :param default_keep: amount of kept runs if SMARCA5_KEEP_RUNS is not set
+    (None: runs are not removed unless variables are set)
+    :param origin: only runs of this origin are removed (None: every run)
+    :return: paths of removed runs
+    """
+    keep = os.environ.get(KEEP_RUNS_ENV_VARIABLE)
+    max_age = os.environ.get(MAX_RUN_AGE_ENV_VARIABLE)
+    if not keep and not max_age and default_keep is None:
+        return []
+    return clean_runs(
+        int(keep) if keep else default_keep,
+        float(max_age) if max_age else None,
+        origin=origin,
+    )
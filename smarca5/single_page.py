@@ -0,0 +1,152 @@
+"""Single page report with compact data file rendered in browser."""
+import base64
+import json
+import os
+from copy import deepcopy
+
+import numpy as np
+import pandas as pd  # type: ignore
+from colour import Color
+
+import alignment
+import html_report
+import legend
+
+REPORT_PAGE_NAME = "report.html"
+REPORT_DATA_NAME = "report_data.js"
+REPORT_SCRIPT_NAME = "single_page.js"
+
+
+class SinglePageReport(html_report.HtmlReport):
+    """Report config whose menus switch experiments inside one page."""
+
+    def page_href(self, type_of_experiment, experiment) -> str:
+        """
+        Create link to experiment view of single page.
+
+        :param type_of_experiment: "group" or "sample"
+        :param experiment: group or sample name
+        :return: href of experiment view
+        """
+        return f"#type_{type_of_experiment}-{experiment}"
+
+
+def create_report_data(alignment_obj, html_report_config) -> dict:
+    """
+    Create data of single page report.
+
+    Every distinct peptide (interval of protein) is stored once. Samples
+    keep bitset of their peptides and amount of peptide only if it is
+    bigger than 1, groups keep indexes of their samples.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: SinglePageReport object
+    :return: dictionary which can be saved as json
+    """
+    peptides_metadata = alignment_obj.peptides_metadata
+    displayed_peptides = peptides_metadata.drop_duplicates(
+        subset=["Sequence", "Start"]
+    )
+    peptide_ids = pd.Series(
+        np.arange(len(displayed_peptides)),
+        index=displayed_peptides["Sequence"].to_numpy(),
+    )
+    protein_ids, proteins = pd.factorize(
+        displayed_peptides["Proteins"].astype(object).fillna(""),
+        use_na_sentinel=False,
+    )
+    row_peptides = peptide_ids.reindex(
+        peptides_metadata["Sequence"].to_numpy()
+    ).to_numpy()
+    row_samples = pd.Categorical(
+        peptides_metadata["Experiment"], categories=alignment_obj.sample_names
+    ).codes
+    # amount of rows of every (sample, peptide) pair
+    number_of_peptides = max(len(displayed_peptides), 1)
+    pairs, amounts = np.unique(
+        row_samples.astype(np.int64) * number_of_peptides + row_peptides,
+        return_counts=True,
+    )
+    pair_samples, pair_peptides = np.divmod(pairs, number_of_peptides)
+    is_member = np.zeros(
+        (len(alignment_obj.sample_names), len(displayed_peptides)), dtype=bool
+    )
+    is_member[pair_samples, pair_peptides] = True
+    membership = [
+        base64.b64encode(
+            np.packbits(sample_is_member, bitorder="little").tobytes()
+        ).decode()
+        for sample_is_member in is_member
+    ]
+    counts: list[dict[int, int]] = [{} for _ in alignment_obj.sample_names]
+    for sample_id, peptide_id, amount in zip(
+        pair_samples[amounts > 1].tolist(),
+        pair_peptides[amounts > 1].tolist(),
+        amounts[amounts > 1].tolist(),
+    ):
+        counts[sample_id][peptide_id] = amount
+
+    groups: dict[str, list[int]] = {}
+    for sample_id, sample_name in enumerate(alignment_obj.sample_names):
+        groups.setdefault(alignment.find_group_name(sample_name), []).append(
+            sample_id
+        )
+
+    return {
+        "protein": alignment_obj.protein_seq,
+        "lineLength": html_report_config.line_length,
+        "interline": html_report_config.interline,
+        "textLeftOffset": html_report_config.text_left_offset,
+        "colorScale": [
+            Color(legend.MIN_AMOUNT_COLOR).hsl,
+            Color(legend.MAX_AMOUNT_COLOR).hsl,
+        ],
+        "sequences": displayed_peptides["Sequence"].tolist(),
+        "starts": displayed_peptides["Start"].tolist(),
+        "proteinIds": protein_ids.tolist(),
+        "proteins": proteins.tolist(),
+        # only approximate matches (peptide id -> amount of mismatches)
+        "mismatches": {
+            peptide_id: mismatches
+            for peptide_id, mismatches in enumerate(
+                displayed_peptides["Mismatches"].tolist()
+            )
+            if mismatches
+        },
+        "samples": list(alignment_obj.sample_names),
+        "groups": groups,
+        "membership": membership,
+        "counts": counts,
+    }
+
+
+def write_single_page(alignment_obj, html_report_config, output_dir) -> str:
+    """
+    Write html shell and data file of single page report.
+
+    Data is saved as javascript file (json assigned to variable), because
+    browsers do not allow pages opened from disk to fetch json files.
+
+    :param alignment_obj: Alignment object with searched peptides
+    :param html_report_config: SinglePageReport object
+    :param output_dir: directory where report is written
+    :return: path of html page
+    """
+    with open(os.path.join(output_dir, REPORT_DATA_NAME), "w") as data_file:
+        data_file.write("window.SMARCA5_DATA = ")
+        json.dump(
+            create_report_data(alignment_obj, html_report_config),
+            data_file,
+            separators=(",", ":"),
+        )
+        data_file.write(";\n")
+
+    soup = deepcopy(html_report_config.base_soup)
+    soup.title.string = "SMARCA5"
+    soup.find("img")["id"] = "colorBar"
+    for script_name in (REPORT_DATA_NAME, REPORT_SCRIPT_NAME):
+        soup.body.append(soup.new_tag("script", src=script_name))
+    page_path = os.path.join(output_dir, REPORT_PAGE_NAME)
+    with open(page_path, "w") as page_to_save:
+        page_to_save.write(str(soup))
+    return page_path
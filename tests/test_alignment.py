@@ -0,0 +1,217 @@
+"""Alignment module tests."""
+import random
+
+import pandas as pd  # type: ignore
+import pytest
+
+import alignment
+
+
+def create_peptides_dataframe(sequences: list[str]) -> pd.DataFrame:
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": sequences,
+            "Proteins": ["SMARCA5"] * len(sequences),
+            "Experiment": ["Ctrl_T1"] * len(sequences),
+        }
+    )
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    return peptides_dataframe
+
+
+def test_kmp_search_finds_overlapping_occurrences():
+    assert alignment.kmp_search("AAAA", "AA") == [0, 1, 2]
+    assert alignment.kmp_search("MKVA", "W") == []
+
+
+def test_aho_corasick_search_finds_every_peptide():
+    automaton = alignment.AhoCorasick(["AB", "BAB", "B", "XYZ"])
+    assert automaton.search("ABABX") == {
+        "AB": [0, 2],
+        "B": [1, 3],
+        "BAB": [1],
+    }
+
+
+def test_search_engines_return_identical_results(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path))
+    rng = random.Random(5)
+    protein_seq = "".join(rng.choice("ACDE") for _ in range(500))
+    sequences = [
+        protein_seq[start : start + rng.randint(2, 8)]
+        for start in (rng.randrange(490) for _ in range(40))
+    ]
+    results = []
+    for engine in alignment.SEARCH_ENGINES:
+        alignment_obj = alignment.Alignment(
+            protein_seq, create_peptides_dataframe(sequences), engine
+        )
+        alignment_obj.search_peptide_in_protein_seq()
+        results.append(alignment_obj)
+    aho_corasick, *other_engines = results
+    for other_engine in other_engines:
+        pd.testing.assert_frame_equal(
+            aho_corasick.peptides_metadata, other_engine.peptides_metadata
+        )
+        assert (
+            aho_corasick.amount_of_the_same_peptides
+            == other_engine.amount_of_the_same_peptides
+        )
+
+
+def test_unknown_search_engine():
+    with pytest.raises(ValueError):
+        alignment.Alignment("MKV", create_peptides_dataframe(["K"]), "regex")
+
+
+def test_deduplicated_search_is_the_same_as_search_of_every_row():
+    sequences = ["KV", "MK", "KV", "WW", "AMK", "KV"]
+    results = []
+    for deduplicate in (True, False):
+        alignment_obj = alignment.Alignment(
+            "MKVAMKV",
+            create_peptides_dataframe(sequences),
+            "kmp",
+            deduplicate=deduplicate,
+        )
+        alignment_obj.search_peptide_in_protein_seq()
+        results.append(alignment_obj)
+    deduplicated, every_row = results
+    pd.testing.assert_frame_equal(
+        deduplicated.peptides_metadata, every_row.peptides_metadata
+    )
+    pd.testing.assert_frame_equal(
+        deduplicated.unmatched_peptides, every_row.unmatched_peptides
+    )
+    assert deduplicated.peptides_metadata["Sequence"].tolist() == [
+        "AMK",
+        "MK",
+        "KV",
+        "KV",
+        "KV",
+    ]
+    assert deduplicated.peptides_metadata["Start"].tolist() == [3, 4, 5, 5, 5]
+    assert deduplicated.unmatched_peptides["Sequence"].tolist() == ["WW"]
+    assert deduplicated.amount_of_the_same_peptides == {
+        "KV": 6,
+        "MK": 2,
+        "AMK": 1,
+    }
+    assert (
+        deduplicated.amount_of_the_same_peptides
+        == every_row.amount_of_the_same_peptides
+    )
+
+
+def test_experiment_index_matches_exact_names():
+    peptides_dataframe = create_peptides_dataframe(["MK", "KV", "VA", "AM"])
+    peptides_dataframe["Experiment"] = [
+        "Ctrl_T1",
+        "Ctrl_T10",
+        "Ctrl_D1",
+        "Ctrl_T1",
+    ]
+    alignment_obj = alignment.Alignment("MKVAMK", peptides_dataframe)
+    alignment_obj.search_peptide_in_protein_seq()
+
+    def sequences(type_of_experiment, experiment):
+        return alignment_obj.peptides_of_experiment(
+            type_of_experiment, experiment
+        )["Sequence"].tolist()
+
+    assert sequences("sample", "Ctrl_T1") == ["AM", "MK"]
+    assert sequences("sample", "Ctrl_T10") == ["KV"]
+    assert sequences("group", "Ctrl_T") == ["KV", "AM", "MK"]
+    assert sequences("group", "Ctrl_D") == ["VA"]
+    assert sequences("group", "All") == ["KV", "VA", "AM", "MK"]
+
+
+def count_mismatches(protein_seq, start, peptide_seq, equivalent_residues):
+    canonical = {
+        residue: residue_class[0]
+        for residue_class in equivalent_residues
+        for residue in residue_class
+    }
+    return sum(
+        canonical.get(protein_residue, protein_residue)
+        != canonical.get(peptide_residue, peptide_residue)
+        for protein_residue, peptide_residue in zip(
+            protein_seq[start : start + len(peptide_seq)], peptide_seq
+        )
+    )
+
+
+def test_bit_parallel_matcher_is_the_same_as_naive_search():
+    rng = random.Random(7)
+    protein_seq = "".join(rng.choice("ACILW") for _ in range(300))
+    peptide_seqs = list(
+        {
+            "".join(rng.choice("ACILW") for _ in range(rng.randint(3, 9)))
+            for _ in range(60)
+        }
+    )
+    for max_mismatches in (0, 1, 2):
+        for equivalent_residues in ((), ("IL",)):
+            hits = alignment.BitParallelMatcher(
+                peptide_seqs, max_mismatches, equivalent_residues
+            ).search(protein_seq)
+            expected_hits = {}
+            for peptide_seq in peptide_seqs:
+                for start in range(len(protein_seq) - len(peptide_seq) + 1):
+                    mismatches = count_mismatches(
+                        protein_seq, start, peptide_seq, equivalent_residues
+                    )
+                    if mismatches <= max_mismatches:
+                        expected_hits.setdefault(peptide_seq, []).append(
+                            (start, mismatches)
+                        )
+            assert hits == expected_hits
+
+
+def test_short_peptide_matches_with_at_least_one_residue():
+    hits = alignment.BitParallelMatcher(["KV", "Q", "MKV"], 2).search("MKVAKW")
+    # KV and Q would match every position with 2 mismatches
+    assert hits == {"KV": [(1, 0), (4, 1)], "MKV": [(0, 0), (3, 2)]}
+
+
+def test_tolerant_search_reports_the_best_occurrence():
+    sequences = ["MRVA", "WQL", "KVAW", "YYYY", "MRVA"]
+    results = []
+    for deduplicate in (True, False):
+        alignment_obj = alignment.Alignment(
+            "MKVAWQIMRVAW",
+            create_peptides_dataframe(sequences),
+            deduplicate=deduplicate,
+            max_mismatches=1,
+            equivalent_residues=[alignment.ISOBARIC_RESIDUES],
+        )
+        alignment_obj.search_peptide_in_protein_seq()
+        results.append(alignment_obj)
+    deduplicated, every_row = results
+    pd.testing.assert_frame_equal(
+        deduplicated.peptides_metadata, every_row.peptides_metadata
+    )
+    peptides_metadata = deduplicated.peptides_metadata.set_index("Sequence")
+    # MRVA: exact at 7 is better than one mismatch at 0
+    assert peptides_metadata.loc["MRVA", "Start"].tolist() == [7, 7]
+    assert peptides_metadata.loc["MRVA", "Mismatches"].tolist() == [0, 0]
+    # I and L are equivalent, so WQL matches WQI without mismatch
+    assert peptides_metadata.loc["WQL", "Start"] == 4
+    assert peptides_metadata.loc["WQL", "Mismatches"] == 0
+    # KVAW: exact at 1, one mismatch at 8 (RVAW)
+    assert peptides_metadata.loc["KVAW", "Start"] == 1
+    assert deduplicated.amount_of_the_same_peptides["KVAW"] == 2
+    assert deduplicated.unmatched_peptides["Sequence"].tolist() == ["YYYY"]
+
+
+def test_exact_search_has_no_mismatches():
+    alignment_obj = alignment.Alignment(
+        "MKVAW", create_peptides_dataframe(["KVA", "VAL"])
+    )
+    alignment_obj.search_peptide_in_protein_seq()
+    assert alignment_obj.peptides_metadata["Mismatches"].tolist() == [0]
+    with pytest.raises(ValueError):
+        alignment.Alignment(
+            "MKV", create_peptides_dataframe(["K"]), max_mismatches=-1
+        )
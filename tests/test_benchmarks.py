@@ -0,0 +1,60 @@
+"""Benchmark suite tests."""
+import json
+
+from benchmarks import generators, suite
+
+PARAMETERS = generators.DatasetParameters(
+    protein_length=300, peptide_count=400, duplication_rate=0.75
+)
+
+
+def test_dataset_is_reproducible_and_follows_parameters():
+    protein_seq, peptides = generators.generate_dataset(PARAMETERS)
+    same_protein_seq, same_peptides = generators.generate_dataset(PARAMETERS)
+    assert protein_seq == same_protein_seq
+    assert peptides.equals(same_peptides)
+    assert len(protein_seq) == 300
+    assert len(peptides) == 400
+    assert peptides["Sequence"].nunique() <= 100
+    assert peptides["Experiment"].nunique() == 12
+    lengths = peptides["Sequence"].str.len()
+    assert lengths.min() >= 6 and lengths.max() <= 40
+    assert all(
+        peptide_seq in protein_seq for peptide_seq in peptides["Sequence"]
+    )
+
+
+def test_results_are_written_and_compared(tmp_path):
+    results_path = tmp_path / "results.json"
+    exit_code = suite.main(
+        [
+            "run",
+            "--repeat",
+            "1",
+            "--select",
+            "search",
+            "--select",
+            "page_layout",
+            "--protein-length",
+            "300",
+            "--peptide-count",
+            "400",
+            "--output",
+            str(results_path),
+        ]
+    )
+    assert exit_code == 0
+    results = json.loads(results_path.read_text())
+    assert results["parameters"]["peptide_count"] == 400
+    assert set(results["benchmarks"]) == {
+        "search[aho-corasick]",
+        "search[fm-index]",
+        "search[bit-parallel]",
+        "page_layout",
+    }
+    slower_results = json.loads(results_path.read_text())
+    slower_results["benchmarks"]["page_layout"]["min"] *= 2
+    slower_path = tmp_path / "slower.json"
+    slower_path.write_text(json.dumps(slower_results))
+    assert suite.main(["compare", str(results_path), str(results_path)]) == 0
+    assert suite.main(["compare", str(results_path), str(slower_path)]) == 1
@@ -0,0 +1,35 @@
+"""FASTA reader tests."""
+import fasta
+
+
+def test_multi_record_fasta_is_indexed(tmp_path):
+    path = tmp_path / "proteins.fasta"
+    path.write_bytes(
+        b">sp|P1|ONE first protein\nMKV\nAAW\n"
+        b">sp|P2|TWO\r\nGGG\r\n"
+        b">empty\n"
+    )
+    with fasta.FastaFile(str(path)) as fasta_file:
+        assert fasta_file.names == ["sp|P1|ONE", "sp|P2|TWO", "empty"]
+        assert fasta_file.index["sp|P1|ONE"].description == "first protein"
+        assert fasta_file.index["sp|P1|ONE"].length == 6
+        assert fasta_file.sequence("sp|P2|TWO") == "GGG"
+        assert list(fasta_file) == [
+            ("sp|P1|ONE", "MKVAAW"),
+            ("sp|P2|TWO", "GGG"),
+            ("empty", ""),
+        ]
+
+
+def test_file_without_header_is_one_record(tmp_path):
+    path = tmp_path / "protein.txt"
+    path.write_text("MKV\nAAW")
+    with fasta.FastaFile(str(path)) as fasta_file:
+        assert list(fasta_file) == [("", "MKVAAW")]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.fasta"
+    path.write_text("")
+    with fasta.FastaFile(str(path)) as fasta_file:
+        assert len(fasta_file) == 0
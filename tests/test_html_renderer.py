@@ -0,0 +1,214 @@
+"""Streaming html renderer tests."""
+import gzip
+import os
+import re
+
+import pandas as pd  # type: ignore
+from bs4 import BeautifulSoup
+
+import alignment
+import html_page
+import html_renderer
+import html_report
+import pipeline
+
+
+PEPTIDES = pd.DataFrame(
+    {
+        "Sequence": ["MKVA", "AMKVAW", "KVAW", "KVA", "W<&"],
+        "Proteins": ["P1", "P1;P2", "P1", "P1", "P1"],
+        "Experiment": ["Ctrl_T1", "Ctrl_T1", "Ctrl_T2", "Drug_T1", "X_1"],
+    }
+)
+
+
+def create_report_page(
+    experiment="All",
+    window_size=None,
+    compact=False,
+    compress=False,
+    peptides_dataframe=PEPTIDES,
+) -> html_page.ReportPage:
+    peptides_dataframe = peptides_dataframe.copy()
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    alignment_obj = alignment.Alignment(
+        "MKVAMKVAWQQQMKVAW<&", peptides_dataframe
+    )
+    alignment_obj.search_peptide_in_protein_seq()
+    with open(
+        pipeline.load_file(os.path.join("html_files", "index.html"))
+    ) as html:
+        soup = BeautifulSoup(html, "html.parser")
+    html_report_config = html_report.HtmlReport(
+        soup,
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        pipeline.LEFT_TEXT_OFFSET,
+        20,
+        5,
+        window_size=window_size,
+        compact=compact,
+        compress=compress,
+    )
+    page = html_page.ReportPage(
+        html_report_config,
+        "group",
+        experiment,
+        alignment_obj.peptide_table_of_experiment("group", experiment),
+        alignment_obj,
+    )
+    page.fill_alignment_window()
+    return page
+
+
+def dom_signature(soup) -> list:
+    return [
+        (
+            tag.name,
+            sorted(tag.attrs.items()),
+            "".join(tag.find_all(string=True, recursive=False)).strip(),
+        )
+        for tag in soup.find_all(True)
+    ]
+
+
+def test_streamed_page_is_the_same_as_beautiful_soup_page(tmp_path):
+    page = create_report_page()
+    page_path = str(tmp_path / page.page_name)
+    html_renderer.write_page(page, page_path, "bar.png")
+    with open(page_path) as html:
+        streamed_soup = BeautifulSoup(html, "html.parser")
+    reference_soup = BeautifulSoup(
+        page.create_soup("bar.png").prettify(formatter="html"), "html.parser"
+    )
+    assert dom_signature(streamed_soup) == dom_signature(reference_soup)
+    assert streamed_soup.find("a", style=True)["href"] == page.page_name
+    assert len(streamed_soup.find_all("span", title=True)) > 5
+
+
+def test_windows_split_lines_of_page(tmp_path):
+    page = create_report_page()
+    windowed_page = create_report_page(window_size=10)
+    # 19 residues in 4 lines of 5 residues, 2 lines in every window
+    assert windowed_page.windows == [range(0, 2), range(2, 4)]
+    window_spans = []
+    for window in range(len(windowed_page.windows)):
+        windowed_page.fill_alignment_window(window)
+        window_spans.extend(windowed_page.spans)
+        html_renderer.write_page(
+            windowed_page,
+            str(tmp_path / windowed_page.page_name),
+            "bar.png",
+        )
+    assert [span.text for span in window_spans] == [
+        span.text for span in page.spans
+    ]
+    # tops of the second window start at its first protein line
+    assert "top: 0px" in window_spans[0].style
+    second_window_line = next(
+        span
+        for span in window_spans[1:]
+        if span.text == page.alignment_obj.protein_seq[10:15]
+    )
+    assert "top: 0px" in second_window_line.style
+    assert sorted(os.listdir(tmp_path)) == [
+        "type_group-All-window2.html",
+        "type_group-All.html",
+    ]
+    with open(tmp_path / "type_group-All-window2.html") as html:
+        soup = BeautifulSoup(html, "html.parser")
+    window_links = soup.find("ul", id="Windows").find_all("a")
+    assert [link.string for link in window_links] == [
+        "Residues 1-10",
+        "Residues 11-19",
+    ]
+    assert window_links[1].get("style") and not window_links[0].get("style")
+    # menu links the first window of page
+    menu_link = soup.find("ul", id="Groups").find("a", style=True)
+    assert menu_link["href"] == "type_group-All.html"
+
+
+def test_compact_page_has_the_same_content_as_page_with_styles(tmp_path):
+    page = create_report_page()
+    compact_page = create_report_page(compact=True, compress=True)
+    html_renderer.write_page(page, str(tmp_path / "page.html"), "bar.png")
+    html_renderer.write_page(
+        compact_page, str(tmp_path / "compact.html"), "bar.png"
+    )
+    assert not os.path.exists(tmp_path / "compact.html")
+    with gzip.open(tmp_path / "compact.html.gz", "rt") as html:
+        compact_html = html.read()
+    with open(tmp_path / "page.html") as html:
+        page_html = html.read()
+    assert len(compact_html) < len(page_html)
+    assert "\n  " not in compact_html.split('<div class="center">')[0]
+    class_colors = dict(re.findall(r"\.(c\d+)\{color:(#\w+)\}", compact_html))
+
+    def resolved_spans(html, compact):
+        spans = []
+        for span in BeautifulSoup(html, "html.parser").find(
+            "div", class_="center"
+        )("span"):
+            style = span["style"]
+            if compact:
+                classes = span["class"]
+                color = class_colors.get(classes[0], "#EEEEEE")
+                is_unique = html_page.UNIQUE_PEPTIDE_CLASS in classes
+            else:
+                color = re.search(r"color: (#\w+)", style).group(1)
+                is_unique = "underline" in style
+            spans.append(
+                (
+                    span.get_text(),
+                    span.get("title"),
+                    re.search(r"left: ?(\d+)ch", style).group(1),
+                    re.search(r"top: ?(\d+)px", style).group(1),
+                    color,
+                    is_unique,
+                )
+            )
+        return spans
+
+    assert resolved_spans(compact_html, True) == resolved_spans(
+        page_html, False
+    )
+
+
+def test_tooltips_of_peptides_count_experiments_and_amounts():
+    peptides_dataframe = pd.DataFrame(
+        {
+            # KVA is found twice in Ctrl_T1 and once in Ctrl_T2
+            "Sequence": ["KVA", "MKVA", "KVA", "KVA", "AMKVAW"],
+            "Proteins": ["P1", "P1", "P1", "P1", "P1;P2"],
+            "Experiment": [
+                "Ctrl_T1",
+                "Ctrl_T2",
+                "Ctrl_T2",
+                "Ctrl_T1",
+                "Drug_T1",
+            ],
+        }
+    )
+    page = create_report_page("Ctrl_T", peptides_dataframe=peptides_dataframe)
+    peptides_info = page.create_peptides_info()
+    assert sorted(peptides_info) == ["KVA", "MKVA"]
+    kva_info = peptides_info["KVA"]
+    assert kva_info.experiments == ["Ctrl_T1", "Ctrl_T2"]
+    assert kva_info.amount == 3
+    assert kva_info.tooltip == (
+        "Sequence: KVA\n"
+        "Proteins: P1\n"
+        "Unique: True\n"
+        "Experiment: Ctrl_T1, Ctrl_T2\n"
+        "Amount: 3"
+    )
+    assert peptides_info["MKVA"].experiments == ["Ctrl_T2"]
+    assert peptides_info["MKVA"].amount == 1
+
+    all_info = create_report_page(
+        peptides_dataframe=peptides_dataframe
+    ).create_peptides_info()
+    assert all_info["AMKVAW"].proteins == ["P1", "P2"]
+    assert not all_info["AMKVAW"].is_unique
+    assert "Amount: 3" in all_info["KVA"].tooltip
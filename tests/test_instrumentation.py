@@ -0,0 +1,71 @@
+"""Instrumentation tests."""
+import json
+
+import pytest
+
+import instrumentation
+import pipeline
+from test_pipeline import create_inputs
+
+
+@pytest.fixture(autouse=True)
+def disable_instrumentation(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+    yield
+    instrumentation.disable()
+
+
+def test_disabled_instrumentation_records_nothing(monkeypatch):
+    monkeypatch.delenv(instrumentation.TRACE_ENV_VARIABLE, raising=False)
+    assert instrumentation.enable_from_environment() is None
+    assert instrumentation.stage("search") is instrumentation.NULL_STAGE
+    instrumentation.count("spans", 10)
+    assert instrumentation.finish() is None
+
+
+def test_stages_and_counters_of_analysis_are_saved(tmp_path):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    trace_path = tmp_path / "trace.json"
+    instrumentation.enable(str(trace_path))
+    pipeline.run_analysis(fasta_path, peptides_path, str(tmp_path / "report"))
+    assert instrumentation.finish() == str(trace_path)
+    assert not instrumentation.is_enabled()
+
+    trace = json.loads(trace_path.read_text())
+    stages = {stage["name"]: stage for stage in trace["stages"]}
+    assert stages["analysis"]["depth"] == 0
+    assert stages["search (aho-corasick)"]["depth"] == 1
+    assert stages["page group-All"]["depth"] == 2
+    assert stages["analysis"]["peak_memory"] == max(
+        stage["peak_memory"] for stage in trace["stages"]
+    )
+    assert trace["counters"]["peptide_rows"] == 4
+    assert trace["counters"]["peptides_searched"] == 3
+    assert trace["counters"]["pages_written"] == 6
+    assert trace["counters"]["bytes_written"] == sum(
+        path.stat().st_size
+        for path in (tmp_path / "report").glob("type_*.html")
+    )
+
+
+def test_chrome_trace_is_enabled_from_environment(tmp_path, monkeypatch):
+    trace_path = tmp_path / "trace.json"
+    monkeypatch.setenv(instrumentation.TRACE_ENV_VARIABLE, str(trace_path))
+    monkeypatch.setenv(instrumentation.TRACE_FORMAT_ENV_VARIABLE, "chrome")
+    instrumentation.enable_from_environment()
+    with instrumentation.stage("outer"):
+        with instrumentation.stage("inner"):
+            instrumentation.count("spans", 2)
+    instrumentation.finish()
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == [
+        "inner",
+        "outer",
+        "counters",
+    ]
+    inner, outer, counters = events
+    assert inner["ph"] == outer["ph"] == "X"
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert counters["args"] == {"spans": 2}
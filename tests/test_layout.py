@@ -0,0 +1,30 @@
+"""Peptide layout tests."""
+import layout
+
+
+def test_peptides_are_stacked_on_the_lowest_free_track():
+    track_layout = layout.TrackLayout(15, 5, 20).place(
+        [0, 1, 3, 6], ["ABC", "BCD", "DEFGH", "GH"]
+    )
+    table = track_layout.layout_table()
+    assert table[
+        ["Line", "Track", "Top", "Left", "Sequence"]
+    ].values.tolist() == [
+        [0, 0, 20, 0, "ABC"],
+        [0, 1, 40, 1, "BCD"],
+        [0, 0, 20, 3, "DE"],
+        [1, 0, 80, 0, "FGH"],
+        [1, 1, 100, 1, "GH"],
+    ]
+    assert table["IsTransfer"].tolist() == [False, False, False, True, False]
+    assert table["FullSequence"].tolist()[3] == "DEFGH"
+    # line without peptides takes one empty track
+    assert track_layout.line_tops == [0, 60, 120]
+
+
+def test_peptide_longer_than_many_lines_is_carried_to_every_line():
+    track_layout = layout.TrackLayout(12, 4, 10).place([2], ["CDEFGHIJ"])
+    table = track_layout.layout_table()
+    assert table["Sequence"].tolist() == ["CD", "EFGH", "IJ"]
+    assert table["Start"].tolist() == [2, 4, 8]
+    assert table["End"].tolist() == [4, 8, 10]
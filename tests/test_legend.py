@@ -0,0 +1,56 @@
+"""Color scale and legend tests."""
+import os
+import subprocess
+import sys
+
+import legend
+
+
+def test_color_scale_is_cached():
+    color_scale = legend.create_color_scale((1, 3, 10))
+    assert [amount for amount, color in color_scale] == [1, 3, 10]
+    assert color_scale[0][1] == "#add8e6"
+    assert color_scale[-1][1] == "#0000cd"
+    assert legend.create_color_scale((1, 3, 10)) is color_scale
+
+
+def test_color_scale_with_one_amount_has_extra_step():
+    assert legend.create_color_scale((5,)) == ((5, "#add8e6"), (6, "#0000cd"))
+
+
+def test_color_bar_svg_has_band_for_every_amount():
+    svg = legend.create_color_bar_svg(legend.create_color_scale((1, 2, 4)))
+    assert svg.count('fill="#') == 3
+    assert ">4</text>" in svg
+    assert legend.create_color_bar_data_uri(
+        legend.create_color_scale((1, 2, 4))
+    ).startswith("data:image/svg+xml")
+
+
+def test_color_bar_png(tmp_path):
+    path = str(tmp_path / "bar.png")
+    legend.save_color_bar_png(legend.create_color_scale((1, 2)), path)
+    assert os.path.getsize(path) > 0
+
+
+def test_empty_color_bar_png(tmp_path):
+    path = str(tmp_path / "bar.png")
+    legend.save_color_bar_png(legend.create_color_scale(()), path)
+    assert os.path.getsize(path) > 0
+
+
+def test_report_does_not_import_matplotlib():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, pipeline; " "assert 'matplotlib' not in sys.modules",
+        ],
+        cwd=os.path.dirname(legend.__file__),
+    )
+    assert result.returncode == 0
+
+
+def test_color_scale_of_page_without_peptides_is_empty():
+    assert legend.create_color_scale(()) == ()
+    assert "</svg>" in legend.create_color_bar_svg(())
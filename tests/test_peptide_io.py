@@ -0,0 +1,82 @@
+"""Peptides file reading tests."""
+import pandas as pd  # type: ignore
+import pytest
+
+import peptide_io
+
+PEPTIDES = pd.DataFrame(
+    {
+        "Score": [1.5, 2.5, 3.5],
+        "Experiment": ["Ctrl_T1", "Ctrl_T1", "Drug_T1"],
+        "Sequence": ["MKVA", "KVAWQ", "MKVA"],
+        "Proteins": ["P1", "P1;P2", "P1"],
+    }
+)
+
+
+def assert_peptides_are_read(peptides_dataframe):
+    assert list(peptides_dataframe.columns) == list(peptide_io.PEPTIDE_COLUMNS)
+    assert peptides_dataframe["Sequence"].tolist() == ["MKVA", "KVAWQ", "MKVA"]
+    assert peptides_dataframe["Experiment"].dtype == "category"
+    assert peptides_dataframe["Proteins"].dtype == "category"
+    assert peptides_dataframe["Proteins"].tolist() == ["P1", "P1;P2", "P1"]
+
+
+@pytest.mark.parametrize(
+    "extension, separator", [(".csv", ","), (".tsv", "\t")]
+)
+def test_csv_is_read(tmp_path, extension, separator):
+    peptides_path = tmp_path / f"peptides{extension}"
+    PEPTIDES.to_csv(peptides_path, sep=separator, index=False)
+    assert_peptides_are_read(peptide_io.read_peptides(str(peptides_path)))
+
+
+def test_missing_cells_are_read_as_empty(tmp_path):
+    peptides_path = tmp_path / "peptides.csv"
+    PEPTIDES.assign(Proteins=["P1", None, "P1"]).to_csv(
+        peptides_path, index=False
+    )
+    peptides_dataframe = peptide_io.read_peptides(str(peptides_path))
+    assert peptides_dataframe["Proteins"].tolist() == ["P1", "", "P1"]
+    assert peptides_dataframe["Proteins"].dtype == "category"
+
+
+def test_parquet_is_read(tmp_path):
+    pytest.importorskip("pyarrow")
+    peptides_path = tmp_path / "peptides.parquet"
+    PEPTIDES.to_parquet(peptides_path)
+    assert_peptides_are_read(peptide_io.read_peptides(str(peptides_path)))
+
+
+def test_converted_excel_is_cached(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+    peptides_path = tmp_path / "peptides.xlsx"
+    PEPTIDES.to_excel(peptides_path, index=False)
+    assert_peptides_are_read(peptide_io.read_peptides(str(peptides_path)))
+
+    def read_excel(*args, **kwargs):
+        raise AssertionError("excel file is parsed again")
+
+    monkeypatch.setattr(pd, "read_excel", read_excel)
+    assert_peptides_are_read(peptide_io.read_peptides(str(peptides_path)))
+    assert len(list((tmp_path / "cache" / "peptides").iterdir())) == 1
+
+
+def test_excel_is_not_cached_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+    find_spec = peptide_io.importlib.util.find_spec
+    monkeypatch.setattr(
+        peptide_io.importlib.util,
+        "find_spec",
+        lambda name: None if name == "pyarrow" else find_spec(name),
+    )
+    peptides_path = tmp_path / "peptides.xlsx"
+    PEPTIDES.to_excel(peptides_path, index=False)
+    assert_peptides_are_read(peptide_io.read_peptides(str(peptides_path)))
+    assert not (tmp_path / "cache").exists()
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError, match="Unknown format"):
+        peptide_io.read_peptides("peptides.ods")
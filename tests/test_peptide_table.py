@@ -0,0 +1,90 @@
+"""Compact peptide table tests."""
+import numpy as np
+import pandas as pd  # type: ignore
+import pytest
+
+import alignment
+import peptide_table
+
+
+def create_searched_alignment() -> alignment.Alignment:
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": ["KVA", "MK", "KVA", "WQ", "KVA"],
+            "Proteins": ["P1", "P1;P2", "P1", "P1", "P1"],
+            "Experiment": [
+                "Ctrl_T2",
+                "Ctrl_T1",
+                "Ctrl_T1",
+                "Drug_T1",
+                "Ctrl_T2",
+            ],
+        }
+    ).astype({"Proteins": "category", "Experiment": "category"})
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    alignment_obj = alignment.Alignment("MKVAWQ", peptides_dataframe)
+    alignment_obj.search_peptide_in_protein_seq()
+    return alignment_obj
+
+
+def test_table_has_rows_of_searched_peptides():
+    alignment_obj = create_searched_alignment()
+    table = alignment_obj.peptide_table
+    peptides_metadata = alignment_obj.peptides_metadata
+    assert len(table) == len(peptides_metadata)
+    assert [record.sequence for record in table] == (
+        peptides_metadata["Sequence"].tolist()
+    )
+    assert table.starts.tolist() == peptides_metadata["Start"].tolist()
+    assert table.ends.tolist() == peptides_metadata["End"].tolist()
+    assert [record.experiment for record in table] == (
+        peptides_metadata["Experiment"].astype(str).tolist()
+    )
+    # distinct sequences are stored once
+    assert sorted(table.sequences) == ["KVA", "MK", "WQ"]
+    assert table[-1].proteins == "P1"
+    with pytest.raises(IndexError):
+        table[len(table)]
+    with pytest.raises(AttributeError):
+        table[0].extra = 1
+
+
+def test_aggregates_of_experiment_table():
+    alignment_obj = create_searched_alignment()
+    table = alignment_obj.peptide_table_of_experiment("group", "Ctrl_T")
+    assert [record.sequence for record in table] == ["MK", "KVA", "KVA", "KVA"]
+    first_rows = table.first_rows_of_sequences()
+    assert first_rows.tolist() == [0, 1]
+    amounts = table.count_sequences()
+    assert {
+        table.sequences[sequence_id]: int(amounts[sequence_id])
+        for sequence_id in np.flatnonzero(amounts)
+    } == {"MK": 1, "KVA": 3}
+    experiments = table.experiments_of_sequences()
+    assert {
+        table.sequences[sequence_id]: experiment_names
+        for sequence_id, experiment_names in experiments.items()
+    } == {"MK": ["Ctrl_T1"], "KVA": ["Ctrl_T2", "Ctrl_T1"]}
+    assert isinstance(table, peptide_table.PeptideTable)
+
+
+def test_missing_cells_are_empty():
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": ["KVA", "MK", "WQ"],
+            "Proteins": ["P1", None, "P2"],
+            "Experiment": [None, "Ctrl_T1", "Drug_T1"],
+            "Start": [2, 1, 5],
+            "End": [4, 2, 6],
+            "Mismatches": [0, 0, 0],
+        }
+    ).astype({"Proteins": "category", "Experiment": "category"})
+    table = peptide_table.PeptideTable.from_dataframe(peptides_dataframe)
+    # missing protein is not taken for the last one
+    assert [record.proteins for record in table] == ["P1", "", "P2"]
+    assert [record.experiment for record in table] == [
+        "",
+        "Ctrl_T1",
+        "Drug_T1",
+    ]
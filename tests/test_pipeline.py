@@ -0,0 +1,230 @@
+"""Pipeline and command line interface tests."""
+import os
+
+import pandas as pd  # type: ignore
+import pytest
+
+import cli
+import pipeline
+import progress
+
+PROTEIN_SEQ = (
+    "MSSAAEPPPPPPPESAPSKPAASIASGGSNSSNKGGPEGVAAQAVASAASAGPADAEMEEIFDDA"
+    "SPGKQKEIQEPDPTYEEKMQTDRANRFEYLLKQTELFAHFIQPAAQK"
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # converted excel files are cached
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def create_inputs(directory) -> tuple[str, str]:
+    fasta_path = os.path.join(directory, "protein.fasta")
+    with open(fasta_path, "w") as fasta_file:
+        fasta_file.write(">sp|O60264|SMCA5_HUMAN\n")
+        fasta_file.write(PROTEIN_SEQ[:60] + "\n" + PROTEIN_SEQ[60:] + "\n")
+    peptides_path = os.path.join(directory, "peptides.xlsx")
+    pd.DataFrame(
+        {
+            "Sequence": ["SAPSKPAASIASGG", "EPDPTYEEK", "EPDPTYEEK", "WWW"],
+            "Proteins": ["O60264", "O60264;P28370", "O60264", "O60264"],
+            "Experiment": ["Ctrl_T1", "Ctrl_T2", "Drug_T1", "Drug_T1"],
+            "Score": [1, 2, 3, 4],
+        }
+    ).to_excel(peptides_path, index=False)
+    return fasta_path, peptides_path
+
+
+def test_run_analysis_writes_every_page(tmp_path):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    report_path = pipeline.run_analysis(
+        fasta_path, peptides_path, str(tmp_path / "report"), line_length=30
+    )
+    assert report_path == str(tmp_path / "report" / "type_group-All.html")
+    written_files = set(os.listdir(tmp_path / "report"))
+    for page in (
+        "group-All",
+        "group-Ctrl_T",
+        "group-Drug_T",
+        "sample-Ctrl_T1",
+        "sample-Ctrl_T2",
+        "sample-Drug_T1",
+    ):
+        assert f"type_{page}.html" in written_files
+    assert "style.css" in written_files
+    with open(report_path) as report:
+        assert "EPDPTYEEK" in report.read()
+
+
+def test_batch_command(tmp_path, capsys):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    manifest_path = tmp_path / "manifest.csv"
+    manifest_path.write_text(
+        "fasta,peptides,output_dir\n"
+        f"{fasta_path},{peptides_path},first\n"
+        f"protein.fasta,peptides.xlsx,second\n"
+        f"protein.fasta,missing.xlsx,third\n"
+    )
+    exit_code = cli.main(["batch", str(manifest_path), "--workers", "2"])
+    assert exit_code == 1
+    assert "2 of 3 analyses finished" in capsys.readouterr().out
+    assert (tmp_path / "first" / "type_group-All.html").exists()
+    assert (tmp_path / "second" / "type_sample-Drug_T1.html").exists()
+
+
+@pytest.mark.parametrize(
+    "option, value",
+    [
+        ("--line-length", "0"),
+        ("--interline", "-1"),
+        ("--window-size", "-10"),
+        ("--page-workers", "x"),
+    ],
+)
+def test_invalid_numbers_are_rejected(option, value, capsys):
+    arguments = ["run", "--fasta", "a.fasta", "--peptides", "b.csv"]
+    with pytest.raises(SystemExit):
+        cli.create_parser().parse_args([*arguments, option, value])
+    assert f"argument {option}" in capsys.readouterr().err
+    # 0 means whole protein and amount of CPUs
+    args = cli.create_parser().parse_args(
+        [*arguments, "--window-size", "0", "--page-workers", "0"]
+    )
+    assert (args.window_size, args.page_workers) == (0, 0)
+
+
+def test_pages_written_in_parallel_are_the_same(tmp_path):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    for page_workers, output_dir in ((1, "sequential"), (2, "parallel")):
+        pipeline.run_analysis(
+            fasta_path,
+            peptides_path,
+            str(tmp_path / output_dir),
+            page_workers=page_workers,
+            legend_format="png",
+        )
+    sequential_files = sorted(os.listdir(tmp_path / "sequential"))
+    assert "Amount_of_peptide-type_group-All.png" in sequential_files
+    assert sequential_files == sorted(os.listdir(tmp_path / "parallel"))
+    for file_name in sequential_files:
+        if file_name.endswith(".html"):
+            assert (tmp_path / "sequential" / file_name).read_text() == (
+                tmp_path / "parallel" / file_name
+            ).read_text()
+
+
+@pytest.mark.parametrize("report_mode", ["pages", "density"])
+def test_png_legend_of_page_without_matched_peptides(tmp_path, report_mode):
+    fasta_path, _ = create_inputs(tmp_path)
+    peptides_path = tmp_path / "peptides.csv"
+    # the only peptide of Empty_T1 is not found in protein
+    peptides_path.write_text(
+        "Sequence,Proteins,Experiment\n"
+        "EPDPTYEEK,O60264,Ctrl_T1\n"
+        "WWW,O60264,Empty_T1\n"
+    )
+    exit_code = cli.main(
+        [
+            "run",
+            "--fasta",
+            fasta_path,
+            "--peptides",
+            str(peptides_path),
+            "--output",
+            str(tmp_path / "report"),
+            "--legend",
+            "png",
+            "--mode",
+            report_mode,
+        ]
+    )
+    assert exit_code == 0
+    assert (
+        tmp_path / "report" / "Amount_of_peptide-type_sample-Empty_T1.png"
+    ).exists()
+
+
+def test_progress_reports_stages_and_cancels_between_pages(tmp_path):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    steps = []
+    pipeline.run_analysis(
+        fasta_path,
+        peptides_path,
+        str(tmp_path / "report"),
+        progress=progress.Progress(lambda *step: steps.append(step)),
+    )
+    assert steps[:2] == [("load", 0, 1), ("search", 0, 1)]
+    assert steps[2:] == [("write", done, 6) for done in range(7)]
+
+    def cancel_during_first_page(stage, done, total):
+        if stage == "write":
+            cancelling_progress.cancel()
+
+    cancelling_progress = progress.Progress(cancel_during_first_page)
+    with pytest.raises(progress.AnalysisCancelled):
+        pipeline.run_analysis(
+            fasta_path,
+            peptides_path,
+            str(tmp_path / "cancelled"),
+            progress=cancelling_progress,
+        )
+    assert sorted(os.listdir(tmp_path / "cancelled")) == [
+        "style.css",
+        "type_group-All.html",
+    ]
+
+
+def test_display_options_change_only_rewrites_pages(tmp_path, monkeypatch):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    read_files = []
+    written_pages = []
+    read_peptides = pipeline.read_peptides
+    write_page_of_experiment = pipeline.write_page_of_experiment
+    monkeypatch.setattr(
+        pipeline,
+        "read_peptides",
+        lambda path: read_files.append(path) or read_peptides(path),
+    )
+    monkeypatch.setattr(
+        pipeline,
+        "write_page_of_experiment",
+        lambda *page, **kwargs: written_pages.append(page[:2])
+        or write_page_of_experiment(*page, **kwargs),
+    )
+    alignment_cache = pipeline.AlignmentCache()
+    report_dir = tmp_path / "report"
+
+    def analyze(interline):
+        written_pages.clear()
+        pipeline.run_analysis(
+            fasta_path,
+            peptides_path,
+            str(report_dir),
+            interline=interline,
+            alignment_cache=alignment_cache,
+        )
+        return (report_dir / "type_group-All.html").read_text()
+
+    first_report = analyze(20)
+    assert len(written_pages) == 6
+    assert analyze(20) == first_report
+    assert written_pages == []
+    (report_dir / "type_sample-Drug_T1.html").unlink()
+    analyze(20)
+    assert written_pages == [("sample", "Drug_T1")]
+    assert analyze(30) != first_report
+    assert len(written_pages) == 6
+    assert len(read_files) == 1
+
+    # changed file is read again
+    pd.DataFrame(
+        {
+            "Sequence": ["EPDPTYEEK"],
+            "Proteins": ["O60264"],
+            "Experiment": ["Ctrl_T1"],
+        }
+    ).to_excel(peptides_path, index=False)
+    assert analyze(30) != first_report
+    assert len(read_files) == 2
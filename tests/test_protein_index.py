@@ -0,0 +1,36 @@
+"""Protein index module tests."""
+import random
+
+import numpy as np
+
+import alignment
+import protein_index
+
+
+def test_suffix_array_is_sorted():
+    protein_seq = "MISSISSIPPI"
+    index = protein_index.ProteinIndex.build(protein_seq)
+    suffixes = [protein_seq[start:] for start in index.suffix_array[1:]]
+    assert suffixes == sorted(protein_seq[i:] for i in range(len(protein_seq)))
+
+
+def test_index_search_is_the_same_as_kmp():
+    rng = random.Random(7)
+    protein_seq = "".join(rng.choice("ACDEFGHIK") for _ in range(3000))
+    index = protein_index.ProteinIndex.build(protein_seq)
+    for _ in range(200):
+        start = rng.randrange(len(protein_seq))
+        peptide_seq = protein_seq[start : start + rng.randint(1, 6)]
+        assert index.search(peptide_seq) == alignment.kmp_search(
+            protein_seq, peptide_seq
+        )
+    assert index.search("W") == []
+    assert index.search("ACDEFGHIKACDEF") == []
+
+
+def test_index_is_cached_and_memory_mapped(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path))
+    built = protein_index.ProteinIndex.load_or_build("MKVAMKVA")
+    loaded = protein_index.ProteinIndex.load_or_build("MKVAMKVA")
+    assert isinstance(loaded.suffix_array, np.memmap)
+    assert loaded.search("KVA") == built.search("KVA") == [1, 5]
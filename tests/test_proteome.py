@@ -0,0 +1,137 @@
+"""Proteome-wide analysis tests."""
+import os
+
+import pandas as pd  # type: ignore
+import pytest
+
+import cli
+import proteome
+
+SMCA5_SEQ = "MSSAAEPPPPPPPESAPSKPAASIASGGSNSSNKGGPEGVAAQAVASAASAGPADAEMEEIFDDA"
+SMCA1_SEQ = "MEQDTAAVAATVAAADATATIVVIEDEQPGPSTSQEEGAAAAATEATAATEKGEKKKEKNVSSF"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_split_peptides_by_protein():
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": ["AA", "BB", "CC", "DD", "EE"],
+            "Proteins": ["P2", "P1; P2", "P1", None, "P2;P2"],
+        }
+    ).astype({"Proteins": "category"})
+    groups = proteome.split_peptides_by_protein(peptides_dataframe)
+    assert list(groups) == ["P2", "P1"]
+    assert groups["P2"].tolist() == [0, 1, 4]
+    assert groups["P1"].tolist() == [1, 2]
+
+
+def test_record_lookup_finds_uniprot_fields():
+    lookup = proteome.create_record_lookup(
+        ["sp|O60264|SMCA5_HUMAN", "P28370", "tr|P28370|OTHER"]
+    )
+    assert lookup["O60264"] == "sp|O60264|SMCA5_HUMAN"
+    assert lookup["SMCA5_HUMAN"] == "sp|O60264|SMCA5_HUMAN"
+    # whole name takes precedence over field of UniProt name
+    assert lookup["P28370"] == "P28370"
+    assert lookup["OTHER"] == "tr|P28370|OTHER"
+    assert proteome.find_record_accession("sp|O60264|SMCA5_HUMAN") == (
+        "O60264"
+    )
+
+
+def test_proteome_command(tmp_path, capsys):
+    fasta_path = tmp_path / "proteome.fasta"
+    fasta_path.write_text(
+        f">sp|O60264|SMCA5_HUMAN SWI/SNF-related 5\n{SMCA5_SEQ}\n"
+        f">sp|P28370|SMCA1_HUMAN SWI/SNF-related 1\n{SMCA1_SEQ}\n"
+        ">sp|P00000|UNUSED_HUMAN\nMKVA\n"
+    )
+    peptides_path = tmp_path / "peptides.csv"
+    pd.DataFrame(
+        {
+            # AAAAATEA is in SMCA1 only, AQAVASAA is in SMCA5, but the
+            # second row claims SMCA1 only
+            "Sequence": [
+                "SAPSKPAASIASGG",
+                "AQAVASAA",
+                "AAAAATEA",
+                "AAAAATEA",
+                "KKKK",
+            ],
+            "Proteins": [
+                "O60264",
+                "P28370",
+                "O60264;SMCA1_HUMAN",
+                "P28370",
+                "Q99999",
+            ],
+            "Experiment": [
+                "Ctrl_T1",
+                "Ctrl_T1",
+                "Drug_T1",
+                "Ctrl_T1",
+                "Ctrl_T1",
+            ],
+        }
+    ).to_csv(peptides_path, index=False)
+    output_dir = tmp_path / "report"
+    exit_code = cli.main(
+        [
+            "proteome",
+            "--fasta",
+            str(fasta_path),
+            "--peptides",
+            str(peptides_path),
+            "--output",
+            str(output_dir),
+            "--workers",
+            "2",
+        ]
+    )
+    assert exit_code == 0
+    assert "2 of 2 proteins finished" in capsys.readouterr().out
+    assert sorted(os.listdir(output_dir)) == [
+        "O60264",
+        "P28370",
+        "index.html",
+        "style.css",
+    ]
+    with open(output_dir / "P28370" / "type_group-All.html") as page:
+        assert "AAAAATEA" in page.read()
+
+    index = (output_dir / "index.html").read_text()
+    assert 'href="O60264/type_group-All.html"' in index
+    # SMCA5 is claimed by 2 rows, only SAPSKPAASIASGG is found in it
+    assert f"<td>{len(SMCA5_SEQ)}</td><td>2</td><td>1</td>" in index
+    assert f"<td>{len(SMCA1_SEQ)}</td><td>3</td><td>2</td>" in index
+    assert "SWI/SNF-related 1" in index
+    assert "Q99999 (1 peptides)" in index
+    assert "UNUSED_HUMAN" not in index
+
+
+def test_failed_protein_is_listed_in_index(tmp_path):
+    fasta_path = tmp_path / "proteome.fasta"
+    fasta_path.write_text(f">O60264\n{SMCA5_SEQ}\n>P28370\n{SMCA1_SEQ}\n")
+    peptides_path = tmp_path / "peptides.csv"
+    pd.DataFrame(
+        {
+            "Sequence": ["SAPSKPAASIASGG", "EDEQPGPS"],
+            "Proteins": ["O60264", "P28370"],
+            "Experiment": ["Ctrl_T1", "Ctrl_T1"],
+        }
+    ).to_csv(peptides_path, index=False)
+    index_path, results = proteome.run_proteome(
+        str(fasta_path),
+        str(peptides_path),
+        str(tmp_path / "report"),
+        workers=1,
+        search_engine="unknown",
+    )
+    assert [result.accession for result in results] == ["O60264", "P28370"]
+    assert all(result.error.startswith("ValueError") for result in results)
+    with open(index_path) as index:
+        assert 'class="error"' in index.read()
@@ -0,0 +1,129 @@
+"""Peptide depth and density page tests."""
+import numpy as np
+import pandas as pd  # type: ignore
+
+import alignment
+import html_page
+import html_report
+import pipeline
+import residue_coverage
+
+
+def test_depth_is_the_same_as_counted_residue_by_residue():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, 90, size=500)
+    ends = starts + rng.integers(1, 11, size=500)
+    expected_depth = np.zeros(100, dtype=np.int64)
+    for start, end in zip(starts, ends):
+        expected_depth[start:end] += 1
+    depth = residue_coverage.create_depth(100, starts, ends)
+    assert depth.tolist() == expected_depth.tolist()
+
+
+def test_depth_levels_and_runs():
+    assert residue_coverage.create_depth_levels(3) == (1, 2, 3)
+    assert residue_coverage.create_depth_levels(100, 4) == (25, 50, 75, 100)
+    depth = np.array([0, 1, 1, 2, 2, 2, 0, 3])
+    (
+        starts,
+        ends,
+        levels,
+        min_depths,
+        max_depths,
+    ) = residue_coverage.find_depth_runs(depth, (1, 3), line_length=4)
+    # run of depth 2 is split by border of line, residue without peptide
+    # is not a run
+    assert starts.tolist() == [1, 3, 4, 7]
+    assert ends.tolist() == [3, 4, 6, 8]
+    assert levels.tolist() == [0, 1, 1, 1]
+    assert min_depths.tolist() == [1, 2, 2, 3]
+    assert max_depths.tolist() == [1, 2, 2, 3]
+
+
+def test_density_page_size_does_not_depend_on_amount_of_peptides():
+    protein_seq = "MKVAWQQQMKVAWQQQ"
+    peptides_metadata = pd.DataFrame(
+        {
+            "Sequence": ["KVAW", "AWQ"] * 50,
+            "Proteins": ["P1"] * 100,
+            "Experiment": ["Ctrl_T1", "Ctrl_T2"] * 50,
+        }
+    )
+    peptides_metadata["Start"] = ""
+    peptides_metadata["End"] = ""
+    alignment_obj = alignment.Alignment(protein_seq, peptides_metadata)
+    alignment_obj.search_peptide_in_protein_seq()
+    html_report_config = html_report.HtmlReport(
+        pipeline.load_base_soup(),
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        pipeline.LEFT_TEXT_OFFSET,
+        20,
+        8,
+        report_mode="density",
+    )
+    page = html_page.DensityPage(
+        html_report_config,
+        "group",
+        "All",
+        alignment_obj.peptide_table_of_experiment("group", "All"),
+        alignment_obj,
+    )
+    page.fill_alignment_window()
+    assert page.coverage.max_depth == 100
+    assert page.coverage.coverage == 5 / 16
+    # 2 protein lines and runs of depth 50 (VA), 100 (WQ) and 50 (Q)
+    assert [span.text for span in page.spans] == [
+        "MKVAWQQQ",
+        "MKVAWQQQ",
+        "\u00a0\u00a0",
+        "\u00a0\u00a0",
+        "\u00a0",
+    ]
+    assert page.spans[2].title == "Residues: 10-11\nDepth: 50"
+    assert "top: 60px" in page.spans[-1].style
+
+
+def test_density_page_windows():
+    protein_seq = "MKVAWQQQMKVAWQQQ"
+    peptides_metadata = pd.DataFrame(
+        {
+            "Sequence": ["KVAW", "AWQ"],
+            "Proteins": ["P1", "P1"],
+            "Experiment": ["Ctrl_T1", "Ctrl_T2"],
+        }
+    )
+    peptides_metadata["Start"] = ""
+    peptides_metadata["End"] = ""
+    alignment_obj = alignment.Alignment(protein_seq, peptides_metadata)
+    alignment_obj.search_peptide_in_protein_seq()
+    html_report_config = html_report.HtmlReport(
+        pipeline.load_base_soup(),
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        pipeline.LEFT_TEXT_OFFSET,
+        20,
+        8,
+        report_mode="density",
+        window_size=8,
+    )
+    page = html_page.DensityPage(
+        html_report_config,
+        "group",
+        "All",
+        alignment_obj.peptide_table_of_experiment("group", "All"),
+        alignment_obj,
+    )
+    assert len(page.windows) == 2
+    page.fill_alignment_window(1)
+    assert page.page_name == "type_group-All-window2.html"
+    # the second line is the first line of its window
+    assert [span.text for span in page.spans] == [
+        "MKVAWQQQ",
+        "\u00a0\u00a0",
+        "\u00a0\u00a0",
+        "\u00a0",
+    ]
+    assert "top: 0px" in page.spans[0].style
+    assert "top: 20px" in page.spans[1].style
+    assert page.spans[1].title == "Residues: 10-11\nDepth: 1"
@@ -0,0 +1,207 @@
+"""Run-scoped output directory tests."""
+import os
+import time
+
+import pytest
+
+import cli
+import runs
+from test_pipeline import create_inputs
+
+
+@pytest.fixture(autouse=True)
+def runs_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SMARCA5_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv(runs.RUNS_DIR_ENV_VARIABLE, str(tmp_path / "runs"))
+    monkeypatch.delenv(runs.KEEP_RUNS_ENV_VARIABLE, raising=False)
+    monkeypatch.delenv(runs.MAX_RUN_AGE_ENV_VARIABLE, raising=False)
+    return tmp_path / "runs"
+
+
+def test_concurrent_runs_get_own_directories():
+    inputs = ("protein.fasta", "peptides.csv")
+    with runs.open_run(inputs) as first_run:
+        assert runs.is_locked(first_run)
+        # locked run is not reused by other analysis
+        with runs.open_run(inputs, reuse=True) as second_run:
+            assert second_run != first_run
+    assert not runs.is_locked(first_run)
+    assert runs.read_run_info(first_run)["inputs"] == [
+        os.path.abspath(path) for path in inputs
+    ]
+    # the most recently finished run of the same inputs is reused
+    with runs.open_run(inputs, reuse=True) as reused_run:
+        assert reused_run == first_run
+    with runs.open_run(("other.fasta", "peptides.csv"), reuse=True) as run:
+        assert run not in (first_run, second_run)
+
+
+def test_failed_run_is_not_reused():
+    inputs = ("protein.fasta", "peptides.csv")
+    with pytest.raises(ValueError):
+        with runs.open_run(inputs) as failed_run:
+            raise ValueError
+    assert runs.read_run_info(failed_run)["finished"] is None
+    assert not runs.is_locked(failed_run)
+    with runs.open_run(inputs, reuse=True) as run:
+        assert run != failed_run
+
+
+def test_clean_runs_keeps_recent_and_locked_runs(runs_dir):
+    finished_runs = []
+    for name in ("a.fasta", "b.fasta", "c.fasta"):
+        with runs.open_run((name,)) as run_dir:
+            finished_runs.append(run_dir)
+    locked_run = runs.create_run(("d.fasta",))
+    (runs_dir / "not_a_run").mkdir()
+    removed = runs.clean_runs(keep=1)
+    assert sorted(removed) == sorted(finished_runs[:2])
+    assert sorted(os.listdir(runs_dir)) == sorted(
+        [
+            os.path.basename(finished_runs[2]),
+            os.path.basename(locked_run),
+            "not_a_run",
+        ]
+    )
+    assert runs.clean_runs(max_age=1) == []
+    assert runs.clean_runs(max_age=0) == [finished_runs[2]]
+
+
+def test_run_command_without_output_writes_into_run(
+    tmp_path, runs_dir, capsys
+):
+    fasta_path, peptides_path = create_inputs(tmp_path)
+    arguments = ["run", "--fasta", fasta_path, "--peptides", peptides_path]
+    assert cli.main(arguments) == 0
+    assert cli.main(arguments) == 0
+    run_dirs = runs.find_runs(str(runs_dir))
+    assert len(run_dirs) == 2
+    report_path = os.path.join(run_dirs[0], "type_group-All.html")
+    assert os.path.exists(report_path)
+    assert os.path.exists(os.path.join(run_dirs[0], "style.css"))
+    capsys.readouterr()
+
+    modified = os.path.getmtime(report_path)
+    os.utime(report_path, (modified - 100, modified - 100))
+    assert cli.main([*arguments, "--reuse", "--keep-runs", "1"]) == 0
+    output = capsys.readouterr().out
+    assert f"OK     {report_path}" in output
+    assert "Removed 1 old runs" in output
+    # unchanged page of reused run is not rewritten
+    assert os.path.getmtime(report_path) == modified - 100
+    assert runs.find_runs(str(runs_dir)) == [run_dirs[0]]
+
+
+def test_clean_runs_skips_run_locked_after_scan(monkeypatch):
+    with runs.open_run(("a.fasta",)) as run_dir:
+        pass
+    acquire_lock = runs.acquire_lock
+    calls = []
+
+    def reuse_before_acquire(locked_dir):
+        if not calls:
+            # other analysis reuses run between scan and removal
+            assert acquire_lock(locked_dir)
+        calls.append(locked_dir)
+        return acquire_lock(locked_dir)
+
+    monkeypatch.setattr(runs, "acquire_lock", reuse_before_acquire)
+    assert runs.clean_runs(keep=0) == []
+    assert os.path.isdir(run_dir)
+    assert runs.is_locked(run_dir)
+
+
+def test_clean_runs_breaks_stale_lock():
+    stale_run = runs.create_run(("a.fasta",))
+    lock_path = os.path.join(stale_run, runs.LOCK_NAME)
+    lock_time = os.path.getmtime(lock_path) - runs.STALE_LOCK_AGE - 1
+    os.utime(lock_path, (lock_time, lock_time))
+    assert not runs.is_locked(stale_run)
+    assert runs.clean_runs(keep=0) == [stale_run]
+    # fresh lock is not broken
+    fresh_run = runs.create_run(("a.fasta",))
+    assert not runs.break_stale_lock(fresh_run)
+    assert runs.is_locked(fresh_run)
+
+
+def test_clean_runs_of_origin():
+    with runs.open_run(("a.fasta",)) as cli_run:
+        pass
+    with runs.open_run(("b.fasta",), origin=runs.GUI_ORIGIN) as gui_run:
+        pass
+    with runs.open_run(("c.fasta",), origin=runs.GUI_ORIGIN) as last_gui_run:
+        pass
+    assert runs.clean_runs(keep=1, origin=runs.GUI_ORIGIN) == [gui_run]
+    assert os.path.isdir(cli_run)
+    assert os.path.isdir(last_gui_run)
+
+
+def test_reuse_matches_origin():
+    inputs = ("protein.fasta", "peptides.csv")
+    with runs.open_run(inputs) as cli_run:
+        pass
+    # GUI does not rewrite report of command line
+    with runs.open_run(inputs, reuse=True, origin=runs.GUI_ORIGIN) as gui_run:
+        assert gui_run != cli_run
+    # and command line does not reuse GUI run removed by GUI cleanup
+    with runs.open_run(inputs, reuse=True) as reused_run:
+        assert reused_run == cli_run
+    with runs.open_run(
+        inputs, reuse=True, origin=runs.GUI_ORIGIN
+    ) as reused_gui_run:
+        assert reused_gui_run == gui_run
+    assert runs.read_run_info(gui_run)["origin"] == runs.GUI_ORIGIN
+
+
+def test_removed_run_is_hidden_before_deletion(runs_dir, monkeypatch):
+    with runs.open_run(("a.fasta",)) as run_dir:
+        pass
+    rmtree = runs.shutil.rmtree
+    found_runs = []
+
+    def find_runs_during_removal(path, **kwargs):
+        # lock is already removed, but run can not be found and reused
+        found_runs.append(runs.find_runs(str(runs_dir)))
+        assert os.path.basename(path).endswith(runs.DELETING_SUFFIX)
+        rmtree(path, **kwargs)
+
+    monkeypatch.setattr(runs.shutil, "rmtree", find_runs_during_removal)
+    assert runs.clean_runs(keep=0) == [run_dir]
+    assert found_runs == [[]]
+    assert os.listdir(runs_dir) == []
+
+
+def test_fresh_lock_is_kept_if_it_can_not_be_given_back(monkeypatch):
+    run_dir = runs.create_run(("a.fasta",))
+    lock_path = os.path.join(run_dir, runs.LOCK_NAME)
+    lock_time = os.path.getmtime(lock_path) - runs.STALE_LOCK_AGE - 1
+    os.utime(lock_path, (lock_time, lock_time))
+    rename = os.rename
+
+    def replace_lock_before_rename(source, destination):
+        # other analysis replaced stale lock, and after rename a third one
+        # locked run
+        os.remove(source)
+        runs.acquire_lock(run_dir)
+        rename(source, destination)
+        runs.acquire_lock(run_dir)
+
+    monkeypatch.setattr(runs.os, "rename", replace_lock_before_rename)
+    assert not runs.break_stale_lock(run_dir)
+    monkeypatch.undo()
+    assert os.path.exists(f"{lock_path}.{os.getpid()}")
+    assert runs.is_locked(run_dir)
+
+
+def test_lock_of_running_analysis_is_refreshed(monkeypatch):
+    monkeypatch.setattr(runs, "LOCK_REFRESH_INTERVAL", 0.01)
+    with runs.open_run(("a.fasta",)) as run_dir:
+        lock_path = os.path.join(run_dir, runs.LOCK_NAME)
+        lock_time = os.path.getmtime(lock_path) - runs.STALE_LOCK_AGE - 1
+        os.utime(lock_path, (lock_time, lock_time))
+        for _ in range(100):
+            if runs.is_locked(run_dir):
+                break
+            time.sleep(0.01)
+        assert runs.is_locked(run_dir)
+        assert runs.clean_runs(keep=0) == []
@@ -0,0 +1,172 @@
+"""Single page report tests."""
+import base64
+import os
+import re
+import shutil
+import subprocess
+
+import numpy as np
+import pandas as pd  # type: ignore
+import pytest
+from bs4 import BeautifulSoup
+
+import alignment
+import pipeline
+import single_page
+
+# runs single_page.js without browser and prints content of alignment window
+NODE_HARNESS = """
+const fs = require("fs");
+const [dataPath, scriptPath, hash] = process.argv.slice(1);
+const center = {innerHTML: ""};
+global.window = {addEventListener() {}};
+global.location = {hash: hash};
+global.atob = (text) => Buffer.from(text, "base64").toString("binary");
+global.document = {
+    querySelector: () => center,
+    getElementById: () => ({}),
+    querySelectorAll: () => [],
+};
+eval(fs.readFileSync(dataPath, "utf8"));
+eval(fs.readFileSync(scriptPath, "utf8"));
+process.stdout.write(center.innerHTML);
+"""
+
+
+def create_alignment() -> alignment.Alignment:
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": ["MKVA", "KVAWQ", "MKVA", "QQM", "MKVA", "AWQQ"],
+            "Proteins": ["P1", "P1;P2", "P1", "P1", "P1", "P1"],
+            "Experiment": [
+                "Ctrl_T1",
+                "Ctrl_T1",
+                "Ctrl_T1",
+                "Ctrl_T2",
+                "Drug_T1",
+                "Drug_T1",
+            ],
+        }
+    )
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    alignment_obj = alignment.Alignment("MKVAWQQQMKVAWQQQ", peptides_dataframe)
+    alignment_obj.search_peptide_in_protein_seq()
+    return alignment_obj
+
+
+def test_report_data_keeps_every_peptide_once():
+    alignment_obj = create_alignment()
+    html_report_config = single_page.SinglePageReport(
+        pipeline.load_base_soup(),
+        alignment_obj.group_names,
+        alignment_obj.sample_names,
+        pipeline.LEFT_TEXT_OFFSET,
+        20,
+        6,
+    )
+    data = single_page.create_report_data(alignment_obj, html_report_config)
+    assert data["sequences"] == ["QQM", "MKVA", "KVAWQ", "AWQQ"]
+    assert data["starts"] == [6, 8, 9, 11]
+    assert data["samples"] == ["Ctrl_T1", "Ctrl_T2", "Drug_T1"]
+    assert data["groups"] == {"Ctrl_T": [0, 1], "Drug_T": [2]}
+    membership = [
+        np.unpackbits(
+            np.frombuffer(base64.b64decode(bitset), dtype=np.uint8),
+            bitorder="little",
+        )[:4].tolist()
+        for bitset in data["membership"]
+    ]
+    assert membership == [[0, 1, 1, 0], [1, 0, 0, 0], [0, 1, 0, 1]]
+    assert data["counts"] == [{1: 2}, {}, {}]
+    assert html_report_config.base_soup.find("a", href="#type_group-All")
+
+
+def span_positions(html) -> list[tuple[str, str, str]]:
+    return [
+        (
+            span.get_text(),
+            re.search(r"left: (\d+)ch", span["style"]).group(1),
+            re.search(r"top: (\d+)px", span["style"]).group(1),
+        )
+        for span in BeautifulSoup(html, "html.parser").find_all("span")
+    ]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_browser_layout_is_the_same_as_layout_of_pages(tmp_path):
+    alignment_obj = create_alignment()
+    pipeline.write_single_page_report(alignment_obj, str(tmp_path), 6, 20)
+    pipeline.write_report(alignment_obj, str(tmp_path), 6, 20)
+    for page in ("type_group-All", "type_group-Ctrl_T", "type_sample-Drug_T1"):
+        rendered_html = subprocess.run(
+            [
+                "node",
+                "-e",
+                NODE_HARNESS,
+                str(tmp_path / single_page.REPORT_DATA_NAME),
+                str(tmp_path / single_page.REPORT_SCRIPT_NAME),
+                f"#{page}",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        with open(os.path.join(tmp_path, f"{page}.html")) as html:
+            page_html = str(
+                BeautifulSoup(html, "html.parser").find("div", class_="center")
+            )
+        assert span_positions(rendered_html) == span_positions(page_html)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_browser_shows_approximate_peptides_like_pages(tmp_path):
+    peptides_dataframe = pd.DataFrame(
+        {
+            "Sequence": ["MRVA", "QQL", "KVAW"],
+            "Proteins": ["P1", "P1", "P1;P2"],
+            "Experiment": ["Ctrl_T1", "Ctrl_T1", "Ctrl_T2"],
+        }
+    )
+    peptides_dataframe["Start"] = ""
+    peptides_dataframe["End"] = ""
+    alignment_obj = alignment.Alignment(
+        "MKVAWQQIMKVAWQQQ",
+        peptides_dataframe,
+        max_mismatches=1,
+        equivalent_residues=[alignment.ISOBARIC_RESIDUES],
+    )
+    alignment_obj.search_peptide_in_protein_seq()
+    pipeline.write_single_page_report(alignment_obj, str(tmp_path), 6, 20)
+    pipeline.write_report(alignment_obj, str(tmp_path), 6, 20)
+    rendered_html = subprocess.run(
+        [
+            "node",
+            "-e",
+            NODE_HARNESS,
+            str(tmp_path / single_page.REPORT_DATA_NAME),
+            str(tmp_path / single_page.REPORT_SCRIPT_NAME),
+            "#type_group-All",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    with open(tmp_path / "type_group-All.html") as html:
+        page_html = str(
+            BeautifulSoup(html, "html.parser").find("div", class_="center")
+        )
+
+    # colors are written in different formats
+    def spans(html):
+        return [
+            (span.get_text(), "italic" in span["style"], span.get("title"))
+            for span in BeautifulSoup(html, "html.parser").find_all("span")
+        ]
+
+    assert spans(rendered_html) == spans(page_html)
+    assert span_positions(rendered_html) == span_positions(page_html)
+    approximate_spans = [span for span in spans(page_html) if span[1]]
+    # MRVA has one mismatch, QQL matches QQI (I/L) exactly
+    assert [span[0] for span in approximate_spans] == ["MRVA"]
+    assert approximate_spans[0][2].endswith("\nMismatches: 1")
@@ -0,0 +1,63 @@
+"""Startup time tests of GUI module."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("ttkbootstrap")
+
+SMARCA5_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "smarca5")
+# modules loaded only by analysis (after window is shown)
+HEAVY_MODULES = ("pandas", "numpy", "bs4", "colour", "matplotlib", "pipeline")
+# import time of App module without ttkbootstrap (in microseconds)
+IMPORT_TIME_BUDGET = 50_000
+
+
+def import_app(*python_options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [
+            sys.executable,
+            *python_options,
+            "-c",
+            "import sys, App; "
+            f"print(*sorted(set(sys.modules) & {set(HEAVY_MODULES)!r}))",
+        ],
+        cwd=SMARCA5_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def cumulative_import_times(importtime_log: str) -> dict[str, int]:
+    """
+    Parse output of python -X importtime.
+
+    :param importtime_log: stderr of python -X importtime
+    :return: dictionary where key is module and value is cumulative import
+    time in microseconds
+    """
+    import_times = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+def test_app_does_not_import_analysis_libraries():
+    assert import_app().stdout.split() == []
+
+
+def test_app_import_time_without_ttkbootstrap_is_within_budget():
+    # the fastest of few runs, first one can read modules from cold disk
+    import_time = min(
+        import_times["App"] - import_times["ttkbootstrap"]
+        for import_times in (
+            cumulative_import_times(import_app("-X", "importtime").stderr)
+            for _ in range(3)
+        )
+    )
+    assert import_time < IMPORT_TIME_BUDGET